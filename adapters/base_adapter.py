@@ -3,14 +3,29 @@
 Базовый класс для всех адаптеров.
 """
 import json
+import shlex
 import subprocess
+from contextlib import contextmanager
 from pathlib import Path
 from abc import ABC, abstractmethod
 
+from utils.desktop import find_command
+
 
 class BaseAdapter(ABC):
-    def __init__(self):
-        self.config_dir = Path.home() / '.config' / 'theme-installer'
+    # Промежуточные цвета видны в сессии: адаптер поддерживает
+    # плавный переход (apply_step)
+    smooth_transitions = True
+
+    def __init__(self, home=None, offline=False):
+        """home - домашняя директория профиля (по умолчанию текущего
+        пользователя); offline - только запись файлов профиля, без команд
+        и D-Bus текущей сессии: то, что нельзя записать файлом,
+        выполняется при следующем входе пользователя (см. _run_at_login).
+        """
+        self.home = Path(home) if home else Path.home()
+        self.offline = offline
+        self.config_dir = self.home / '.config' / 'theme-installer'
         self.config_dir.mkdir(parents=True, exist_ok=True)
     
     @abstractmethod
@@ -23,6 +38,78 @@ class BaseAdapter(ABC):
         """Установка обоев."""
         pass
     
+    def set_wallpapers(self, wallpaper_paths):
+        """Установка обоев по изображению на монитор.
+
+        Без поддержки обоев для отдельных мониторов ставится первое
+        изображение.
+        """
+        if len(wallpaper_paths) > 1:
+            print(f"{getattr(self, 'name', type(self).__name__)}: обои для отдельных мониторов "
+                  f"не поддерживаются, используется {wallpaper_paths[0]}")
+        return self.set_wallpaper(wallpaper_paths[0])
+
+    def apply_step(self, theme_data):
+        """Кадр плавного перехода (см. core.transition).
+
+        Должен быть дешевым: только цвета, без перезапуска оболочки.
+        По умолчанию - обычное применение цветов.
+        """
+        return self.apply_colors(theme_data)
+
+    @contextmanager
+    def transaction(self):
+        """Группа изменений, которую адаптер может записать одной операцией.
+
+        ThemeManager применяет обои и цвета внутри transaction();
+        адаптеры без пакетной записи пишут изменения сразу.
+        """
+        yield self
+
+    def _run_at_login(self, name, commands):
+        """Команды оболочки, выполняемые один раз при следующем входе.
+
+        Скрипт и файл автозапуска записываются в профиль; после
+        выполнения скрипт удаляет оба файла.
+        """
+        from core.exporter import write_if_changed
+
+        script = self.config_dir / f"apply-{name}.sh"
+        autostart = self.home / '.config' / 'autostart' / f"theme-installer-{name}.desktop"
+        lines = ['#!/bin/sh'] + list(commands)
+        lines.append(f"rm -f {shlex.quote(str(script))} {shlex.quote(str(autostart))}")
+        write_if_changed(script, '\n'.join(lines) + '\n')
+        # Аргумент Exec в кавычках по спецификации Desktop Entry: внутри
+        # экранируются ", `, $ и \, затем \ - еще раз как символ строки;
+        # % удваивается, чтобы не считаться кодом поля
+        quoted = ''.join('\\' + c if c in '"`$\\' else c for c in str(script))
+        quoted = quoted.replace('\\', '\\\\').replace('%', '%%')
+        write_if_changed(autostart, (
+            "[Desktop Entry]\n"
+            "Type=Application\n"
+            f"Name=Theme Installer ({name})\n"
+            f'Exec=sh "{quoted}"\n'
+            "NoDisplay=true\n"
+            "X-GNOME-Autostart-enabled=true\n"
+        ))
+        return script
+
+    def _dconf_at_login(self, name, settings):
+        """Ключи GSettings [(схема, путь, ключ, значение)] для загрузки при входе.
+
+        Ключи сохраняются файлом в профиле и загружаются одним
+        `dconf load /` в сеансе пользователя.
+        """
+        from adapters.gsettings import dconf_keyfile
+        from core.exporter import write_if_changed
+
+        keyfile = self.config_dir / f"dconf-{name}.ini"
+        write_if_changed(keyfile, dconf_keyfile(settings))
+        self._run_at_login(f"dconf-{name}", [
+            f"dconf load / < {shlex.quote(str(keyfile))} && rm -f {shlex.quote(str(keyfile))}"
+        ])
+        return True
+
     def get_current_theme(self):
         """Получение текущей темы."""
         return {}
@@ -42,14 +129,5 @@ class BaseAdapter(ABC):
             return False
     
     def _check_command(self, command):
-        """Проверка наличия команды."""
-        try:
-            result = subprocess.run(
-                ["which", command],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except:
-            return False
+        """Проверка наличия команды (поиск в PATH без запуска which)."""
+        return find_command(command) is not None
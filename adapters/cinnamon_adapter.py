@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Адаптер для Cinnamon: все ключи темы и обоев одной записью dconf.
+"""
+import os
+from pathlib import Path
+
+from adapters.gsettings import GsettingsAdapter
+from core.theme import as_theme
+
+# Темы GTK, оболочки и окон для светлого и темного режима (пакет mint-themes)
+CINNAMON_THEMES = {
+    'light': 'Mint-Y',
+    'dark': 'Mint-Y-Dark',
+}
+
+
+class CinnamonAdapter(GsettingsAdapter):
+    label = 'Cinnamon'
+
+    def __init__(self, home=None, offline=False):
+        super().__init__(home, offline)
+        self.name = "Cinnamon Adapter"
+
+    def apply_colors(self, theme_data):
+        """Применение тем GTK, оболочки Cinnamon и окон, цветовой схемы приложений."""
+        theme_data = as_theme(theme_data)
+        print(f"Cinnamon: Применение темы '{theme_data.name}'")
+
+        dark = theme_data.mode == 'dark'
+        theme = CINNAMON_THEMES['dark' if dark else 'light']
+        return self._set_keys([
+            ('org.cinnamon.desktop.interface', '/org/cinnamon/desktop/interface/', 'gtk-theme', theme),
+            ('org.cinnamon.desktop.wm.preferences', '/org/cinnamon/desktop/wm/preferences/', 'theme', theme),
+            ('org.cinnamon.theme', '/org/cinnamon/theme/', 'name', theme),
+            # Предпочтение темной схемы для приложений libadwaita/XApp (Cinnamon 6+)
+            ('org.x.apps.portal', '/org/x/apps/portal/', 'color-scheme',
+             'prefer-dark' if dark else 'prefer-light'),
+        ])
+
+    def set_wallpaper(self, wallpaper_path):
+        """Установка обоев рабочего стола Cinnamon."""
+        if not os.path.exists(wallpaper_path):
+            print(f"Cinnamon: Файл не найден: {wallpaper_path}")
+            return False
+
+        print(f"Cinnamon: Установка обоев: {wallpaper_path}")
+        return self._set_keys([
+            ('org.cinnamon.desktop.background', '/org/cinnamon/desktop/background/', 'picture-uri',
+             Path(wallpaper_path).resolve().as_uri()),
+            ('org.cinnamon.desktop.background', '/org/cinnamon/desktop/background/', 'picture-options',
+             'zoom'),
+        ])
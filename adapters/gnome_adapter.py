@@ -5,34 +5,44 @@
 import os
 from pathlib import Path
 from adapters.base_adapter import BaseAdapter
+from core.gtk_theme import write_gtk_theme
+from core.theme import as_theme
 
 
 class GnomeAdapter(BaseAdapter):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, home=None, offline=False):
+        super().__init__(home, offline)
         self.name = "GNOME Adapter"
     
     def apply_colors(self, theme_data):
         """Применение цветов в GNOME."""
-        print(f"GNOME: Применение цветовой темы '{theme_data.get('name', 'Custom')}'")
+        theme_data = as_theme(theme_data)
+        print(f"GNOME: Применение цветовой темы '{theme_data.name}'")
         
         try:
+            mode = 'prefer-dark' if theme_data.mode == 'dark' else 'default'
+            primary = theme_data.hex('primary', 0x3584e4)
+            
             # 1. Установка акцентного цвета (GNOME 42+)
-            if self._check_command('gsettings'):
+            if self.offline:
+                # Профиль другого пользователя: ключи загрузятся при входе
+                self._dconf_at_login('gnome-colors', [
+                    ('org.gnome.desktop.interface', '/org/gnome/desktop/interface/',
+                     'color-scheme', mode),
+                    ('org.gnome.desktop.interface', '/org/gnome/desktop/interface/',
+                     'accent-color', primary),
+                ])
+            elif self._check_command('gsettings'):
                 # Цветовая схема (светлая/темная)
-                mode = 'prefer-dark' if theme_data.get('mode') == 'dark' else 'default'
                 cmd = f"gsettings set org.gnome.desktop.interface color-scheme '{mode}'"
                 self._execute_command(cmd)
                 
                 # Акцентный цвет (используем первичный цвет)
-                primary = theme_data.get('primary', '#3584e4')
-                # Для GNOME нужно убрать # и добавить ' в начале
-                color_value = primary.lstrip('#')
-                cmd = f"gsettings set org.gnome.desktop.interface accent-color '#{color_value}'"
+                cmd = f"gsettings set org.gnome.desktop.interface accent-color '{primary}'"
                 self._execute_command(cmd)
             
-            # 2. Создание простой темы для GTK
-            self._create_simple_gtk_theme(theme_data)
+            # 2. Тема GTK: палитра и статическая таблица стилей
+            self._write_gtk_theme(theme_data)
             
             print("GNOME: Цвета успешно применены")
             return True
@@ -41,36 +51,12 @@ class GnomeAdapter(BaseAdapter):
             print(f"GNOME: Ошибка применения цветов: {e}")
             return False
     
-    def _create_simple_gtk_theme(self, theme_data):
-        """Создание простой GTK темы."""
-        theme_name = "custom-gnome-theme"
-        theme_dir = Path.home() / '.themes' / theme_name
-        theme_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Создаем базовый CSS
-        css_content = f"""
-        * {{
-            background-color: {theme_data.get('background', '#ffffff')};
-            color: {theme_data.get('on_background', '#000000')};
-        }}
-        
-        button {{
-            background-color: {theme_data.get('primary', '#3584e4')};
-            color: white;
-        }}
-        """
-        
-        # Для GTK 3
-        gtk3_dir = theme_dir / 'gtk-3.0'
-        gtk3_dir.mkdir(exist_ok=True)
-        with open(gtk3_dir / 'gtk.css', 'w') as f:
-            f.write(css_content)
-        
-        # Для GTK 4
-        gtk4_dir = theme_dir / 'gtk-4.0'
-        gtk4_dir.mkdir(exist_ok=True)
-        with open(gtk4_dir / 'gtk.css', 'w') as f:
-            f.write(css_content)
+    def _write_gtk_theme(self, theme_data):
+        """Тема GTK3/GTK4: при смене темы переписывается только палитра."""
+        written = write_gtk_theme(theme_data, self.home / '.themes')
+        changed = [path.name for path, was_written in written.items() if was_written]
+        if changed:
+            print(f"GNOME: Тема GTK обновлена ({', '.join(changed)})")
     
     def set_wallpaper(self, wallpaper_path):
         """Установка обоев в GNOME - ПРОСТОЙ РАБОЧИЙ МЕТОД."""
@@ -80,6 +66,13 @@ class GnomeAdapter(BaseAdapter):
         
         print(f"GNOME: Установка обоев: {wallpaper_path}")
         
+        if self.offline:
+            uri = Path(wallpaper_path).resolve().as_uri()
+            return self._dconf_at_login('gnome-wallpaper', [
+                ('org.gnome.desktop.background', '/org/gnome/desktop/background/', key, uri)
+                for key in ('picture-uri', 'picture-uri-dark')
+            ])
+        
         # Метод 1: gsettings (основной)
         if self._check_command('gsettings'):
             # Устанавливаем для рабочего стола
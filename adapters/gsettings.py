@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Общая основа адаптеров окружений на GSettings (MATE, Cinnamon).
+
+Ключи собираются в пакет и записываются одной операцией:
+1. `dconf load /` - один процесс на все ключи;
+2. Gio.Settings с delay()/apply() - без процессов, если есть PyGObject;
+3. `gsettings set` по ключу - последний вариант.
+
+Внутри transaction() пакет пишется при выходе из нее, иначе - сразу.
+В режиме offline ключи сохраняются в профиле и загружаются при входе.
+"""
+import shlex
+import subprocess
+from contextlib import contextmanager
+
+from adapters.base_adapter import BaseAdapter
+
+
+def gvariant(value):
+    """Значение в текстовом формате GVariant."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    text = str(value).replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{text}'"
+
+
+def dconf_keyfile(settings):
+    """Текст для `dconf load /`: секция на каждый путь dconf."""
+    sections = {}
+    for _, path, key, value in settings:
+        sections.setdefault(path.strip('/'), []).append(f"{key}={gvariant(value)}")
+    lines = []
+    for path, entries in sections.items():
+        lines.append(f"[{path}]")
+        lines.extend(entries)
+        lines.append('')
+    return '\n'.join(lines)
+
+
+class GsettingsAdapter(BaseAdapter):
+    """Адаптер с пакетной записью ключей GSettings.
+
+    Ключ задается как (схема, путь dconf, ключ, значение): путь нужен
+    для dconf load, схема - для Gio и gsettings.
+    """
+
+    label = 'GSettings'
+    # Применяются только имена готовых тем: промежуточных цветов нет
+    smooth_transitions = False
+
+    def __init__(self, home=None, offline=False):
+        super().__init__(home, offline)
+        self._pending = None
+
+    @contextmanager
+    def transaction(self):
+        """Все ключи, заданные внутри, записываются одной операцией."""
+        if self._pending is not None:
+            # Вложенная транзакция входит во внешнюю
+            yield self
+            return
+        self._pending = []
+        try:
+            yield self
+        except BaseException:
+            self._pending = None
+            raise
+        settings, self._pending = self._pending, None
+        if settings and not self._write_settings(settings):
+            raise OSError(f"{self.label}: не удалось записать настройки")
+
+    def _set_keys(self, settings):
+        """Запись ключей: в текущую транзакцию или сразу."""
+        if self._pending is not None:
+            self._pending.extend(settings)
+            return True
+        return self._write_settings(settings)
+
+    def _write_settings(self, settings):
+        if self.offline:
+            return self._dconf_at_login(self.label.lower(), settings)
+        for method in (self._write_dconf, self._write_gio, self._write_gsettings):
+            if method(settings):
+                return True
+        return False
+
+    def _write_dconf(self, settings):
+        if not self._check_command('dconf'):
+            return False
+        try:
+            result = subprocess.run(['dconf', 'load', '/'], input=dconf_keyfile(settings),
+                                    capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            return False
+        if result.returncode == 0:
+            print(f"{self.label}: {len(settings)} ключей записано через dconf load")
+            return True
+        return False
+
+    def _write_gio(self, settings):
+        try:
+            import gi
+            gi.require_version('Gio', '2.0')
+            from gi.repository import Gio, GLib
+        except (ImportError, ValueError):
+            return False
+
+        source = Gio.SettingsSchemaSource.get_default()
+        groups = {}
+        for schema, _, key, value in settings:
+            # Gio.Settings.new завершает процесс на неизвестной схеме
+            if source is None or source.lookup(schema, True) is None:
+                continue
+            groups.setdefault(schema, []).append((key, value))
+        if not groups:
+            return False
+
+        try:
+            for schema, values in groups.items():
+                gio_settings = Gio.Settings.new(schema)
+                gio_settings.delay()
+                for key, value in values:
+                    gio_settings.set_value(key, GLib.Variant.parse(None, gvariant(value), None, None))
+                gio_settings.apply()
+            Gio.Settings.sync()
+        except Exception:
+            return False
+        print(f"{self.label}: {len(settings)} ключей записано через Gio")
+        return True
+
+    def _write_gsettings(self, settings):
+        if not self._check_command('gsettings'):
+            return False
+        written = 0
+        for schema, _, key, value in settings:
+            if self._execute_command(f"gsettings set {schema} {key} {shlex.quote(gvariant(value))}"):
+                written += 1
+        return written > 0
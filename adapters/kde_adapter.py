@@ -2,48 +2,32 @@
 """
 Улучшенный адаптер для KDE Plasma с гарантированной работой.
 """
+import json
 import os
-import sys
+import shlex
 import time
-import subprocess
 import tempfile
 import configparser
-from pathlib import Path
 from adapters.base_adapter import BaseAdapter
+from core.exporter import ThemeExporter, kde_scheme_name, write_if_changed
+from core.theme import as_theme, scale_packed
+from utils.desktop import plasma_version
+
+# Имя схем кадров плавного перехода (чередуются _0 и _1)
+TRANSITION_SCHEME = 'Custom_Transition'
 
 
 class KdeAdapter(BaseAdapter):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, home=None, offline=False):
+        super().__init__(home, offline)
         self.name = "KDE Adapter"
         self.plasma_version = self._detect_plasma_version()
+        self._transition_slot = 0
         print(f"KDE: Обнаружена Plasma версия: {self.plasma_version}")
     
     def _detect_plasma_version(self):
-        """Определение версии Plasma."""
-        try:
-            # Проверяем наличие команд для разных версий
-            if self._check_command('plasmashell'):
-                result = subprocess.run(
-                    ['plasmashell', '--version'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if 'Plasma 6' in result.stdout or 'Plasma 6' in result.stderr:
-                    return '6'
-                elif 'Plasma 5' in result.stdout or 'Plasma 5' in result.stderr:
-                    return '5'
-            
-            # Проверяем по наличию команд
-            if self._check_command('kwriteconfig6'):
-                return '6'
-            elif self._check_command('kwriteconfig5'):
-                return '5'
-            
-            return 'unknown'
-        except:
-            return 'unknown'
+        """Определение версии Plasma по окружению и файлам, без запуска plasmashell."""
+        return plasma_version()
     
     def _get_kwriteconfig(self):
         """Получение правильной команды kwriteconfig."""
@@ -63,10 +47,11 @@ class KdeAdapter(BaseAdapter):
     
     def apply_colors(self, theme_data):
         """Применение цветов в KDE Plasma - ГАРАНТИРОВАННО РАБОЧИЙ МЕТОД."""
-        print(f"KDE: Применение темы '{theme_data.get('name', 'Custom')}'")
+        theme_data = as_theme(theme_data)
+        print(f"KDE: Применение темы '{theme_data.name}'")
         
         try:
-            mode = theme_data.get('mode', 'light')
+            mode = theme_data.mode
             
             # 1. Создаем цветовую схему
             scheme_name = self._create_color_scheme(theme_data)
@@ -93,97 +78,86 @@ class KdeAdapter(BaseAdapter):
             traceback.print_exc()
             return False
     
-    def _create_color_scheme(self, theme_data):
+    def apply_step(self, theme_data):
+        """Кадр перехода: только цветовая схема, без тем окон и перезапуска Plasma.
+
+        plasma-apply-colorscheme не применяет повторно текущую схему,
+        поэтому кадры чередуют две схемы перехода.
+        """
+        theme = as_theme(theme_data)
+        self._transition_slot ^= 1
+        scheme_name = self._create_color_scheme(theme, f"{TRANSITION_SCHEME}_{self._transition_slot}")
+        return self._apply_color_scheme(scheme_name, theme.mode)
+    
+    def _create_color_scheme(self, theme_data, scheme_name=None):
         """Создание цветовой схемы KDE."""
+        theme = as_theme(theme_data)
+
         # Генерируем имя схемы
-        mode = theme_data.get('mode', 'light')
-        scheme_name = f"Custom_{theme_data.get('name', 'Theme').replace(' ', '_')}_{mode}"
+        scheme_name = scheme_name or kde_scheme_name(theme)
         
         # Создаем директорию для схем
-        scheme_dir = Path.home() / '.local' / 'share' / 'color-schemes'
+        scheme_dir = self.home / '.local' / 'share' / 'color-schemes'
         scheme_dir.mkdir(parents=True, exist_ok=True)
         
         # Файл цветовой схемы
         scheme_file = scheme_dir / f"{scheme_name}.colors"
         
-        # Получаем цвета
-        primary = theme_data.get('primary', '#2980b9')
-        secondary = theme_data.get('secondary', '#2ecc71')
-        background = theme_data.get('background', '#ffffff')
-        foreground = theme_data.get('on_background', '#000000')
-        surface = theme_data.get('surface', '#f8f9fa')
-        surface_text = theme_data.get('on_surface', '#000000')
-        
-        # Создаем полноценную цветовую схему
-        scheme_content = f"""[ColorScheme]
-Name={scheme_name}
-ColorPalette={primary},{secondary}
-
-[General]
-accent={primary}
-accentBackground={primary}
-background={background}
-decoration={primary}
-foreground={foreground}
-viewBackground={surface}
-
-[Colors:Button]
-BackgroundNormal={primary}
-BackgroundAlternate={self._darken_color(primary, 0.1)}
-ForegroundNormal={foreground}
-ForegroundActive={foreground}
-ForegroundDisabled=#666666
-ForegroundLink={secondary}
-ForegroundNegative=#da4453
-ForegroundNeutral=#f67400
-ForegroundPositive=#27ae60
-ForegroundVisited={self._lighten_color(secondary, 0.2)}
-
-[Colors:Selection]
-BackgroundNormal={primary}
-BackgroundAlternate={self._darken_color(primary, 0.1)}
-ForegroundNormal={foreground}
-
-[Colors:Window]
-BackgroundNormal={background}
-BackgroundAlternate={surface}
-ForegroundNormal={foreground}
-ForegroundActive={foreground}
-ForegroundInactive=#666666
-
-[Colors:View]
-BackgroundNormal={surface}
-BackgroundAlternate={background}
-ForegroundNormal={surface_text}
-ForegroundInactive=#666666
-ForegroundLink={secondary}
-
-[Colors:Tooltip]
-BackgroundNormal={primary}
-BackgroundAlternate={self._darken_color(primary, 0.1)}
-ForegroundNormal={foreground}
-
-[Colors:Complementary]
-BackgroundNormal={secondary}
-BackgroundAlternate={self._darken_color(secondary, 0.1)}
-ForegroundNormal={foreground}
-
-[WM]
-activeBackground={primary}
-activeForeground={foreground}
-inactiveBackground={background}
-inactiveForeground=#666666
-"""
-        
-        # Записываем файл
-        with open(scheme_file, 'w') as f:
-            f.write(scheme_content)
+        # Содержимое - из общего шаблона экспортера; запись атомарная
+        # и пропускается, если схема не изменилась
+        scheme_content = ThemeExporter(['kde']).render(theme, scheme_name)['kde']
+        write_if_changed(scheme_file, scheme_content)
         
         print(f"KDE: Создана цветовая схема: {scheme_name}")
         return scheme_name
     
+    @staticmethod
+    def _kconfig():
+        config = configparser.ConfigParser(interpolation=None, strict=False)
+        # Ключи KDE чувствительны к регистру
+        config.optionxform = str
+        return config
+    
+    def _write_kconfig(self, filename, group, values):
+        """Запись ключей в файл конфигурации KDE профиля (~/.config/filename)."""
+        return self._write_kconfig_groups(filename, {group: values})
+    
+    def _write_kconfig_groups(self, filename, groups):
+        """Запись нескольких групп {группа: {ключ: значение}} одной записью файла."""
+        path = self.home / '.config' / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        config = self._kconfig()
+        if path.exists():
+            config.read(path, encoding='utf-8')
+        for group, values in groups.items():
+            if not config.has_section(group):
+                config.add_section(group)
+            for key, value in values.items():
+                config.set(group, key, value)
+        with open(path, 'w', encoding='utf-8') as f:
+            config.write(f, space_around_delimiters=False)
+        return path
+    
     def _apply_color_scheme(self, scheme_name, mode):
         """Применение цветовой схемы."""
+        if self.offline:
+            # Профиль другого пользователя: группы цветов схемы копируются
+            # в kdeglobals, как это делает plasma-apply-colorscheme.
+            # Применять схему при входе нельзя: уже заданную в
+            # ColorScheme схему plasma-apply-colorscheme пропускает
+            scheme = self._kconfig()
+            scheme_file = self.home / '.local' / 'share' / 'color-schemes' / f"{scheme_name}.colors"
+            scheme.read(scheme_file, encoding='utf-8')
+            groups = {group: dict(scheme[group]) for group in scheme.sections()
+                      if group.startswith('Colors:') or group == 'WM'}
+            groups['General'] = {
+                'ColorScheme': scheme_name,
+                'colorScheme': 'Dark' if mode == 'dark' else 'Light',
+            }
+            self._write_kconfig_groups('kdeglobals', groups)
+            print(f"KDE: Цветовая схема {scheme_name} записана в kdeglobals")
+            return True
+        
         # Метод 1: plasma-apply-colorscheme (лучший)
         if self._check_command('plasma-apply-colorscheme'):
             cmd = f"plasma-apply-colorscheme {scheme_name}"
@@ -200,7 +174,7 @@ inactiveForeground=#666666
                 return True
         
         # Метод 3: прямой файл
-        kdeglobals = Path.home() / '.config' / 'kdeglobals'
+        kdeglobals = self.home / '.config' / 'kdeglobals'
         if kdeglobals.exists():
             config = configparser.ConfigParser()
             config.read(kdeglobals)
@@ -223,6 +197,10 @@ inactiveForeground=#666666
         """Установка темы окон."""
         window_theme = 'breeze-dark' if mode == 'dark' else 'breeze'
         
+        if self.offline:
+            self._write_kconfig('kdeglobals', 'WM', {'theme': window_theme, 'style': window_theme})
+            return
+        
         kwriteconfig = self._get_kwriteconfig()
         if kwriteconfig:
             # Тема окон
@@ -239,6 +217,10 @@ inactiveForeground=#666666
         """Установка темы Plasma."""
         plasma_theme = 'breeze-dark' if mode == 'dark' else 'breeze'
         
+        if self.offline:
+            self._write_kconfig('plasmarc', 'Theme', {'name': plasma_theme})
+            return
+        
         kwriteconfig = self._get_kwriteconfig()
         if kwriteconfig:
             cmd = f"{kwriteconfig} --file plasmarc --group Theme --key name {plasma_theme}"
@@ -247,6 +229,10 @@ inactiveForeground=#666666
     
     def _refresh_kde(self):
         """Обновление KDE."""
+        if self.offline:
+            # Сеанс пользователя не запущен - перезапускать нечего
+            return
+        
         print("KDE: Обновление окружения...")
         
         # Безопасный перезапуск
@@ -269,32 +255,71 @@ inactiveForeground=#666666
         except:
             print("KDE: Не удалось перезапустить Plasma, изменения применятся после перезагрузки")
     
-    def _darken_color(self, hex_color, factor=0.1):
-        """Затемнение цвета."""
-        hex_color = hex_color.lstrip('#')
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-        
-        r = max(0, int(r * (1 - factor)))
-        g = max(0, int(g * (1 - factor)))
-        b = max(0, int(b * (1 - factor)))
-        
-        return f'#{r:02x}{g:02x}{b:02x}'
+    def _darken_color(self, color, factor=0.1):
+        """Затемнение упакованного цвета 0xRRGGBB."""
+        return scale_packed(color, 1 - factor)
     
-    def _lighten_color(self, hex_color, factor=0.1):
-        """Осветление цвета."""
-        hex_color = hex_color.lstrip('#')
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-        
-        r = min(255, int(r * (1 + factor)))
-        g = min(255, int(g * (1 + factor)))
-        b = min(255, int(b * (1 + factor)))
-        
-        return f'#{r:02x}{g:02x}{b:02x}'
+    def _lighten_color(self, color, factor=0.1):
+        """Осветление упакованного цвета 0xRRGGBB."""
+        return scale_packed(color, 1 + factor)
     
+    def set_wallpapers(self, wallpaper_paths):
+        """Обои для каждого монитора одним скриптом plasmashell.
+
+        Изображения сопоставляются экранам по номеру (desktop.screen);
+        лишним экранам достается последнее изображение.
+        """
+        missing = [path for path in wallpaper_paths if not os.path.exists(path)]
+        if missing:
+            print(f"KDE: Файлы не найдены: {', '.join(missing)}")
+            return False
+        if len(wallpaper_paths) == 1:
+            return self.set_wallpaper(wallpaper_paths[0])
+
+        images = json.dumps([f"file://{os.path.abspath(path)}" for path in wallpaper_paths])
+        print(f"KDE: Установка обоев для {len(wallpaper_paths)} мониторов")
+        script = f"""
+        var images = {images};
+        var allDesktops = desktops();
+        for (var i=0; i<allDesktops.length; i++) {{
+            var desktop = allDesktops[i];
+            if (desktop.screen < 0) continue;
+            desktop.wallpaperPlugin = "org.kde.image";
+            desktop.currentConfigGroup = Array("Wallpaper", "org.kde.image", "General");
+            desktop.writeConfig("Image", images[Math.min(desktop.screen, images.length - 1)]);
+        }}
+        """
+
+        if self.offline:
+            # Скрипт plasmashell выполняется в сеансе владельца профиля
+            self._run_at_login('kde-wallpapers', [
+                "dbus-send --session --dest=org.kde.plasmashell --type=method_call "
+                "/PlasmaShell org.kde.PlasmaShell.evaluateScript "
+                + shlex.quote(f"string:{script}")
+            ])
+            return True
+
+        if self._check_command('dbus-send'):
+            cmd = ("dbus-send --session --dest=org.kde.plasmashell --type=method_call "
+                   "/PlasmaShell org.kde.PlasmaShell.evaluateScript "
+                   f"'string:{script}'")
+            if self._execute_command(cmd):
+                print("KDE: Обои мониторов установлены через dbus-send")
+                return True
+
+        try:
+            import dbus
+
+            plasma = dbus.SessionBus().get_object('org.kde.plasmashell', '/PlasmaShell')
+            plasma.evaluateScript(script, dbus_interface='org.kde.PlasmaShell')
+            print("KDE: Обои мониторов установлены через Python dbus")
+            return True
+        except Exception as e:
+            print(f"KDE: Python dbus не сработал: {e}")
+
+        # Без plasmashell - одни обои на все экраны
+        return self.set_wallpaper(wallpaper_paths[0])
+
     def set_wallpaper(self, wallpaper_path):
         """ГАРАНТИРОВАННАЯ установка обоев в KDE."""
         if not os.path.exists(wallpaper_path):
@@ -303,6 +328,12 @@ inactiveForeground=#666666
         
         print(f"KDE: Установка обоев: {wallpaper_path}")
         
+        if self.offline:
+            self._run_at_login('kde-wallpaper', [
+                f"plasma-apply-wallpaperimage {shlex.quote(os.path.abspath(wallpaper_path))}"
+            ])
+            return True
+        
         # Метод 1: plasma-apply-wallpaperimage (лучший для Plasma 6)
         if self._check_command('plasma-apply-wallpaperimage'):
             cmd = f"plasma-apply-wallpaperimage {wallpaper_path}"
@@ -387,8 +418,8 @@ inactiveForeground=#666666
         try:
             # Ищем конфиг файлы
             config_patterns = [
-                Path.home() / '.config' / 'plasma-org.kde.plasma.desktop-appletsrc',
-                Path.home() / '.config' / 'plasmarc'
+                self.home / '.config' / 'plasma-org.kde.plasma.desktop-appletsrc',
+                self.home / '.config' / 'plasmarc'
             ]
             
             for config_file in config_patterns:
@@ -411,7 +442,7 @@ inactiveForeground=#666666
                         return True
             
             # Если не нашли, создаем запись
-            config_file = Path.home() / '.config' / 'plasmarc'
+            config_file = self.home / '.config' / 'plasmarc'
             with open(config_file, 'a') as f:
                 f.write(f'\n[Theme]\nwallpaper={wallpaper_path}\n')
             
@@ -432,7 +463,7 @@ inactiveForeground=#666666
         
         try:
             # Чтение kdeglobals
-            kdeglobals = Path.home() / '.config' / 'kdeglobals'
+            kdeglobals = self.home / '.config' / 'kdeglobals'
             if kdeglobals.exists():
                 config = configparser.ConfigParser()
                 config.read(kdeglobals)
@@ -445,7 +476,7 @@ inactiveForeground=#666666
                     theme['window_theme'] = config.get('WM', 'theme', fallback='')
             
             # Чтение plasmarc
-            plasmarc = Path.home() / '.config' / 'plasmarc'
+            plasmarc = self.home / '.config' / 'plasmarc'
             if plasmarc.exists():
                 config = configparser.ConfigParser()
                 config.read(plasmarc)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Адаптер для MATE: все ключи темы и обоев одной записью dconf.
+"""
+import os
+
+from adapters.gsettings import GsettingsAdapter
+from core.theme import as_theme
+
+# Темы GTK и Marco для светлого и темного режима (пакет mate-themes)
+MATE_THEMES = {
+    'light': 'Menta',
+    'dark': 'BlackMATE',
+}
+
+
+class MateAdapter(GsettingsAdapter):
+    label = 'MATE'
+
+    def __init__(self, home=None, offline=False):
+        super().__init__(home, offline)
+        self.name = "MATE Adapter"
+
+    def apply_colors(self, theme_data):
+        """Применение темы GTK и оформления окон Marco."""
+        theme_data = as_theme(theme_data)
+        print(f"MATE: Применение темы '{theme_data.name}'")
+
+        theme = MATE_THEMES['dark' if theme_data.mode == 'dark' else 'light']
+        return self._set_keys([
+            ('org.mate.interface', '/org/mate/desktop/interface/', 'gtk-theme', theme),
+            ('org.mate.Marco.general', '/org/mate/marco/general/', 'theme', theme),
+        ])
+
+    def set_wallpaper(self, wallpaper_path):
+        """Установка обоев рабочего стола MATE."""
+        if not os.path.exists(wallpaper_path):
+            print(f"MATE: Файл не найден: {wallpaper_path}")
+            return False
+
+        print(f"MATE: Установка обоев: {wallpaper_path}")
+        return self._set_keys([
+            ('org.mate.background', '/org/mate/desktop/background/', 'picture-filename',
+             os.path.abspath(wallpaper_path)),
+            ('org.mate.background', '/org/mate/desktop/background/', 'picture-options', 'zoom'),
+            ('org.mate.background', '/org/mate/desktop/background/', 'draw-background', True),
+        ])
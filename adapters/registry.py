@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Реестр адаптеров платформ с ленивой загрузкой.
+
+Адаптеры находятся без импорта их модулей:
+- встроенные - по файлам adapters/*_adapter.py (класс адаптера ищется
+  в исходном тексте);
+- сторонние - по точкам входа группы theme_installer.adapters
+  (имя - платформа, значение - 'пакет.модуль:Класс').
+
+Индекс платформ кэшируется в ~/.cache/theme-installer/adapters.json и
+пересобирается, только когда меняются каталоги sys.path или файлы
+адаптеров, поэтому importlib.metadata при обычном запуске не
+импортируется. Модуль адаптера импортируется только при выборе его
+платформы.
+"""
+import importlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+ENTRY_POINT_GROUP = 'theme_installer.adapters'
+
+ADAPTERS_DIR = Path(__file__).resolve().parent
+
+_CLASS_PATTERN = re.compile(r'^class\s+(\w+Adapter)\s*\([^)]*Adapter[^)]*\)\s*:', re.MULTILINE)
+
+# Индекс текущего процесса: {платформа: {'module', 'class', 'source'}}
+_index = None
+
+
+def index_path():
+    return Path.home() / '.cache' / 'theme-installer' / 'adapters.json'
+
+
+def _index_key():
+    """Отпечаток мест, где могут появиться адаптеры: время изменения
+    каталогов sys.path и файлов встроенных адаптеров."""
+    key = []
+    entries = sorted(str(path) for path in ADAPTERS_DIR.glob('*_adapter.py'))
+    for entry in [str(ADAPTERS_DIR)] + entries + sys.path:
+        try:
+            key.append([entry, os.stat(entry or '.').st_mtime_ns])
+        except OSError:
+            continue
+    return key
+
+
+def _builtin_adapters():
+    adapters = {}
+    for path in sorted(ADAPTERS_DIR.glob('*_adapter.py')):
+        if path.name == 'base_adapter.py':
+            continue
+        match = _CLASS_PATTERN.search(path.read_text(encoding='utf-8'))
+        if match:
+            adapters[path.name[:-len('_adapter.py')]] = {
+                'module': f"adapters.{path.stem}",
+                'class': match.group(1),
+                'source': 'builtin',
+            }
+    return adapters
+
+
+def _entry_point_adapters():
+    from importlib.metadata import entry_points
+
+    adapters = {}
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        module, _, attr = entry_point.value.partition(':')
+        if not attr:
+            continue
+        dist = getattr(entry_point, 'dist', None)
+        adapters[entry_point.name] = {
+            'module': module.strip(),
+            'class': attr.strip(),
+            'source': dist.name if dist is not None else 'entry-point',
+        }
+    return adapters
+
+
+def build_index():
+    """Индекс адаптеров по метаданным; встроенные имеют приоритет."""
+    adapters = _entry_point_adapters()
+    adapters.update(_builtin_adapters())
+    return adapters
+
+
+def _read_cached_index(key):
+    try:
+        with open(index_path(), encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('key') != key:
+        return None
+    return cached.get('adapters')
+
+
+def _write_cached_index(key, adapters):
+    path = index_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'adapters': adapters}, f)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def adapter_index(refresh=False):
+    """Индекс {платформа: {'module', 'class', 'source'}}."""
+    global _index
+    if _index is not None and not refresh:
+        return _index
+
+    key = _index_key()
+    adapters = None if refresh else _read_cached_index(key)
+    if adapters is None:
+        adapters = build_index()
+        _write_cached_index(key, adapters)
+    _index = adapters
+    return adapters
+
+
+def available_platforms():
+    """Платформы, для которых есть адаптер."""
+    return sorted(adapter_index())
+
+
+def load_adapter_class(platform):
+    """Класс адаптера платформы; модуль импортируется здесь."""
+    spec = adapter_index().get(platform)
+    if spec is None:
+        raise ValueError(f"Адаптер для платформы '{platform}' не найден "
+                         f"(доступны: {', '.join(available_platforms())})")
+    try:
+        module = importlib.import_module(spec['module'])
+        return getattr(module, spec['class'])
+    except (ImportError, AttributeError) as e:
+        raise ImportError(f"Не удалось загрузить адаптер '{platform}' "
+                          f"({spec['module']}:{spec['class']}): {e}") from e
+
+
+def load_adapter(platform, **options):
+    """Экземпляр адаптера платформы (options - параметры конструктора)."""
+    return load_adapter_class(platform)(**options)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Адаптер для XFCE: все свойства xfconf одной записью.
+
+Свойства темы и обоев собираются в пакет (см. transaction()) и
+записываются:
+1. через xfconfd по D-Bus - одно подключение к сессионной шине на все
+   свойства (модуль dbus или Gio.DBusProxy из PyGObject);
+2. прямой записью XML каналов, если xfconfd не запущен (иначе он
+   перезапишет файлы из своего кэша);
+3. через xfconf-query по свойству - последний вариант.
+В режиме offline (профиль другого пользователя) пишутся только XML.
+"""
+import os
+import subprocess
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from pathlib import Path
+
+from adapters.base_adapter import BaseAdapter
+from core.exporter import write_if_changed
+from core.theme import as_theme
+from utils.desktop import process_running
+
+# Темы GTK и xfwm4 для светлого и темного режима
+XFCE_THEMES = {
+    'light': ('Adwaita', 'Default'),
+    'dark': ('Adwaita-dark', 'Default'),
+}
+
+# Свойство обоев по умолчанию, если у xfdesktop еще нет настроек мониторов
+DEFAULT_BACKDROP = '/backdrop/screen0/monitor0/workspace0'
+# image-style: 5 - масштабирование с обрезкой
+BACKDROP_STYLE = 5
+
+_XFCONF_TYPES = {str: 'string', bool: 'bool', int: 'int'}
+
+
+def xfconf_value(value):
+    """Текстовое значение свойства xfconf."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def channel_dir(home=None):
+    return Path(home or Path.home()) / '.config' / 'xfce4' / 'xfconf' / 'xfce-perchannel-xml'
+
+
+def update_channel_xml(text, channel, properties):
+    """XML канала xfconf с новыми значениями свойств {путь: значение}.
+
+    text - текущее содержимое файла канала или None.
+    """
+    root = ET.fromstring(text) if text else ET.Element('channel', name=channel, version='1.0')
+    for prop_path, value in properties.items():
+        node = root
+        for name in prop_path.strip('/').split('/'):
+            child = next((c for c in node.findall('property') if c.get('name') == name), None)
+            if child is None:
+                child = ET.SubElement(node, 'property', name=name, type='empty')
+            node = child
+        node.set('type', _XFCONF_TYPES[type(value)])
+        node.set('value', xfconf_value(value))
+    ET.indent(root, space='  ')
+    return '<?xml version="1.0" encoding="UTF-8"?>\n\n' + ET.tostring(root, encoding='unicode') + '\n'
+
+
+def channel_properties(text):
+    """Пути всех свойств с значениями в XML канала."""
+    paths = []
+
+    def walk(node, prefix):
+        for child in node.findall('property'):
+            path = f"{prefix}/{child.get('name')}"
+            if child.get('value') is not None:
+                paths.append(path)
+            walk(child, path)
+
+    if text:
+        walk(ET.fromstring(text), '')
+    return paths
+
+
+def backdrop_properties(existing, wallpaper_path):
+    """Свойства обоев для всех мониторов и рабочих столов xfdesktop.
+
+    existing - пути свойств канала xfce4-desktop; обои задаются у
+    каждого найденного last-image, а без них - у монитора по умолчанию.
+    """
+    prefixes = sorted({path[:-len('/last-image')] for path in existing
+                       if path.startswith('/backdrop/') and path.endswith('/last-image')})
+    properties = {}
+    for prefix in prefixes or [DEFAULT_BACKDROP]:
+        properties[f"{prefix}/last-image"] = wallpaper_path
+        properties[f"{prefix}/image-style"] = BACKDROP_STYLE
+    return properties
+
+
+class XfceAdapter(BaseAdapter):
+    # Применяются только имена готовых тем: промежуточных цветов нет
+    smooth_transitions = False
+
+    def __init__(self, home=None, offline=False):
+        super().__init__(home, offline)
+        self.name = "XFCE Adapter"
+        # Пакет изменений: {канал: {свойство: значение}}; обои - отдельно,
+        # их свойства зависят от мониторов, известных xfdesktop
+        self._pending = None
+        self._pending_wallpaper = None
+
+    @contextmanager
+    def transaction(self):
+        """Все свойства, заданные внутри, записываются одной операцией."""
+        if self._pending is not None:
+            yield self
+            return
+        self._pending, self._pending_wallpaper = {}, None
+        try:
+            yield self
+        except BaseException:
+            self._pending = self._pending_wallpaper = None
+            raise
+        pending, wallpaper = self._pending, self._pending_wallpaper
+        self._pending = self._pending_wallpaper = None
+        if (pending or wallpaper) and not self._write(pending, wallpaper):
+            raise OSError("XFCE: не удалось записать настройки xfconf")
+
+    def _queue(self, channels=None, wallpaper=None):
+        if self._pending is None:
+            return self._write(channels or {}, wallpaper)
+        for channel, properties in (channels or {}).items():
+            self._pending.setdefault(channel, {}).update(properties)
+        if wallpaper:
+            self._pending_wallpaper = wallpaper
+        return True
+
+    def apply_colors(self, theme_data):
+        """Применение темы GTK (xsettings) и оформления окон xfwm4."""
+        theme_data = as_theme(theme_data)
+        print(f"XFCE: Применение темы '{theme_data.name}'")
+
+        gtk_theme, wm_theme = XFCE_THEMES['dark' if theme_data.mode == 'dark' else 'light']
+        return self._queue({
+            'xsettings': {'/Net/ThemeName': gtk_theme},
+            'xfwm4': {'/general/theme': wm_theme},
+        })
+
+    def set_wallpaper(self, wallpaper_path):
+        """Установка обоев на всех мониторах и рабочих столах."""
+        if not os.path.exists(wallpaper_path):
+            print(f"XFCE: Файл не найден: {wallpaper_path}")
+            return False
+
+        print(f"XFCE: Установка обоев: {wallpaper_path}")
+        return self._queue(wallpaper=os.path.abspath(wallpaper_path))
+
+    def _write(self, channels, wallpaper=None):
+        if self.offline:
+            # Профиль другого пользователя: только файлы каналов
+            return bool(self._write_xml(channels, wallpaper))
+        for method in (self._write_dbus, self._write_gio, self._write_xml,
+                       self._write_xfconf_query):
+            written = method(channels, wallpaper)
+            if written is not None:
+                return written
+        return False
+
+    def _write_dbus(self, channels, wallpaper):
+        """Запись через xfconfd одним подключением к шине; None - недоступно."""
+        try:
+            import dbus
+            xfconf = dbus.Interface(
+                dbus.SessionBus().get_object('org.xfce.Xfconf', '/org/xfce/Xfconf'),
+                'org.xfce.Xfconf')
+        except Exception:
+            return None
+
+        def variant(value):
+            if isinstance(value, bool):
+                return dbus.Boolean(value)
+            if isinstance(value, int):
+                return dbus.Int32(value)
+            return dbus.String(value)
+
+        try:
+            channels = dict(channels)
+            if wallpaper:
+                existing = list(xfconf.GetAllProperties('xfce4-desktop', '/backdrop').keys())
+                channels['xfce4-desktop'] = backdrop_properties([str(p) for p in existing], wallpaper)
+            for channel, properties in channels.items():
+                for prop_path, value in properties.items():
+                    xfconf.SetProperty(channel, prop_path, variant(value))
+        except Exception as e:
+            print(f"XFCE: Ошибка записи через xfconfd: {e}")
+            return False
+        print("XFCE: Настройки записаны через xfconfd (D-Bus)")
+        return True
+
+    def _write_gio(self, channels, wallpaper):
+        """Запись через xfconfd с Gio.DBusProxy (PyGObject); None - недоступно."""
+        try:
+            import gi
+            gi.require_version('Gio', '2.0')
+            from gi.repository import Gio, GLib
+            xfconf = Gio.DBusProxy.new_for_bus_sync(
+                Gio.BusType.SESSION, Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES, None,
+                'org.xfce.Xfconf', '/org/xfce/Xfconf', 'org.xfce.Xfconf', None)
+        except Exception:
+            return None
+        if xfconf.get_name_owner() is None:
+            # xfconfd не запущен - запись в XML каналов
+            return None
+
+        def call(method, signature, *args):
+            return xfconf.call_sync(method, GLib.Variant(signature, args),
+                                    Gio.DBusCallFlags.NONE, -1, None)
+
+        variant_types = {bool: 'b', int: 'i', str: 's'}
+        try:
+            channels = dict(channels)
+            if wallpaper:
+                existing = call('GetAllProperties', '(ss)', 'xfce4-desktop', '/backdrop').unpack()[0]
+                channels['xfce4-desktop'] = backdrop_properties(list(existing), wallpaper)
+            for channel, properties in channels.items():
+                for prop_path, value in properties.items():
+                    call('SetProperty', '(ssv)', channel, prop_path,
+                         GLib.Variant(variant_types[type(value)], value))
+        except Exception as e:
+            print(f"XFCE: Ошибка записи через xfconfd: {e}")
+            return False
+        print("XFCE: Настройки записаны через xfconfd (Gio)")
+        return True
+
+    def _write_xml(self, channels, wallpaper):
+        """Запись XML каналов, когда xfconfd не запущен; None - запущен."""
+        if not self.offline and process_running('xfconfd'):
+            return None
+
+        channels = dict(channels)
+        if wallpaper:
+            channels['xfce4-desktop'] = {}
+        try:
+            for channel, properties in channels.items():
+                path = channel_dir(self.home) / f"{channel}.xml"
+                text = path.read_text(encoding='utf-8') if path.exists() else None
+                if channel == 'xfce4-desktop' and wallpaper:
+                    properties = {**properties,
+                                  **backdrop_properties(channel_properties(text), wallpaper)}
+                write_if_changed(path, update_channel_xml(text, channel, properties))
+        except (OSError, ET.ParseError) as e:
+            print(f"XFCE: Ошибка записи каналов xfconf: {e}")
+            return False
+        print(f"XFCE: Настройки записаны в {channel_dir(self.home)}")
+        return True
+
+    def _write_xfconf_query(self, channels, wallpaper):
+        """Запись через xfconf-query по свойству; None - нет утилиты."""
+        if not self._check_command('xfconf-query'):
+            return None
+
+        channels = dict(channels)
+        try:
+            if wallpaper:
+                result = subprocess.run(['xfconf-query', '-c', 'xfce4-desktop', '-l'],
+                                        capture_output=True, text=True, timeout=10)
+                channels['xfce4-desktop'] = backdrop_properties(result.stdout.split(), wallpaper)
+
+            success = True
+            for channel, properties in channels.items():
+                for prop_path, value in properties.items():
+                    result = subprocess.run(
+                        ['xfconf-query', '-c', channel, '-p', prop_path, '--create',
+                         '-t', _XFCONF_TYPES[type(value)], '-s', xfconf_value(value)],
+                        capture_output=True, text=True, timeout=10)
+                    success = success and result.returncode == 0
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"XFCE: Ошибка xfconf-query: {e}")
+            return False
+        if success:
+            print("XFCE: Настройки записаны через xfconf-query")
+        return success
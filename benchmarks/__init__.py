@@ -0,0 +1,5 @@
+"""
+Бенчмарки и отчеты о точности анализатора.
+
+Запуск из корня проекта: python -m benchmarks.<модуль>
+"""
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк применения темы адаптерами на поддельном рабочем столе.
+
+В PATH подкладываются заглушки gsettings, dconf, xfconf-query,
+kwriteconfig5/6, plasma-apply-*, dbus-send, qdbus, plasmashell и т.д., а HOME
+указывает на временную директорию. Каждая заглушка записывает свой
+вызов и аргументы в журнал. Для каждого ThemeManager.apply_theme
+считаются запуски процессов из Python (audit-события subprocess.Popen
+и os.*), вызовы утилит по журналу заглушек, байты записанных в HOME
+файлов и время. Каждый сценарий выполняется в отдельном процессе.
+С --transition дополнительно измеряется плавный переход светлой темы
+в темную: задержки применения кадров и отброшенные кадры.
+
+    python -m benchmarks.adapters [--scenarios gnome kde6] [--repeat 3]
+    python -m benchmarks.adapters --max-spawns 40 --save adapters.json
+    python -m benchmarks.adapters --transition 24 --transition-duration 1
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TESTS_DIR = Path(__file__).resolve().parent.parent / 'tests'
+
+# Разделители полей и записей журнала заглушек (аргументы могут
+# содержать переводы строк, например скрипты plasmashell)
+_UNIT_SEP = '\x1f'
+_RECORD_SEP = '\x1e'
+
+# Ответы заглушек, которые читают адаптеры
+_STUB_OUTPUT = {
+    'plasmashell': 'if [ "$1" = "--version" ]; then echo "plasmashell {plasma}.1.0"; fi',
+    'gsettings': 'if [ "$1" = "get" ]; then echo "\'default\'"; fi',
+}
+
+_KDE_TOOLS = ('plasma-apply-colorscheme', 'plasma-apply-wallpaperimage',
+              'plasma-apply-desktoptheme', 'plasmashell', 'dbus-send', 'qdbus')
+
+# Платформа ThemeManager, версия Plasma для заглушек и набор утилит
+SCENARIOS = {
+    'gnome': ('gnome', None, ('gsettings', 'dconf')),
+    'kde6': ('kde', 6, _KDE_TOOLS + ('kwriteconfig6', 'kreadconfig6', 'kquitapp6')),
+    'kde5': ('kde', 5, _KDE_TOOLS + ('kwriteconfig5', 'kreadconfig5', 'kquitapp5')),
+    'xfce': ('xfce', None, ('xfconf-query',)),
+    'mate': ('mate', None, ('gsettings', 'dconf')),
+    'cinnamon': ('cinnamon', None, ('gsettings', 'dconf')),
+}
+
+_SPAWN_EVENTS = {'subprocess.Popen', 'os.system', 'os.posix_spawn', 'os.exec', 'os.fork'}
+_recorded_spawns = None
+
+
+def _audit(event, args):
+    if _recorded_spawns is not None and event in _SPAWN_EVENTS:
+        _recorded_spawns.append(event)
+
+
+class FakeDesktop:
+    """Временные HOME и PATH с заглушками утилит рабочего стола.
+
+    Используется как контекстный менеджер; окружение процесса
+    восстанавливается при выходе.
+    """
+
+    def __init__(self, tools, plasma=6):
+        self.tools = tuple(tools)
+        self.plasma = plasma
+        self.root = None
+        self._saved_env = None
+
+    def __enter__(self):
+        self.root = Path(tempfile.mkdtemp(prefix='fake-desktop-'))
+        self.bin_dir = self.root / 'bin'
+        self.home = self.root / 'home'
+        self.log_path = self.root / 'calls.log'
+        self.bin_dir.mkdir()
+        self.home.mkdir()
+        self.log_path.touch()
+
+        # which тоже заглушка: проверки _check_command попадают в журнал
+        for tool in self.tools + ('which',):
+            self._write_stub(tool)
+
+        self._saved_env = {key: os.environ.get(key) for key in ('PATH', 'HOME', 'FAKE_DESKTOP_LOG')}
+        os.environ['PATH'] = f"{self.bin_dir}{os.pathsep}/usr/bin{os.pathsep}/bin"
+        os.environ['HOME'] = str(self.home)
+        os.environ['FAKE_DESKTOP_LOG'] = str(self.log_path)
+        return self
+
+    def __exit__(self, *exc_info):
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write_stub(self, tool):
+        if tool == 'which':
+            # Ищем только среди заглушек: реальные утилиты хоста не видны
+            body = f'[ -x "{self.bin_dir}/$1" ] && echo "{self.bin_dir}/$1"'
+        else:
+            body = _STUB_OUTPUT.get(tool, '').format(plasma=self.plasma)
+        script = (
+            "#!/bin/sh\n"
+            "{ printf '%s' \"$(basename \"$0\")\"; "
+            "for arg in \"$@\"; do printf '\\037%s' \"$arg\"; done; "
+            "printf '\\036'; } >> \"$FAKE_DESKTOP_LOG\"\n"
+            f"{body}\n"
+        )
+        path = self.bin_dir / tool
+        path.write_text(script)
+        path.chmod(0o755)
+
+    def calls(self):
+        """Записанные вызовы: [[утилита, аргумент, ...], ...]."""
+        data = self.log_path.read_text(encoding='utf-8', errors='replace')
+        return [record.split(_UNIT_SEP) for record in data.split(_RECORD_SEP) if record]
+
+    def clear_calls(self):
+        self.log_path.write_text('')
+
+    def settle(self, quiet=0.05, timeout=1.0):
+        """Ожидание фоновых вызовов (например, plasmashell --replace &)."""
+        deadline = time.monotonic() + timeout
+        size = -1
+        while time.monotonic() < deadline:
+            current = self.log_path.stat().st_size
+            if current == size:
+                return
+            size = current
+            time.sleep(quiet)
+
+    def snapshot(self):
+        """Размер и время изменения каждого файла в HOME."""
+        files = {}
+        for path in self.home.rglob('*'):
+            if path.is_file():
+                stat = path.stat()
+                files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    @staticmethod
+    def bytes_written(before, after):
+        """Байты созданных и перезаписанных файлов; у дописываемых (логи,
+        WAL SQLite) - прирост размера."""
+        total = 0
+        for path, (size, mtime) in after.items():
+            if path.name.endswith('-shm'):
+                # Индекс WAL в разделяемой памяти, не данные на диске
+                continue
+            old = before.get(path)
+            if old is None:
+                total += size
+            elif old[1] != mtime:
+                appended = path.suffix == '.log' or path.name.endswith('-wal')
+                total += max(size - old[0], 0) if appended else size
+        return total
+
+
+def _measure(desktop, action):
+    global _recorded_spawns
+
+    desktop.clear_calls()
+    before = desktop.snapshot()
+    _recorded_spawns = []
+    start = time.perf_counter()
+    try:
+        result = action()
+    finally:
+        elapsed = time.perf_counter() - start
+        spawns, _recorded_spawns = _recorded_spawns, None
+    desktop.settle()
+    calls = desktop.calls()
+    return result, {
+        'wall_ms': elapsed * 1000,
+        'spawns': len(spawns),
+        'tool_calls': len(calls),
+        'bytes_written': desktop.bytes_written(before, desktop.snapshot()),
+        'calls': [call[0] for call in calls],
+    }
+
+
+def run_scenario(task):
+    """Инициализация ThemeManager и repeat применений (в отдельном процессе)."""
+    scenario, image_path, repeat, transition = task
+    platform_name, plasma, tools = SCENARIOS[scenario]
+
+    # Адаптеры печатают много сообщений - в отчет они не нужны
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    sys.addaudithook(_audit)
+
+    with FakeDesktop(tools, plasma or 6) as desktop:
+        # Импорт после подмены HOME: логгер пишет в поддельный HOME
+        from core.color_analyzer import ColorAnalyzer
+        from core.theme_manager import ThemeManager
+
+        wallpaper = str(Path(image_path).resolve())
+        themes = ColorAnalyzer(wallpaper).analyze()['themes']
+        theme = themes['dark']
+
+        manager, init = _measure(desktop, lambda: ThemeManager(platform_name))
+        applies = []
+        for _ in range(repeat):
+            success, metrics = _measure(desktop, lambda: manager.apply_theme(theme, wallpaper))
+            metrics['success'] = bool(success)
+            applies.append(metrics)
+
+        report = None
+        if transition:
+            steps, duration = transition
+            manager.apply_theme(themes['light'])
+            desktop.settle()
+            _, report = manager.apply_transition(theme, steps=steps, duration=duration,
+                                                 source=themes['light'])
+            desktop.settle()
+
+    return {'init': init, 'applies': applies, 'transition': report}
+
+
+def run_benchmark(scenarios, image_path, repeat, transition=None):
+    context = get_context('spawn')
+    results = {}
+    for scenario in scenarios:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[scenario] = executor.submit(
+                run_scenario, (scenario, image_path, repeat, transition)).result()
+    return results
+
+
+def print_report(results, show_calls=False):
+    header = f"{'scenario':<8} {'phase':<8} {'spawns':>7} {'tools':>6} {'bytes':>8} {'wall ms':>9}"
+    lines = [header, '-' * len(header)]
+    for scenario, result in results.items():
+        phases = [('init', result['init'])]
+        phases += [(f"apply {i}", metrics) for i, metrics in enumerate(result['applies'], 1)]
+        for phase, metrics in phases:
+            lines.append(f"{scenario:<8} {phase:<8} {metrics['spawns']:>7} {metrics['tool_calls']:>6} "
+                         f"{metrics['bytes_written']:>8} {metrics['wall_ms']:>9.1f}")
+            if show_calls and metrics['calls']:
+                lines.append(f"{'':<17}{' '.join(metrics['calls'])}")
+    print('\n'.join(lines))
+
+    reports = {scenario: result['transition'] for scenario, result in results.items()
+               if result.get('transition')}
+    if reports:
+        header = (f"\n{'scenario':<8} {'frames':>6} {'applied':>7} {'dropped':>7} "
+                  f"{'p50 ms':>7} {'p95 ms':>7} {'max ms':>7} {'final ms':>8}")
+        lines = [header, '-' * (len(header) - 1)]
+        for scenario, report in reports.items():
+            latency = report['latency_ms']
+            lines.append(f"{scenario:<8} {report['steps']:>6} {report['applied']:>7} {report['dropped']:>7} "
+                         f"{latency['p50']:>7.1f} {latency['p95']:>7.1f} {latency['max']:>7.1f} "
+                         f"{report['final_ms']:>8.1f}")
+        print('\n'.join(lines))
+
+
+def check_budgets(results, max_spawns=None, max_bytes=None):
+    """Превышения бюджета на одно применение темы."""
+    violations = []
+    for scenario, result in results.items():
+        for i, metrics in enumerate(result['applies'], 1):
+            if max_spawns is not None and metrics['spawns'] > max_spawns:
+                violations.append(f"{scenario} apply {i}: {metrics['spawns']} процессов > {max_spawns}")
+            if max_bytes is not None and metrics['bytes_written'] > max_bytes:
+                violations.append(f"{scenario} apply {i}: {metrics['bytes_written']} байт > {max_bytes}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Стоимость применения темы адаптерами')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--image', default=str(TESTS_DIR / '1.jpg'), help='Обои и источник темы')
+    parser.add_argument('--repeat', type=int, default=3, help='Применений темы подряд')
+    parser.add_argument('--calls', action='store_true', help='Показать вызванные утилиты')
+    parser.add_argument('--max-spawns', type=int, help='Бюджет запусков процессов на применение')
+    parser.add_argument('--max-bytes', type=int, help='Бюджет записанных байт на применение')
+    parser.add_argument('--save', help='Сохранить результаты в JSON')
+    parser.add_argument('--transition', type=int, metavar='STEPS',
+                        help='Измерить плавный переход из STEPS шагов')
+    parser.add_argument('--transition-duration', type=float, default=1.0,
+                        help='Длительность перехода, с')
+    args = parser.parse_args()
+
+    transition = (args.transition, args.transition_duration) if args.transition else None
+    results = run_benchmark(args.scenarios, args.image, args.repeat, transition)
+    print_report(results, args.calls)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Результаты сохранены: {args.save}", file=sys.stderr)
+
+    violations = check_budgets(results, args.max_spawns, args.max_bytes)
+    if violations:
+        print("\nПревышение бюджета:\n  " + "\n  ".join(violations))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк анализатора с сохраняемым эталоном.
+
+Этапы load_image, extract_colors, select_base_colors, generate_theme и
+полный analyze() замеряются на изображениях из tests/ и на
+синтетических изображениях 1080p, 4K, 8K и 16K (генерируются один раз
+в ~/.cache/theme-installer/benchmarks). Каждый замер идет в отдельном
+процессе: время (медиана и минимум повторов), пиковый RSS этапа и пик
+выделений по tracemalloc (буферы изображений Pillow он не видит - их
+показывает RSS).
+
+    python -m benchmarks.analyzer --save baseline.json
+    python -m benchmarks.analyzer --compare baseline.json [--threshold 0.15]
+    python -m benchmarks.analyzer --compare baseline.json --current current.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TESTS_DIR = Path(__file__).resolve().parent.parent / 'tests'
+
+STAGES = ('load_image', 'extract_colors', 'select_base_colors', 'generate_theme', 'analyze')
+
+SYNTHETIC_SIZES = {
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+    '8k': (7680, 4320),
+    '16k': (15360, 8640),
+}
+
+# Метрики сравнения и минимальная абсолютная разница, ниже которой
+# изменение считается шумом
+METRICS = {
+    'wall_ms': 1.0,
+    'peak_rss_mb': 2.0,
+    'alloc_peak_mb': 1.0,
+}
+DEFAULT_THRESHOLD = 0.15
+
+
+def synthetic_dir():
+    return Path.home() / '.cache' / 'theme-installer' / 'benchmarks'
+
+
+def synthetic_image(name, seed=0):
+    """Путь к синтетическому JPEG размера name; создается при первом вызове.
+
+    Плавное цветовое поле из увеличенной случайной сетки и набор
+    эллипсов, чтобы у изображения было несколько доминирующих цветов.
+    """
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    path = synthetic_dir() / f"synthetic-{name}.jpg"
+    if path.exists():
+        return path
+
+    width, height = SYNTHETIC_SIZES[name]
+    rng = np.random.default_rng(seed)
+    field = (rng.random((9, 16, 3)) * 255).astype(np.uint8)
+    image = Image.fromarray(field).resize((width, height), Image.Resampling.BICUBIC)
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.random(2) * (width, height)
+        rx, ry = (rng.random(2) * 0.15 + 0.02) * width
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        draw.ellipse((x - rx, y - ry, x + rx, y + ry), fill=color)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    image.save(temp_path, format='JPEG', quality=90)
+    os.replace(temp_path, path)
+    return path
+
+
+def _memory_status():
+    """Текущий и пиковый RSS процесса в МБ (по /proc/self/status)."""
+    values = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    key, value = line.split(':')
+                    values[key] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        values = {'VmRSS': peak, 'VmHWM': peak}
+    return values['VmRSS'], values['VmHWM']
+
+
+def _reset_peak_rss():
+    """Сброс пикового RSS (Linux 4.0+); False, если недоступно."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _stage_runner(stage, image_path, options):
+    """Подготовка этапа вне замера; возвращает функцию одного прогона."""
+    from core.batch import materialize
+    from core.color_analyzer import ColorAnalyzer
+
+    if stage == 'load_image':
+        return lambda: ColorAnalyzer(image_path, **options).load_image()
+
+    analyzer = ColorAnalyzer(image_path, **options)
+    analyzer.load_image()
+    if stage == 'extract_colors':
+        return lambda: analyzer.extract_colors(10)
+
+    colors = analyzer.extract_colors(10)
+    if stage == 'select_base_colors':
+        return lambda: analyzer.select_base_colors(colors)
+    if stage == 'generate_theme':
+        # Новый анализатор на прогон: иначе сработает кэш основы тем
+        return lambda: [ColorAnalyzer(image_path, **options).generate_theme(colors, mode)
+                        for mode in ('light', 'dark', 'mixed')]
+    if stage == 'analyze':
+        return lambda: materialize(ColorAnalyzer(image_path, **options).analyze())
+    raise ValueError(f"Неизвестный этап: {stage}")
+
+
+def run_case(task):
+    """Замер одного этапа на одном изображении (в отдельном процессе)."""
+    image_path, stage, repeat, options = task
+    from PIL import Image
+    warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+
+    run = _stage_runner(stage, image_path, options)
+    run()  # прогрев: импорты, таблицы LUT
+
+    rss_before, _ = _memory_status()
+    rss_reset = _reset_peak_rss()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    _, peak_rss = _memory_status()
+
+    tracemalloc.start()
+    run()
+    alloc_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'wall_ms': statistics.median(times),
+        'wall_min_ms': min(times),
+        'repeat': repeat,
+        'peak_rss_mb': peak_rss,
+        'rss_delta_mb': peak_rss - rss_before,
+        'rss_reset': rss_reset,
+        'alloc_peak_mb': alloc_peak / (1024 * 1024),
+    }
+
+
+def benchmark_images(sizes, include_tests=True):
+    """Список (имя, путь) изображений бенчмарка."""
+    images = []
+    if include_tests:
+        images += [(path.name, path) for path in sorted(TESTS_DIR.glob('*.jpg'))]
+    for name in sizes:
+        images.append((name, synthetic_image(name)))
+    return images
+
+
+def run_benchmark(images, stages, repeat, options):
+    """Результаты {'изображение/этап': метрики}; процесс на каждый замер."""
+    results = {}
+    context = get_context('spawn')
+    for name, path in images:
+        for stage in stages:
+            # Свой процесс на замер: пиковый RSS и кэши не переходят между этапами
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                metrics = executor.submit(run_case, (str(path), stage, repeat, options)).result()
+            results[f"{name}/{stage}"] = metrics
+            print(f"{name:<10} {stage:<19} {metrics['wall_ms']:>9.1f} ms "
+                  f"{metrics['peak_rss_mb']:>8.1f} MB RSS {metrics['alloc_peak_mb']:>8.1f} MB alloc",
+                  file=sys.stderr)
+    return results
+
+
+def environment(options):
+    import numpy
+    import PIL
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'pillow': PIL.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'options': options,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Строки отчета сравнения и список регрессий."""
+    lines = [f"{'case':<32} {'metric':<14} {'baseline':>10} {'current':>10} {'change':>8}"]
+    regressions = []
+    for case, metrics in current['results'].items():
+        base = baseline['results'].get(case)
+        if base is None:
+            continue
+        for metric, noise in METRICS.items():
+            old, new = base[metric], metrics[metric]
+            change = (new - old) / old if old else 0.0
+            flag = ''
+            if change > threshold and new - old > noise:
+                flag = ' REGRESSION'
+                regressions.append((case, metric, old, new))
+            lines.append(f"{case:<32} {metric:<14} {old:>10.1f} {new:>10.1f} {change:>+8.0%}{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк этапов ColorAnalyzer')
+    parser.add_argument('--sizes', nargs='*', choices=list(SYNTHETIC_SIZES),
+                        default=list(SYNTHETIC_SIZES), help='Синтетические изображения')
+    parser.add_argument('--no-tests', action='store_true', help='Без изображений из tests/')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--sampling', choices=['resize', 'full', 'grid', 'blue_noise'],
+                        default='resize')
+    parser.add_argument('--pixel-budget', type=int)
+    parser.add_argument('--save', help='Сохранить результаты в JSON')
+    parser.add_argument('--compare', help='Сравнить с эталоном (JSON)')
+    parser.add_argument('--current', help='Готовые результаты для сравнения вместо запуска')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Допустимый относительный рост метрики')
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        options = {}
+        if args.sampling != 'resize':
+            options['sampling'] = args.sampling
+        if args.pixel_budget:
+            options['pixel_budget'] = args.pixel_budget
+        images = benchmark_images(args.sizes, not args.no_tests)
+        current = {
+            'environment': environment(options),
+            'results': run_benchmark(images, args.stages, args.repeat, options),
+        }
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"Результаты сохранены: {args.save}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        lines, regressions = compare(baseline, current, args.threshold)
+        print('\n'.join(lines))
+        if regressions:
+            print(f"\nРегрессии: {len(regressions)} (порог {args.threshold:.0%})")
+            sys.exit(1)
+        print("\nРегрессий нет")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Профиль пресетов анализатора: задержка и качество палитры.
+
+Для каждого пресета core.settings на изображениях замеряется полный
+analyze() с материализацией тем (медиана повторов после прогрева), а
+палитра сравнивается с эталонной: все пиксели, мелкий квантователь
+(шаг 8) и отбор по CIEDE2000. Качество - средний и максимальный ΔE
+от эталонных цветов до ближайших цветов пресета и доля совпадений
+(ΔE < 10).
+
+    python -m benchmarks.presets [изображения...] [--presets instant quality] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sampling_accuracy import compare_palettes
+from core.batch import materialize
+from core.color_analyzer import ColorAnalyzer
+from core.settings import PRESETS, analyzer_kwargs, resolve_settings
+
+TESTS_DIR = Path(__file__).resolve().parent.parent / 'tests'
+
+REFERENCE_OPTIONS = {'sampling': 'full', 'color_tolerance': 8, 'candidate_factor': 10,
+                     'distance': 'ciede2000'}
+NUM_COLORS = 10
+
+
+def reference_palette(image_path):
+    return ColorAnalyzer(image_path, **REFERENCE_OPTIONS).extract_colors(NUM_COLORS)
+
+
+def profile_preset(image_path, preset, repeat):
+    """Медиана и минимум времени analyze() (мс) и палитра пресета."""
+    options = analyzer_kwargs(resolve_settings({'preset': preset}))
+    times, results = [], None
+    # Первый прогон - прогрев таблиц core.lut и кэшей файловой системы
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        results = materialize(ColorAnalyzer(image_path, **options).analyze())
+        times.append((time.perf_counter() - start) * 1000)
+    times = times[1:]
+    return statistics.median(times), min(times), results['dominant_colors']
+
+
+def build_report(images, presets, repeat):
+    rows = []
+    for image_path in images:
+        reference = reference_palette(image_path)
+        for preset in presets:
+            median_ms, min_ms, colors = profile_preset(image_path, preset, repeat)
+            rows.append((Path(image_path).name, preset, median_ms, min_ms,
+                         *compare_palettes(reference, colors)))
+    return rows
+
+
+def print_report(rows):
+    header = (f"{'image':<8} {'preset':<9} {'median ms':>9} {'min ms':>7} "
+              f"{'mean ΔE':>8} {'max ΔE':>7} {'match':>6}")
+    lines = [header, '-' * len(header)]
+    for name, preset, median_ms, min_ms, mean_de, max_de, match in rows:
+        lines.append(f"{name:<8} {preset:<9} {median_ms:>9.1f} {min_ms:>7.1f} "
+                     f"{mean_de:>8.2f} {max_de:>7.2f} {match:>6.0%}")
+
+    # Среднее по изображениям для каждого пресета
+    lines.append('-' * len(header))
+    for preset in dict.fromkeys(row[1] for row in rows):
+        selected = [row for row in rows if row[1] == preset]
+        means = [statistics.fmean(row[i] for row in selected) for i in range(2, 7)]
+        lines.append(f"{'all':<8} {preset:<9} {means[0]:>9.1f} {means[1]:>7.1f} "
+                     f"{means[2]:>8.2f} {means[3]:>7.2f} {means[4]:>6.0%}")
+    print('\n'.join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Задержка и качество палитры пресетов анализатора')
+    parser.add_argument('images', nargs='*', help='Изображения (по умолчанию tests/*.jpg)')
+    parser.add_argument('--presets', nargs='+', choices=list(PRESETS), default=list(PRESETS))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    images = args.images or sorted(str(p) for p in TESTS_DIR.glob('*.jpg'))
+    print_report(build_report(images, args.presets, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Отчет о точности выборки пикселей.
+
+Палитры, полученные выборкой с бюджетом (grid, blue_noise) и прежним
+уменьшением до 400 px, сравниваются с эталонной палитрой по полной
+гистограмме всех пикселей. Для каждого эталонного цвета берется
+ближайший цвет проверяемой палитры по CIEDE2000.
+
+    python -m benchmarks.sampling_accuracy [изображения...] [--budgets 4096 16384]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import lut
+from core.color_analyzer import ColorAnalyzer
+from core.colorspace import delta_e_2000
+from core.theme import hex_to_packed, unpack_rgb
+
+TESTS_DIR = Path(__file__).resolve().parent.parent / 'tests'
+# Совпадение цвета: различие меньше порога отбора ciede2000
+MATCH_THRESHOLD = 10.0
+
+
+def palette_lab(colors):
+    rgb = np.array([unpack_rgb(hex_to_packed(c)) for c in colors], dtype=np.uint8)
+    return lut.lab(rgb.reshape(-1, 3)).astype(np.float64)
+
+
+def compare_palettes(reference, candidate):
+    """Средний и максимальный ΔE до ближайшего цвета и доля совпадений."""
+    if not reference or not candidate:
+        return float('nan'), float('nan'), 0.0
+    distances = delta_e_2000(palette_lab(reference)[:, None, :], palette_lab(candidate)[None, :, :])
+    nearest = distances.min(axis=1)
+    return float(nearest.mean()), float(nearest.max()), float((nearest < MATCH_THRESHOLD).mean())
+
+
+def run_palette(image_path, num_colors, **options):
+    """Палитра и время загрузки с извлечением цветов."""
+    start = time.perf_counter()
+    analyzer = ColorAnalyzer(image_path, **options)
+    analyzer.load_image()
+    colors = analyzer.extract_colors(num_colors)
+    return colors, time.perf_counter() - start
+
+
+def build_report(images, budgets, num_colors=10, seed=0):
+    rows = []
+    for image_path in images:
+        reference, reference_time = run_palette(image_path, num_colors, sampling='full')
+        rows.append((Path(image_path).name, 'full', '-', reference_time, 0.0, 0.0, 1.0))
+
+        legacy, legacy_time = run_palette(image_path, num_colors)
+        rows.append((Path(image_path).name, 'resize-400', '-', legacy_time,
+                     *compare_palettes(reference, legacy)))
+
+        for method in ('grid', 'blue_noise'):
+            for budget in budgets:
+                colors, elapsed = run_palette(image_path, num_colors, sampling=method,
+                                              pixel_budget=budget, seed=seed)
+                rows.append((Path(image_path).name, method, budget, elapsed,
+                             *compare_palettes(reference, colors)))
+    return rows
+
+
+def print_report(rows):
+    header = f"{'image':<8} {'mode':<11} {'budget':>7} {'time ms':>8} {'mean ΔE':>8} {'max ΔE':>7} {'match':>6}"
+    lines = [header, '-' * len(header)]
+    for name, mode, budget, elapsed, mean_de, max_de, match in rows:
+        lines.append(f"{name:<8} {mode:<11} {budget!s:>7} {elapsed * 1000:>8.1f} "
+                     f"{mean_de:>8.2f} {max_de:>7.2f} {match:>6.0%}")
+    print('\n'.join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Точность выборки пикселей против полной гистограммы')
+    parser.add_argument('images', nargs='*', help='Изображения (по умолчанию tests/*.jpg)')
+    parser.add_argument('--budgets', nargs='+', type=int, default=[4096, 16384, 65536])
+    parser.add_argument('--colors', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    images = args.images or sorted(str(p) for p in TESTS_DIR.glob('*.jpg'))
+    print_report(build_report(images, args.budgets, args.colors, args.seed))
+
+
+if __name__ == "__main__":
+    main()
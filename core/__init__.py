@@ -1,9 +1,22 @@
-# core/__init__.py
 """
 Ядро системы установки тем.
+
+Классы загружаются лениво, чтобы модули, которым не нужен анализ
+изображений (планировщик, применение готовых тем), не тянули
+Pillow и NumPy.
 """
+import importlib
 
-from .color_analyzer import ColorAnalyzer
-from .theme_manager import ThemeManager
+_LAZY_ATTRS = {
+    'ColorAnalyzer': 'core.color_analyzer',
+    'ThemeManager': 'core.theme_manager',
+}
 
 __all__ = ['ColorAnalyzer', 'ThemeManager']
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'core' has no attribute '{name}'")
+    return getattr(importlib.import_module(module_name), name)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Пакетный анализ директории изображений.
+
+Изображения анализируются в пуле процессов, а результаты отдаются
+генератором по мере готовности в исходном порядке. В полете держится
+не больше окна задач, поэтому память не растет с размером библиотеки.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core.results import LazyMapping
+
+
+def materialize(results):
+    """Результат анализа без ленивых значений (для передачи между процессами)."""
+    return {
+        key: dict(value) if isinstance(value, LazyMapping) else value
+        for key, value in results.items()
+    }
+
+
+def analyze_image(task):
+    """Анализ одного изображения в дочернем процессе."""
+    image_path, modes, schemes, options = task
+
+    # Импорт здесь: родительскому процессу анализатор не нужен
+    from core.color_analyzer import ColorAnalyzer
+
+    analyzer = ColorAnalyzer(image_path, **options)
+    return materialize(analyzer.analyze(modes=modes, schemes=schemes))
+
+
+def iter_batch(images, modes=None, schemes=None, workers=None, window=None,
+               shared_memory=True, **analyzer_options):
+    """Результаты анализа по порядку изображений.
+
+    analyzer_options передаются в конструктор ColorAnalyzer. С
+    shared_memory=True изображения декодируются в потоках и передаются
+    процессам через разделяемую память (core.pipeline); иначе каждый
+    процесс сам загружает свое изображение.
+    """
+    tasks = [(str(Path(path)), modes, schemes, analyzer_options) for path in images]
+    workers = workers or min(len(tasks), os.cpu_count() or 1) or 1
+
+    if workers <= 1:
+        for task in tasks:
+            yield analyze_image(task)
+        return
+
+    if shared_memory:
+        from core.pipeline import iter_pipeline
+
+        yield from iter_pipeline(images, modes, schemes, workers=workers, slots=window,
+                                 **analyzer_options)
+        return
+
+    window = window or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(analyze_image, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -4,34 +4,145 @@
 """
 import colorsys
 import json
-from collections import Counter
 from PIL import Image
 import numpy as np
 from pathlib import Path
 
+from core.colorspace import pack_array, rgb_to_hsl, unpack_array
+from core.contrast import DEFAULT_TARGET, ensure_contrast
+from core.distance import select_distinct
+from core.frames import DEFAULT_FRAMES, FRAME_SELECTIONS, frame_count, process_frames
+from core import lut
+from core.results import LazyMapping
+from core.saliency import pixel_weights
+from core.sampling import DEFAULT_PIXEL_BUDGET, SAMPLING_METHODS, draft_size, sample_coords
+from core.theme import (
+    Palette, Theme, VARIATION_NAMES, packed_to_hex, to_packed, unpack_rgb
+)
+from core.variations import analogous_shifts, hue_rotations, scheme_table, variation_table
+
+THEME_MODES = ('light', 'dark', 'mixed')
+SCHEME_TYPES = ('analogous', 'complementary', 'triadic')
+
+# Фиксированные роли каждого режима, упакованные один раз
+_MODE_ROLES = {
+    'light': ('Light Theme', {
+        'background': 0xffffff, 'surface': 0xf8f9fa,
+        'error': 0xdc3545, 'warning': 0xffc107, 'success': 0x28a745, 'info': 0x17a2b8,
+        'on_primary': 0xffffff, 'on_secondary': 0xffffff, 'on_background': 0x212529,
+        'on_surface': 0x495057, 'on_error': 0xffffff
+    }),
+    'dark': ('Dark Theme', {
+        'background': 0x121212, 'surface': 0x1e1e1e,
+        'error': 0xcf6679, 'warning': 0xffb74d, 'success': 0x81c784, 'info': 0x4fc3f7,
+        'on_primary': 0x000000, 'on_secondary': 0x000000, 'on_background': 0xffffff,
+        'on_surface': 0xe0e0e0, 'on_error': 0x000000
+    }),
+    'mixed': ('Mixed Theme', {
+        'surface': 0xffffff,
+        'error': 0xe53935, 'warning': 0xfb8c00, 'success': 0x43a047, 'info': 0x1e88e5,
+        'on_primary': 0xffffff, 'on_secondary': 0x000000, 'on_background': 0x000000,
+        'on_surface': 0x000000, 'on_error': 0xffffff
+    }),
+}
+
 
 class ColorAnalyzer:
-    def __init__(self, image_path):
+    def __init__(self, image_path, min_contrast=DEFAULT_TARGET, distance='rgb',
+                 sampling=None, pixel_budget=DEFAULT_PIXEL_BUDGET, seed=0, weighting=True,
+                 frames=None, frame_selection='even', per_frame=False, max_size=400,
+                 resample='lanczos', color_tolerance=32, min_brightness=20, max_brightness=240,
+                 min_saturation=0.1, candidate_factor=5, min_distance=None):
         self.image_path = image_path
         self.image = None
+        # Альфа-канал (H, W) uint8, если он есть у изображения
+        self.alpha = None
+        # Минимальный контраст WCAG для on_* ролей; None - без коррекции
+        self.min_contrast = min_contrast
+        # Метрика отбора различающихся доминирующих цветов
+        self.distance = distance
+        # Выборка пикселей: None - уменьшение до max_size px фильтром
+        # resample, 'full' - все пиксели, 'grid'/'blue_noise' - бюджет pixel_budget
+        if sampling not in (None, 'full') + SAMPLING_METHODS:
+            raise ValueError(f"Неизвестный метод выборки: {sampling}")
+        self.sampling = sampling
+        self.pixel_budget = pixel_budget
+        self.max_size = max_size
+        self.resample = Image.Resampling[resample.upper()]
+        # Квантователь и отбор кандидатов (см. core.settings)
+        self.color_tolerance = color_tolerance
+        self.brightness_range = (min_brightness, max_brightness)
+        self.min_saturation = min_saturation
+        self.candidate_factor = candidate_factor
+        self.min_distance = min_distance
+        self.seed = seed
+        # Взвешивание пикселей по центру кадра, локальному контрасту и альфе
+        self.weighting = weighting
+        # Анимация: число анализируемых кадров (None - только первый),
+        # их выбор ('even'/'scene') и палитры отдельных кадров в результате
+        if frame_selection not in FRAME_SELECTIONS:
+            raise ValueError(f"Неизвестный выбор кадров: {frame_selection}")
+        self.frames = frames
+        self.frame_selection = frame_selection
+        self.per_frame = per_frame
+        self._animated = None
+        self._frame_histograms = None
+        # Общая основа тем (пара цветов, варианты) для набора цветов
+        self._theme_base_cache = {}
+        self._color_table_cache = {}
 
     def load_image(self):
         """Загрузка изображения с оптимизацией."""
         try:
-            self.image = Image.open(self.image_path).convert('RGB')
+            image = Image.open(self.image_path)
 
-            # Оптимизация размера для быстрой обработки
-            max_size = 400
-            if max(self.image.size) > max_size:
-                ratio = max_size / max(self.image.size)
-                new_size = (int(self.image.size[0] * ratio),
-                            int(self.image.size[1] * ratio))
-                self.image = self.image.resize(new_size, Image.Resampling.LANCZOS)
+            if self.sampling in SAMPLING_METHODS:
+                # Дешевое декодирование в уменьшенном масштабе (JPEG DCT),
+                # дальше берется только бюджет пикселей
+                size = draft_size(image.size, self.pixel_budget)
+                if size:
+                    image.draft('RGB', size)
 
+            self.image, self.alpha = self._prepare_image(image)
             return True
         except Exception as e:
             raise Exception(f"Ошибка загрузки изображения: {e}")
 
+    def use_pixels(self, pixels, alpha=None):
+        """Анализ уже подготовленного массива (H, W, 3) uint8 без загрузки файла.
+
+        Массив не копируется: это может быть представление разделяемой
+        памяти.
+        """
+        self.image, self.alpha = pixels, alpha
+
+    def image_size(self):
+        """Размер анализируемого изображения (ширина, высота)."""
+        if isinstance(self.image, np.ndarray):
+            return self.image.shape[1], self.image.shape[0]
+        return self.image.size
+
+    def _prepare_image(self, image):
+        """RGB-изображение для анализа и его альфа-канал (или None)."""
+        has_alpha = (image.mode in ('RGBA', 'LA', 'PA')
+                     or 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        if self.sampling is None:
+            # Оптимизация размера для быстрой обработки
+            max_size = self.max_size
+            if max(image.size) > max_size:
+                ratio = max_size / max(image.size)
+                new_size = (int(image.size[0] * ratio),
+                            int(image.size[1] * ratio))
+                image = image.resize(new_size, self.resample)
+
+        alpha = None
+        if has_alpha:
+            alpha = np.asarray(image.getchannel('A'))
+            image = image.convert('RGB')
+        return image, alpha
+
     @staticmethod
     def rgb_to_hex(rgb):
         return '#{:02x}{:02x}{:02x}'.format(*rgb)
@@ -55,68 +166,152 @@ class ColorAnalyzer:
 
     @staticmethod
     def calculate_luminance(rgb):
-        """Расчет относительной яркости (WCAG 2.0)."""
+        """Расчет относительной яркости (WCAG 2.0) по таблице линеаризации."""
         r, g, b = rgb
-        r = r / 255.0
-        g = g / 255.0
-        b = b / 255.0
-
-        r = r / 12.92 if r <= 0.03928 else ((r + 0.055) / 1.055) ** 2.4
-        g = g / 12.92 if g <= 0.03928 else ((g + 0.055) / 1.055) ** 2.4
-        b = b / 12.92 if b <= 0.03928 else ((b + 0.055) / 1.055) ** 2.4
+        return lut.luminance_scalar((int(r), int(g), int(b)))
 
-        return 0.2126 * r + 0.7152 * g + 0.0722 * b
+    def get_pixels(self, weighted=False):
+        """Пиксели для анализа (N, 3) с учетом режима выборки.
 
-    def extract_colors(self, num_colors=8, color_tolerance=32):
-        """Извлечение доминирующих цветов."""
-        if not self.image:
+        С weighted=True возвращает пару (pixels, weights), где weights -
+        веса (N,) из core.saliency или None, если взвешивание отключено.
+        """
+        if self.image is None:
             self.load_image()
+        return self._image_pixels(self.image, self.alpha, weighted)
+
+    def _image_pixels(self, image, alpha, weighted):
+        img_array = np.asarray(image)
+        coords = None
+        if self.sampling in SAMPLING_METHODS:
+            coords = sample_coords(*img_array.shape[:2], self.pixel_budget,
+                                   self.sampling, self.seed)
+        pixels = img_array[coords] if coords else img_array.reshape(-1, 3)
+        if not weighted:
+            return pixels
+
+        weights = None
+        if self.weighting:
+            weights = pixel_weights(img_array, alpha, coords)
+        elif alpha is not None:
+            weights = (alpha[coords] if coords else alpha.ravel()).astype(np.float32)
+        return pixels, weights
 
-        img_array = np.array(self.image)
-        pixels = img_array.reshape(-1, 3)
+    @staticmethod
+    def color_histogram(pixels, weights=None, color_tolerance=32, brightness_range=(20, 240)):
+        """Взвешенная гистограмма по ячейкам квантования (levels ** 3,)."""
+        if weights is not None and not weights.any():
+            # Полностью прозрачное изображение - считаем пиксели поровну
+            weights = None
 
         # Квантование цветов для группировки похожих
-        simplified = (pixels // color_tolerance) * color_tolerance
+        quantized = pixels // color_tolerance
+        simplified = quantized * color_tolerance
 
         # Фильтрация слишком темных и слишком светлых цветов
         brightness = np.mean(simplified, axis=1)
-        mask = (brightness > 20) & (brightness < 240)
-        filtered = simplified[mask] if mask.any() else simplified
-
-        # Подсчет цветов
-        color_counts = Counter(map(tuple, filtered))
-
-        # Отбор наиболее контрастных цветов
-        selected_colors = []
-        for color, count in color_counts.most_common(num_colors * 5):
-            if len(selected_colors) >= num_colors:
-                break
-
-            rgb_color = tuple(int(c) for c in color)
-
-            # Проверка контраста с уже выбранными цветами
-            if selected_colors:
-                min_contrast = min(
-                    self.get_color_distance(rgb_color, existing)
-                    for existing in selected_colors
-                )
-                if min_contrast < 70:
-                    continue
-
-            # Проверка на серость (слишком мало насыщенности)
-            h, s, l = self.rgb_to_hsl(rgb_color)
-            if s < 0.1:
-                continue
-
-            selected_colors.append(rgb_color)
-
-        return [self.rgb_to_hex(color) for color in selected_colors]
+        min_brightness, max_brightness = brightness_range
+        mask = (brightness > min_brightness) & (brightness < max_brightness)
+        if mask.any():
+            quantized = quantized[mask]
+            if weights is not None:
+                weights = weights[mask]
+
+        levels = 255 // color_tolerance + 1
+        q = quantized.astype(np.intp)
+        bins = (q[:, 0] * levels + q[:, 1]) * levels + q[:, 2]
+        return np.bincount(bins, weights=weights, minlength=levels ** 3)
+
+    def _histogram_colors(self, counts, num_colors, color_tolerance, distance, min_distance):
+        """Доминирующие цвета по гистограмме."""
+        distance = distance or self.distance
+        if min_distance is None:
+            min_distance = self.min_distance
+        levels = 255 // color_tolerance + 1
+        top = np.argsort(-counts, kind='stable')[:num_colors * self.candidate_factor]
+        top = top[counts[top] > 0]
+        cells = np.stack([top // (levels * levels), top // levels % levels, top % levels], axis=1)
+        candidates = (cells * color_tolerance).astype(np.uint8)
+
+        # Проверка на серость (слишком мало насыщенности) - для всех сразу
+        saturated = rgb_to_hsl(candidates)[:, 1] >= self.min_saturation
+
+        # Отбор наиболее контрастных цветов по матрице расстояний
+        selected = select_distinct(candidates, saturated, num_colors, distance, min_distance)
+
+        return [self.rgb_to_hex(tuple(int(c) for c in candidates[i])) for i in selected]
+
+    def is_animated(self):
+        """Анализируются ли несколько кадров изображения."""
+        if not self.frames or self.frames < 2:
+            return False
+        if self._animated is None:
+            with Image.open(self.image_path) as image:
+                self._animated = frame_count(image) > 1
+        return self._animated
+
+    def frame_histograms(self, color_tolerance=None):
+        """Гистограммы выбранных кадров анимации: [(индекс, гистограмма), ...]."""
+        color_tolerance = color_tolerance or self.color_tolerance
+        cached = self._frame_histograms
+        if cached is not None and cached[0] == color_tolerance:
+            return cached[1]
+
+        def process(frame):
+            image, alpha = self._prepare_image(frame)
+            pixels, weights = self._image_pixels(image, alpha, weighted=True)
+            return self.color_histogram(pixels, weights, color_tolerance, self.brightness_range)
+
+        with Image.open(self.image_path) as image:
+            histograms = process_frames(image, process, self.frames or DEFAULT_FRAMES,
+                                        self.frame_selection)
+        self._frame_histograms = (color_tolerance, histograms)
+        return histograms
+
+    def extract_colors(self, num_colors=8, color_tolerance=None, distance=None,
+                       min_distance=None):
+        """Извлечение доминирующих цветов.
+
+        distance - метрика отбора различающихся цветов: 'rgb'
+        (манхэттенская), 'oklab' или 'ciede2000'; min_distance
+        переопределяет порог метрики. Для анимации гистограммы
+        выбранных кадров суммируются. color_tolerance, distance и
+        min_distance по умолчанию - из параметров анализатора.
+        """
+        color_tolerance = color_tolerance or self.color_tolerance
+        counts = self.image_histogram(color_tolerance)
+        return self._histogram_colors(counts, num_colors, color_tolerance, distance, min_distance)
+
+    def image_histogram(self, color_tolerance=None):
+        """Гистограмма изображения (для анимации - сумма по выбранным кадрам)."""
+        color_tolerance = color_tolerance or self.color_tolerance
+        if self.is_animated():
+            return sum(h for _, h in self.frame_histograms(color_tolerance))
+        pixels, weights = self.get_pixels(weighted=True)
+        return self.color_histogram(pixels, weights, color_tolerance, self.brightness_range)
+
+    def extract_frame_colors(self, num_colors=8, color_tolerance=None, distance=None,
+                             min_distance=None):
+        """Палитры отдельных кадров анимации: [{'frame': i, 'colors': [...]}, ...]."""
+        color_tolerance = color_tolerance or self.color_tolerance
+        return [
+            {'frame': index,
+             'colors': self._histogram_colors(counts, num_colors, color_tolerance,
+                                              distance, min_distance)}
+            for index, counts in self.frame_histograms(color_tolerance)
+        ]
 
     @staticmethod
     def get_color_distance(color1, color2):
         """Расчет расстояния между цветами."""
         return sum(abs(a - b) for a, b in zip(color1, color2))
 
+    @staticmethod
+    def get_perceptual_distance(color1, color2):
+        """Расстояние между цветами в OKLab (x100) по 3D-таблице."""
+        lab1, lab2 = lut.oklab(np.array([color1, color2], dtype=np.uint8))
+        return float(np.linalg.norm(lab1 - lab2)) * 100
+
     def get_contrast_ratio(self, color1, color2):
         """Расчет контрастного соотношения (WCAG)."""
         rgb1 = self.hex_to_rgb(color1)
@@ -138,9 +333,14 @@ class ColorAnalyzer:
         best_pair = (colors[0], colors[1])
         best_contrast = 0
 
+        # Яркость считается один раз на цвет, а не на каждую пару
+        luminances = [self.calculate_luminance(unpack_rgb(to_packed(c))) for c in colors]
+
         for i in range(len(colors)):
             for j in range(i + 1, len(colors)):
-                contrast = self.get_contrast_ratio(colors[i], colors[j])
+                lighter = max(luminances[i], luminances[j])
+                darker = min(luminances[i], luminances[j])
+                contrast = (lighter + 0.05) / (darker + 0.05)
                 if contrast > best_contrast:
                     best_contrast = contrast
                     best_pair = (colors[i], colors[j])
@@ -149,173 +349,150 @@ class ColorAnalyzer:
 
     def generate_color_variations(self, base_color, variations_count=5):
         """Генерация вариаций цвета."""
-        rgb = self.hex_to_rgb(base_color)
-        h, s, l = self.rgb_to_hsl(rgb)
-
-        variations = {}
-
-        # Светлые варианты
-        variations['light'] = self.hsl_to_rgb((h, max(s * 0.4, 0.1), min(l * 1.4, 0.95)))
-        variations['lighter'] = self.hsl_to_rgb((h, max(s * 0.3, 0.05), min(l * 1.6, 0.98)))
+        rgb = unpack_array([to_packed(base_color)])
+        row = pack_array(variation_table(rgb))[0]
+
+        names = VARIATION_NAMES[:variations_count]
+        return Palette(row[:len(names)].tolist(), names=names)
+
+    def color_table(self, colors):
+        """Вариации и схемы сразу для всех цветов набора.
+
+        Возвращает словарь с упакованными массивами: 'variations' (N, 7)
+        и 'schemes' - имя схемы -> (N, K).
+        """
+        key = tuple(colors)
+        table = self._color_table_cache.get(key)
+        if table is None:
+            rgb = unpack_array([to_packed(c) for c in colors])
+            table = {
+                'index': {color: i for i, color in enumerate(colors)},
+                'variations': pack_array(variation_table(rgb)),
+                'schemes': {name: pack_array(values)
+                            for name, values in scheme_table(rgb).items()}
+            }
+            self._color_table_cache[key] = table
+        return table
+
+    def _theme_base(self, colors):
+        """Пара основных цветов, акценты и варианты - общие для всех режимов."""
+        key = tuple(colors)
+        base = self._theme_base_cache.get(key)
+        if base is None:
+            primary, secondary = self.select_base_colors(colors)
+            accent_colors = Palette([c for c in colors if c not in [primary, secondary]][:6])
+
+            # Вариации всех цветов одной пакетной операцией
+            table_colors = list(colors) + [c for c in (primary, secondary) if c not in colors]
+            table = self.color_table(table_colors)
+            names = VARIATION_NAMES[:5]
+            primary_row = table['variations'][table['index'][primary]]
+            secondary_row = table['variations'][table['index'][secondary]]
+
+            base = (
+                primary,
+                secondary,
+                accent_colors,
+                Palette(primary_row[:len(names)].tolist(), names=names),
+                Palette(secondary_row[:len(names)].tolist(), names=names)
+            )
+            self._theme_base_cache[key] = base
+        return base
 
-        # Темные варианты
-        variations['dark'] = self.hsl_to_rgb((h, min(s * 1.2, 1.0), max(l * 0.4, 0.1)))
-        variations['darker'] = self.hsl_to_rgb((h, min(s * 1.4, 1.0), max(l * 0.2, 0.05)))
+    def generate_theme(self, colors, mode='light'):
+        """Генерация полной темы."""
+        primary, secondary, accent_colors, primary_vars, secondary_vars = self._theme_base(colors)
 
-        # Насыщенные варианты
-        variations['vibrant'] = self.hsl_to_rgb((h, min(s * 1.3, 1.0), min(l * 1.1, 0.8)))
-        variations['muted'] = self.hsl_to_rgb((h, s * 0.6, l * 0.9))
+        if mode not in ('light', 'dark'):
+            mode = 'mixed'
+        name, mode_roles = _MODE_ROLES[mode]
 
-        # Комплиментарные цвета
-        variations['complementary'] = self.hsl_to_rgb(((h + 0.5) % 1.0, s, l))
+        roles = dict(mode_roles, primary=primary, secondary=secondary)
+        if mode == 'mixed':
+            roles['background'] = primary_vars.packed('lighter', 0xf0f0f0)
 
-        return {k: self.rgb_to_hex(v) for k, v in list(variations.items())[:variations_count]}
+        theme = Theme(name, mode, roles, primary_vars, secondary_vars, accent_colors)
+        if self.min_contrast:
+            theme = ensure_contrast(theme, self.min_contrast)
+        return theme
 
-    def generate_theme(self, colors, mode='light'):
-        """Генерация полной темы."""
-        primary, secondary = self.select_base_colors(colors)
-        accent_colors = [c for c in colors if c not in [primary, secondary]][:6]
-
-        primary_vars = self.generate_color_variations(primary)
-        secondary_vars = self.generate_color_variations(secondary)
-
-        if mode == 'light':
-            return {
-                'name': 'Light Theme',
-                'mode': 'light',
-                'primary': primary,
-                'primary_variants': primary_vars,
-                'secondary': secondary,
-                'secondary_variants': secondary_vars,
-                'accent_colors': accent_colors,
-                'background': '#ffffff',
-                'surface': '#f8f9fa',
-                'error': '#dc3545',
-                'warning': '#ffc107',
-                'success': '#28a745',
-                'info': '#17a2b8',
-                'on_primary': '#ffffff',
-                'on_secondary': '#ffffff',
-                'on_background': '#212529',
-                'on_surface': '#495057',
-                'on_error': '#ffffff'
-            }
-        elif mode == 'dark':
-            return {
-                'name': 'Dark Theme',
-                'mode': 'dark',
-                'primary': primary,
-                'primary_variants': primary_vars,
-                'secondary': secondary,
-                'secondary_variants': secondary_vars,
-                'accent_colors': accent_colors,
-                'background': '#121212',
-                'surface': '#1e1e1e',
-                'error': '#cf6679',
-                'warning': '#ffb74d',
-                'success': '#81c784',
-                'info': '#4fc3f7',
-                'on_primary': '#000000',
-                'on_secondary': '#000000',
-                'on_background': '#ffffff',
-                'on_surface': '#e0e0e0',
-                'on_error': '#000000'
-            }
-        else:  # mixed
-            return {
-                'name': 'Mixed Theme',
-                'mode': 'mixed',
-                'primary': primary,
-                'primary_variants': primary_vars,
-                'secondary': secondary,
-                'secondary_variants': secondary_vars,
-                'accent_colors': accent_colors,
-                'background': primary_vars.get('lighter', '#f0f0f0'),
-                'surface': '#ffffff',
-                'error': '#e53935',
-                'warning': '#fb8c00',
-                'success': '#43a047',
-                'info': '#1e88e5',
-                'on_primary': '#ffffff',
-                'on_secondary': '#000000',
-                'on_background': '#000000',
-                'on_surface': '#000000',
-                'on_error': '#ffffff'
-            }
+    @staticmethod
+    def _check_names(requested, allowed, kind):
+        if requested is None:
+            return allowed
+        unknown = [name for name in requested if name not in allowed]
+        if unknown:
+            raise ValueError(f"Неизвестные {kind}: {', '.join(unknown)}")
+        return tuple(requested)
+
+    def analyze(self, modes=None, schemes=None):
+        """Основной метод анализа.
+
+        Темы и схемы вычисляются лениво при первом обращении;
+        modes и schemes ограничивают набор доступных (и сериализуемых)
+        режимов и схем.
+        """
+        modes = self._check_names(modes, THEME_MODES, 'режимы')
+        schemes = self._check_names(schemes, SCHEME_TYPES, 'схемы')
 
-    def analyze(self):
-        """Основной метод анализа."""
         try:
-            self.load_image()
+            if self.image is None:
+                self.load_image()
             colors = self.extract_colors(10)
+            if not colors:
+                raise ValueError("не найдено ни одного насыщенного цвета")
 
-            themes = {
-                'light': self.generate_theme(colors, 'light'),
-                'dark': self.generate_theme(colors, 'dark'),
-                'mixed': self.generate_theme(colors, 'mixed')
-            }
-
-            return {
+            results = {
                 'source_image': str(self.image_path),
-                'image_size': self.image.size,
+                'image_size': self.image_size(),
                 'dominant_colors': colors,
                 'primary_pair': self.select_base_colors(colors),
-                'themes': themes,
-                'color_scheme': {
-                    'analogous': self.generate_analogous_scheme(colors[0]),
-                    'complementary': self.generate_complementary_scheme(colors[0]),
-                    'triadic': self.generate_triadic_scheme(colors[0])
-                }
+                'themes': LazyMapping(
+                    modes, lambda mode: self.generate_theme(colors, mode)
+                ),
+                'color_scheme': LazyMapping(
+                    schemes, lambda name: self._scheme_from_table(colors, name)
+                )
             }
+            if self.per_frame and self.is_animated():
+                results['frame_palettes'] = self.extract_frame_colors(10)
+            return results
 
         except Exception as e:
             print(f"Ошибка анализа: {e}")
-            return self.get_default_themes()
+            return self.get_default_themes(modes)
+
+    def _scheme_from_table(self, colors, name):
+        """Схема для первого доминирующего цвета из пакетной таблицы."""
+        row = self.color_table(colors)['schemes'][name][0]
+        return [packed_to_hex(value) for value in row.tolist()]
 
     def generate_analogous_scheme(self, base_color, num_colors=5):
         """Генерация аналогичной цветовой схемы."""
-        rgb = self.hex_to_rgb(base_color)
-        h, s, l = self.rgb_to_hsl(rgb)
-
-        scheme = []
-        step = 0.1  # 36 градусов
-
-        for i in range(-(num_colors // 2), num_colors // 2 + 1):
-            new_h = (h + i * step) % 1.0
-            scheme.append(self.rgb_to_hex(self.hsl_to_rgb((new_h, s, l))))
-
-        return scheme
+        rgb = unpack_array([to_packed(base_color)])
+        row = pack_array(hue_rotations(rgb, analogous_shifts(num_colors)))[0]
+        return [packed_to_hex(value) for value in row.tolist()]
 
     def generate_complementary_scheme(self, base_color):
         """Генерация комплиментарной схемы."""
-        rgb = self.hex_to_rgb(base_color)
-        h, s, l = self.rgb_to_hsl(rgb)
-
-        complementary_h = (h + 0.5) % 1.0
-        complementary = self.rgb_to_hex(self.hsl_to_rgb((complementary_h, s, l)))
-
-        return [base_color, complementary]
+        rgb = unpack_array([to_packed(base_color)])
+        row = pack_array(scheme_table(rgb)['complementary'])[0]
+        return [base_color] + [packed_to_hex(value) for value in row[1:].tolist()]
 
     def generate_triadic_scheme(self, base_color):
         """Генерация триадной схемы."""
-        rgb = self.hex_to_rgb(base_color)
-        h, s, l = self.rgb_to_hsl(rgb)
-
-        color1 = self.rgb_to_hex(self.hsl_to_rgb(((h + 1 / 3) % 1.0, s, l)))
-        color2 = self.rgb_to_hex(self.hsl_to_rgb(((h + 2 / 3) % 1.0, s, l)))
+        rgb = unpack_array([to_packed(base_color)])
+        row = pack_array(scheme_table(rgb)['triadic'])[0]
+        return [base_color] + [packed_to_hex(value) for value in row[1:].tolist()]
 
-        return [base_color, color1, color2]
-
-    def get_default_themes(self):
+    def get_default_themes(self, modes=THEME_MODES):
         """Резервные темы при ошибке."""
         colors = ['#3498db', '#2ecc71', '#e74c3c', '#f39c12', '#9b59b6', '#1abc9c']
 
         return {
             'dominant_colors': colors,
             'primary_pair': (colors[0], colors[1]),
-            'themes': {
-                'light': self.generate_theme(colors, 'light'),
-                'dark': self.generate_theme(colors, 'dark'),
-                'mixed': self.generate_theme(colors, 'mixed')
-            }
-        }
\ No newline at end of file
+            'themes': LazyMapping(
+                modes, lambda mode: self.generate_theme(colors, mode)
+            )
+        }
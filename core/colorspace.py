@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Векторные преобразования цветовых пространств на NumPy.
+
+Все функции принимают массивы формы (..., 3) и обрабатывают любое
+число цветов за одну операцию. RGB задается в uint8 (0-255) или во
+float (0-1); результаты - float64 в диапазоне 0-1. Порядок каналов
+HSL - (h, s, l), как у ColorAnalyzer.rgb_to_hsl. Формулы HLS
+повторяют colorsys, чтобы результаты совпадали с прежними.
+"""
+import numpy as np
+
+ONE_THIRD = 1.0 / 3.0
+ONE_SIXTH = 1.0 / 6.0
+TWO_THIRD = 2.0 / 3.0
+
+# Матрицы OKLab (Björn Ottosson)
+_LMS_FROM_LINEAR = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_OKLAB_FROM_LMS = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LMS_FROM_OKLAB = np.linalg.inv(_OKLAB_FROM_LMS)
+_LINEAR_FROM_LMS = np.linalg.inv(_LMS_FROM_LINEAR)
+
+_LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+
+def to_unit_rgb(rgb):
+    """RGB в float 0-1; целочисленные массивы считаются 0-255."""
+    rgb = np.asarray(rgb)
+    if rgb.dtype.kind in 'ui':
+        return rgb / 255.0
+    return rgb.astype(np.float64, copy=False)
+
+
+def to_uint8(rgb):
+    """float 0-1 -> uint8 с отбрасыванием дробной части, как int(x * 255)."""
+    return (np.clip(rgb, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def pack_array(rgb):
+    """(..., 3) uint8 -> (...) uint32 0xRRGGBB."""
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def unpack_array(packed):
+    """(...) 0xRRGGBB -> (..., 3) uint8."""
+    packed = np.asarray(packed, dtype=np.uint32)
+    return np.stack(
+        [(packed >> 16) & 0xff, (packed >> 8) & 0xff, packed & 0xff], axis=-1
+    ).astype(np.uint8)
+
+
+def rgb_to_hsl(rgb):
+    """RGB -> HSL (h, s, l)."""
+    rgb = to_unit_rgb(rgb)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    maxc = rgb.max(axis=-1)
+    minc = rgb.min(axis=-1)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+
+    gray = rangec == 0
+    safe_range = np.where(gray, 1.0, rangec)
+    s_low = rangec / np.where(gray, 1.0, sumc)
+    s_high = rangec / np.where(gray, 1.0, 2.0 - maxc - minc)
+    s = np.where(gray, 0.0, np.where(l <= 0.5, s_low, s_high))
+
+    rc = (maxc - r) / safe_range
+    gc = (maxc - g) / safe_range
+    bc = (maxc - b) / safe_range
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(gray, 0.0, (h / 6.0) % 1.0)
+
+    return np.stack([h, s, l], axis=-1)
+
+
+def _hls_channel(m1, m2, hue):
+    hue = hue % 1.0
+    return np.select(
+        [hue < ONE_SIXTH, hue < 0.5, hue < TWO_THIRD],
+        [m1 + (m2 - m1) * hue * 6.0, m2, m1 + (m2 - m1) * (TWO_THIRD - hue) * 6.0],
+        m1
+    )
+
+
+def hsl_to_rgb(hsl):
+    """HSL (h, s, l) -> RGB float 0-1."""
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h, s, l = hsl[..., 0], hsl[..., 1], hsl[..., 2]
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+
+    rgb = np.stack([
+        _hls_channel(m1, m2, h + ONE_THIRD),
+        _hls_channel(m1, m2, h),
+        _hls_channel(m1, m2, h - ONE_THIRD),
+    ], axis=-1)
+    gray = (s == 0.0)[..., None]
+    return np.where(gray, l[..., None], rgb)
+
+
+def rgb_to_hsv(rgb):
+    """RGB -> HSV (h, s, v)."""
+    rgb = to_unit_rgb(rgb)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    maxc = rgb.max(axis=-1)
+    minc = rgb.min(axis=-1)
+    rangec = maxc - minc
+
+    gray = rangec == 0
+    safe_range = np.where(gray, 1.0, rangec)
+    s = np.where(maxc == 0, 0.0, rangec / np.where(maxc == 0, 1.0, maxc))
+
+    rc = (maxc - r) / safe_range
+    gc = (maxc - g) / safe_range
+    bc = (maxc - b) / safe_range
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(gray, 0.0, (h / 6.0) % 1.0)
+
+    return np.stack([h, s, maxc], axis=-1)
+
+
+def hsv_to_rgb(hsv):
+    """HSV (h, s, v) -> RGB float 0-1."""
+    hsv = np.asarray(hsv, dtype=np.float64)
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    i = np.floor(h * 6.0)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i.astype(np.int64) % 6
+
+    conditions = [i == k for k in range(6)]
+    r = np.select(conditions, [v, q, p, p, t, v])
+    g = np.select(conditions, [t, v, v, q, p, p])
+    b = np.select(conditions, [p, p, t, v, v, q])
+    return np.stack([r, g, b], axis=-1)
+
+
+def srgb_to_linear(rgb):
+    """Гамма sRGB -> линейный RGB (порог WCAG 0.03928)."""
+    rgb = to_unit_rgb(rgb)
+    return np.where(rgb <= 0.03928, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear):
+    """Линейный RGB -> гамма sRGB."""
+    linear = np.clip(np.asarray(linear, dtype=np.float64), 0.0, 1.0)
+    return np.where(linear <= 0.0031308, linear * 12.92,
+                    1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def relative_luminance(rgb):
+    """Относительная яркость WCAG 2.0."""
+    return srgb_to_linear(rgb) @ _LUMINANCE_WEIGHTS
+
+
+def contrast_ratio(luminance1, luminance2):
+    """Контрастное соотношение WCAG по яркостям."""
+    lighter = np.maximum(luminance1, luminance2)
+    darker = np.minimum(luminance1, luminance2)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def rgb_to_oklab(rgb):
+    """RGB -> OKLab (L, a, b)."""
+    lms = srgb_to_linear(rgb) @ _LMS_FROM_LINEAR.T
+    return np.cbrt(lms) @ _OKLAB_FROM_LMS.T
+
+
+def oklab_to_rgb(lab):
+    """OKLab -> RGB float 0-1 (вне гаммы - обрезается)."""
+    lms = (np.asarray(lab, dtype=np.float64) @ _LMS_FROM_OKLAB.T) ** 3
+    return linear_to_srgb(lms @ _LINEAR_FROM_LMS.T)
+
+
+# Белая точка D65 для CIELab
+_XYZ_FROM_LINEAR = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def rgb_to_lab(rgb):
+    """RGB -> CIELab (L 0-100, a, b), D65."""
+    xyz = (srgb_to_linear(rgb) @ _XYZ_FROM_LINEAR.T) / _D65_WHITE
+    delta = 6 / 29
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4 / 29)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+def delta_e_2000(lab1, lab2):
+    """Цветовое различие CIEDE2000 между массивами CIELab (с broadcasting)."""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    l1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    l2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25.0 ** 7)))
+    a1p = a1 * (1 + g)
+    a2p = a2 * (1 + g)
+    c1p = np.hypot(a1p, b1)
+    c2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dl = l2 - l1
+    dc = c2p - c1p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c1p * c2p == 0, 0.0, dh)
+    dh_big = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh / 2))
+
+    l_mean = (l1 + l2) / 2
+    cp_mean = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    hp_mean = np.where(
+        c1p * c2p == 0, h_sum,
+        np.where(np.abs(h1p - h2p) <= 180, h_sum / 2,
+                 np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2))
+    )
+
+    t = (1 - 0.17 * np.cos(np.radians(hp_mean - 30))
+         + 0.24 * np.cos(np.radians(2 * hp_mean))
+         + 0.32 * np.cos(np.radians(3 * hp_mean + 6))
+         - 0.20 * np.cos(np.radians(4 * hp_mean - 63)))
+    d_theta = 30 * np.exp(-(((hp_mean - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt(cp_mean ** 7 / (cp_mean ** 7 + 25.0 ** 7))
+    s_l = 1 + 0.015 * (l_mean - 50) ** 2 / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * cp_mean
+    s_h = 1 + 0.015 * cp_mean * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+
+    return np.sqrt(
+        (dl / s_l) ** 2 + (dc / s_c) ** 2 + (dh_big / s_h) ** 2
+        + r_t * (dc / s_c) * (dh_big / s_h)
+    )
+
+
+def oklab_to_oklch(lab):
+    """OKLab -> OKLCH (L, C, h), h в долях оборота 0-1."""
+    lab = np.asarray(lab, dtype=np.float64)
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    hue = (np.arctan2(lab[..., 2], lab[..., 1]) / (2 * np.pi)) % 1.0
+    return np.stack([lab[..., 0], chroma, hue], axis=-1)
+
+
+def oklch_to_oklab(lch):
+    """OKLCH -> OKLab."""
+    lch = np.asarray(lch, dtype=np.float64)
+    angle = lch[..., 2] * 2 * np.pi
+    return np.stack(
+        [lch[..., 0], lch[..., 1] * np.cos(angle), lch[..., 1] * np.sin(angle)], axis=-1
+    )
+
+
+def rgb_to_oklch(rgb):
+    return oklab_to_oklch(rgb_to_oklab(rgb))
+
+
+def oklch_to_rgb(lch):
+    return oklab_to_rgb(oklch_to_oklab(lch))
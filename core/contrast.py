@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Подбор цветов текста (on_*) с гарантированным контрастом WCAG.
+
+Для каждой пары фон/текст ищется цвет, ближайший по светлоте OKLab
+к желаемому оттенку, у которого контраст с фоном не ниже целевого.
+Кандидаты - сетка светлоты с сохранением цветности и тона; все пары
+всех тем проверяются одной векторной операцией, а яркость берется
+из таблицы линеаризации sRGB (core.lut).
+"""
+import numpy as np
+
+from core.colorspace import oklab_to_oklch, oklch_to_rgb, pack_array, rgb_to_oklab, unpack_array
+from core.lut import luminance
+from core.theme import as_theme
+
+# WCAG AA для обычного текста
+DEFAULT_TARGET = 4.5
+
+# Роль фона -> роль текста поверх него
+CONTRAST_PAIRS = (
+    ('primary', 'on_primary'),
+    ('secondary', 'on_secondary'),
+    ('background', 'on_background'),
+    ('surface', 'on_surface'),
+    ('error', 'on_error'),
+)
+
+LIGHTNESS_STEPS = 101
+
+
+def solve_foregrounds(backgrounds, desired, target=DEFAULT_TARGET, steps=LIGHTNESS_STEPS):
+    """Цвета текста для N пар: упакованные массивы (N,) -> (N,).
+
+    Если желаемый цвет уже дает нужный контраст, он возвращается без
+    изменений. Если ни один кандидат не подходит, выбирается черный или
+    белый - что контрастнее.
+    """
+    backgrounds = np.asarray(backgrounds, dtype=np.uint32).reshape(-1)
+    desired = np.asarray(desired, dtype=np.uint32).reshape(-1)
+    desired_rgb = unpack_array(desired)
+
+    lch = oklab_to_oklch(rgb_to_oklab(desired_rgb))
+    grid = np.linspace(0.0, 1.0, steps)
+
+    # Кандидаты (N, steps + 1): сам желаемый цвет и сетка светлоты
+    candidates_lch = np.repeat(lch[:, None, :], steps, axis=1)
+    candidates_lch[..., 0] = grid
+    grid_rgb = np.rint(oklch_to_rgb(candidates_lch) * 255).astype(np.uint8)
+    candidates = np.concatenate([desired_rgb[:, None, :], grid_rgb], axis=1)
+    distances = np.concatenate(
+        [np.zeros((len(desired), 1)), np.abs(grid[None, :] - lch[:, 0:1])], axis=1
+    )
+
+    bg_luminance = luminance(unpack_array(backgrounds))[:, None]
+    fg_luminance = luminance(candidates)
+    ratios = (np.maximum(bg_luminance, fg_luminance) + 0.05) / \
+             (np.minimum(bg_luminance, fg_luminance) + 0.05)
+
+    passing = ratios >= target
+    best = np.argmin(np.where(passing, distances, np.inf), axis=1)
+    result = pack_array(candidates[np.arange(len(desired)), best])
+
+    # Недостижимый контраст: черный или белый
+    failed = ~passing.any(axis=1)
+    if failed.any():
+        bg = bg_luminance[failed, 0]
+        white_better = (1.05 / (bg + 0.05)) >= ((bg + 0.05) / 0.05)
+        result[failed] = np.where(white_better, 0xffffff, 0x000000)
+
+    return result
+
+
+def ensure_contrast_many(themes, target=DEFAULT_TARGET):
+    """Исправление on_* ролей сразу для списка тем одной векторной операцией."""
+    themes = [as_theme(theme) for theme in themes]
+    if not themes:
+        return []
+
+    backgrounds = []
+    desired = []
+    for theme in themes:
+        for background_role, text_role in CONTRAST_PAIRS:
+            backgrounds.append(theme.packed(background_role, 0xffffff))
+            desired.append(theme.packed(text_role, 0x000000))
+
+    solved = solve_foregrounds(backgrounds, desired, target).tolist()
+
+    fixed = []
+    pairs = len(CONTRAST_PAIRS)
+    for i, theme in enumerate(themes):
+        values = solved[i * pairs:(i + 1) * pairs]
+        current = desired[i * pairs:(i + 1) * pairs]
+        if values == current:
+            fixed.append(theme)
+        else:
+            fixed.append(theme.with_roles(**{
+                text_role: value for (_, text_role), value in zip(CONTRAST_PAIRS, values)
+            }))
+    return fixed
+
+
+def ensure_contrast(theme, target=DEFAULT_TARGET):
+    """Тема, у которой все on_* роли читаемы на своих фонах."""
+    return ensure_contrast_many([theme], target)[0]
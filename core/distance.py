@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Матрицы расстояний между наборами цветов.
+
+Расстояния считаются сразу для всех пар кандидатов одной векторной
+операцией. Координаты Lab и OKLab берутся из общих таблиц core.lut.
+"""
+import numpy as np
+
+from core import lut
+from core.colorspace import delta_e_2000
+
+# Порог "визуально разные цвета" для каждой метрики
+DISTANCE_THRESHOLDS = {
+    'rgb': 70,          # манхэттенское расстояние в RGB (прежнее поведение)
+    'oklab': 0.08,      # евклидово расстояние в OKLab
+    'ciede2000': 10.0,  # CIEDE2000
+}
+
+DISTANCE_METRICS = tuple(DISTANCE_THRESHOLDS)
+
+
+def _coordinates(rgb, metric):
+    """Координаты цветов в пространстве метрики."""
+    if metric == 'rgb':
+        return rgb.astype(np.int32)
+    if metric == 'oklab':
+        return lut.oklab(rgb).astype(np.float64)
+    if metric == 'ciede2000':
+        return lut.lab(rgb).astype(np.float64)
+    raise ValueError(f"Неизвестная метрика расстояния: {metric}")
+
+
+def _distances(coords_a, coords_b, metric):
+    if metric == 'rgb':
+        return np.abs(coords_a - coords_b).sum(axis=-1)
+    if metric == 'oklab':
+        return np.sqrt(((coords_a - coords_b) ** 2).sum(axis=-1))
+    return delta_e_2000(coords_a, coords_b)
+
+
+def distance_matrix(rgb_a, rgb_b, metric='rgb'):
+    """Матрица расстояний (N, M) между uint8 RGB (N, 3) и (M, 3)."""
+    coords_a = _coordinates(np.asarray(rgb_a, dtype=np.uint8).reshape(-1, 3), metric)
+    coords_b = _coordinates(np.asarray(rgb_b, dtype=np.uint8).reshape(-1, 3), metric)
+    return _distances(coords_a[:, None, :], coords_b[None, :, :], metric)
+
+
+def select_distinct(rgb, eligible, count, metric='rgb', threshold=None):
+    """Жадный отбор до count цветов, попарно далеких не меньше threshold.
+
+    Кандидаты rgb идут по убыванию приоритета; eligible - маска
+    допустимых. Координаты всех кандидатов вычисляются один раз; на
+    каждом шаге считается одна строка матрицы "выбранный x кандидаты"
+    и обновляются минимальные расстояния. Возвращает индексы
+    выбранных кандидатов.
+    """
+    if threshold is None:
+        threshold = DISTANCE_THRESHOLDS[metric]
+
+    eligible = np.asarray(eligible, dtype=bool).copy()
+    if not eligible.any() or count <= 0:
+        return []
+
+    coords = _coordinates(np.asarray(rgb, dtype=np.uint8).reshape(-1, 3), metric)
+    min_distance = np.full(len(eligible), np.inf)
+
+    selected = []
+    while len(selected) < count:
+        candidates = eligible & (min_distance >= threshold)
+        if not candidates.any():
+            break
+        index = int(np.argmax(candidates))
+        selected.append(index)
+        eligible[index] = False
+        min_distance = np.minimum(min_distance, _distances(coords[index], coords, metric))
+
+    return selected
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Экспорт темы в форматы конфигураций.
+
+Шаблоны компилируются один раз при импорте в список фрагментов и
+полей. Для темы один раз вычисляется словарь значений, после чего
+все запрошенные форматы собираются простым join. Файлы пишутся
+атомарно и не перезаписываются, если хэш содержимого не изменился.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from core.theme import as_theme, json_default, packed_to_hex, scale_packed
+
+_FIELD_RE = re.compile(r'\$\{(\w+)(?::(\w+))?\}')
+
+# Модификаторы полей: ${primary:bare} -> rrggbb
+_MODIFIERS = {
+    None: lambda value: value,
+    'bare': lambda value: value.lstrip('#'),
+}
+
+
+class CompiledTemplate:
+    """Шаблон с полями ${name} или ${name:modifier}, разобранный заранее."""
+
+    __slots__ = ('parts', 'fields')
+
+    def __init__(self, text):
+        self.parts = []
+        self.fields = set()
+        position = 0
+        for match in _FIELD_RE.finditer(text):
+            if match.start() > position:
+                self.parts.append((None, text[position:match.start()]))
+            name, modifier = match.group(1), match.group(2)
+            if modifier not in _MODIFIERS:
+                raise ValueError(f"Неизвестный модификатор поля: {modifier}")
+            self.parts.append((name, _MODIFIERS[modifier]))
+            self.fields.add(name)
+            position = match.end()
+        if position < len(text):
+            self.parts.append((None, text[position:]))
+
+    def render(self, values):
+        return ''.join(
+            part if name is None else part(values[name])
+            for name, part in self.parts
+        )
+
+
+_CSS = """/* ${title} */
+:root {
+  --theme-primary: ${primary};
+  --theme-secondary: ${secondary};
+  --theme-background: ${background};
+  --theme-surface: ${surface};
+  --theme-error: ${error};
+  --theme-warning: ${warning};
+  --theme-success: ${success};
+  --theme-info: ${info};
+  --theme-on-primary: ${on_primary};
+  --theme-on-secondary: ${on_secondary};
+  --theme-on-background: ${on_background};
+  --theme-on-surface: ${on_surface};
+  --theme-on-error: ${on_error};
+}
+"""
+
+_GTK = """/* ${title} */
+@define-color accent_color ${primary};
+@define-color accent_bg_color ${primary};
+@define-color accent_fg_color ${on_primary};
+@define-color window_bg_color ${background};
+@define-color window_fg_color ${on_background};
+@define-color view_bg_color ${surface};
+@define-color view_fg_color ${on_surface};
+@define-color headerbar_bg_color ${surface};
+@define-color headerbar_fg_color ${on_surface};
+@define-color card_bg_color ${surface};
+@define-color card_fg_color ${on_surface};
+@define-color popover_bg_color ${surface};
+@define-color popover_fg_color ${on_surface};
+@define-color destructive_color ${error};
+@define-color error_color ${error};
+@define-color warning_color ${warning};
+@define-color success_color ${success};
+@define-color theme_selected_bg_color ${primary};
+@define-color theme_selected_fg_color ${on_primary};
+"""
+
+_XRESOURCES = """! ${title}
+*.background: ${background}
+*.foreground: ${on_background}
+*.cursorColor: ${primary}
+*.color0: ${color0}
+*.color1: ${color1}
+*.color2: ${color2}
+*.color3: ${color3}
+*.color4: ${color4}
+*.color5: ${color5}
+*.color6: ${color6}
+*.color7: ${color7}
+*.color8: ${color8}
+*.color9: ${color9}
+*.color10: ${color10}
+*.color11: ${color11}
+*.color12: ${color12}
+*.color13: ${color13}
+*.color14: ${color14}
+*.color15: ${color15}
+"""
+
+_KITTY = """# ${title}
+background ${background}
+foreground ${on_background}
+cursor ${primary}
+selection_background ${primary}
+selection_foreground ${on_primary}
+color0 ${color0}
+color1 ${color1}
+color2 ${color2}
+color3 ${color3}
+color4 ${color4}
+color5 ${color5}
+color6 ${color6}
+color7 ${color7}
+color8 ${color8}
+color9 ${color9}
+color10 ${color10}
+color11 ${color11}
+color12 ${color12}
+color13 ${color13}
+color14 ${color14}
+color15 ${color15}
+"""
+
+_ALACRITTY = """# ${title}
+[colors.primary]
+background = "${background}"
+foreground = "${on_background}"
+
+[colors.cursor]
+cursor = "${primary}"
+text = "${on_primary}"
+
+[colors.selection]
+background = "${primary}"
+text = "${on_primary}"
+
+[colors.normal]
+black = "${color0}"
+red = "${color1}"
+green = "${color2}"
+yellow = "${color3}"
+blue = "${color4}"
+magenta = "${color5}"
+cyan = "${color6}"
+white = "${color7}"
+
+[colors.bright]
+black = "${color8}"
+red = "${color9}"
+green = "${color10}"
+yellow = "${color11}"
+blue = "${color12}"
+magenta = "${color13}"
+cyan = "${color14}"
+white = "${color15}"
+"""
+
+_FOOT = """# ${title}
+[colors]
+background=${background:bare}
+foreground=${on_background:bare}
+selection-background=${primary:bare}
+selection-foreground=${on_primary:bare}
+regular0=${color0:bare}
+regular1=${color1:bare}
+regular2=${color2:bare}
+regular3=${color3:bare}
+regular4=${color4:bare}
+regular5=${color5:bare}
+regular6=${color6:bare}
+regular7=${color7:bare}
+bright0=${color8:bare}
+bright1=${color9:bare}
+bright2=${color10:bare}
+bright3=${color11:bare}
+bright4=${color12:bare}
+bright5=${color13:bare}
+bright6=${color14:bare}
+bright7=${color15:bare}
+"""
+
+_KDE = """[ColorScheme]
+Name=${basename}
+ColorPalette=${primary},${secondary}
+
+[General]
+accent=${primary}
+accentBackground=${primary}
+background=${background}
+decoration=${primary}
+foreground=${on_background}
+viewBackground=${surface}
+
+[Colors:Button]
+BackgroundNormal=${primary}
+BackgroundAlternate=${primary_dark}
+ForegroundNormal=${on_background}
+ForegroundActive=${on_background}
+ForegroundDisabled=#666666
+ForegroundLink=${secondary}
+ForegroundNegative=#da4453
+ForegroundNeutral=#f67400
+ForegroundPositive=#27ae60
+ForegroundVisited=${secondary_light}
+
+[Colors:Selection]
+BackgroundNormal=${primary}
+BackgroundAlternate=${primary_dark}
+ForegroundNormal=${on_background}
+
+[Colors:Window]
+BackgroundNormal=${background}
+BackgroundAlternate=${surface}
+ForegroundNormal=${on_background}
+ForegroundActive=${on_background}
+ForegroundInactive=#666666
+
+[Colors:View]
+BackgroundNormal=${surface}
+BackgroundAlternate=${background}
+ForegroundNormal=${on_surface}
+ForegroundInactive=#666666
+ForegroundLink=${secondary}
+
+[Colors:Tooltip]
+BackgroundNormal=${primary}
+BackgroundAlternate=${primary_dark}
+ForegroundNormal=${on_background}
+
+[Colors:Complementary]
+BackgroundNormal=${secondary}
+BackgroundAlternate=${secondary_dark}
+ForegroundNormal=${on_background}
+
+[WM]
+activeBackground=${primary}
+activeForeground=${on_background}
+inactiveBackground=${background}
+inactiveForeground=#666666
+"""
+
+# Формат -> (шаблон имени файла, скомпилированный шаблон содержимого)
+FORMATS = {
+    'css': ('{basename}.css', CompiledTemplate(_CSS)),
+    'gtk': ('{basename}-gtk.css', CompiledTemplate(_GTK)),
+    'xresources': ('{basename}.Xresources', CompiledTemplate(_XRESOURCES)),
+    'kitty': ('{basename}-kitty.conf', CompiledTemplate(_KITTY)),
+    'alacritty': ('{basename}-alacritty.toml', CompiledTemplate(_ALACRITTY)),
+    'foot': ('{basename}-foot.ini', CompiledTemplate(_FOOT)),
+    'kde': ('{basename}.colors', CompiledTemplate(_KDE)),
+}
+
+# Значения ролей, если в теме их нет (как у адаптеров)
+ROLE_DEFAULTS = {
+    'primary': 0x2980b9, 'secondary': 0x2ecc71,
+    'background': 0xffffff, 'surface': 0xf8f9fa,
+    'error': 0xdc3545, 'warning': 0xffc107, 'success': 0x28a745, 'info': 0x17a2b8,
+    'on_primary': 0xffffff, 'on_secondary': 0xffffff,
+    'on_background': 0x000000, 'on_surface': 0x000000, 'on_error': 0xffffff,
+}
+
+# Роли для 16 цветов терминала: 0-7 обычные, 8-15 - осветленные
+_ANSI_ROLES = ('background', 'error', 'success', 'warning',
+               'primary', 'secondary', 'info', 'on_background')
+
+
+def default_export_dir():
+    """Директория экспорта по умолчанию."""
+    return Path.home() / '.local' / 'share' / 'theme-installer' / 'exports'
+
+
+def kde_scheme_name(theme):
+    """Имя цветовой схемы KDE для темы."""
+    return f"Custom_{theme.name.replace(' ', '_')}_{theme.mode}"
+
+
+def theme_values(theme, basename):
+    """Все значения для шаблонов, вычисленные один раз на тему."""
+    theme = as_theme(theme)
+    packed = {role: theme.packed(role, default) for role, default in ROLE_DEFAULTS.items()}
+
+    values = {role: packed_to_hex(value) for role, value in packed.items()}
+    values['title'] = f"{theme.name} ({theme.mode})"
+    values['basename'] = basename
+    values['primary_dark'] = packed_to_hex(scale_packed(packed['primary'], 0.9))
+    values['secondary_dark'] = packed_to_hex(scale_packed(packed['secondary'], 0.9))
+    values['secondary_light'] = packed_to_hex(scale_packed(packed['secondary'], 1.2))
+
+    for i, role in enumerate(_ANSI_ROLES):
+        values[f'color{i}'] = values[role]
+        values[f'color{i + 8}'] = packed_to_hex(scale_packed(packed[role], 1.2))
+    # Яркий черный - серый текст/поверхность, а не осветленный фон
+    values['color8'] = values['surface' if theme.mode == 'dark' else 'on_surface']
+    return values
+
+
+def write_if_changed(path, content, hash_cache=None):
+    """Атомарная запись текста или байтов; False, если содержимое не изменилось."""
+    path = Path(path)
+    data = content if isinstance(content, bytes) else content.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+
+    cached = hash_cache.get(path) if hash_cache is not None else None
+    if cached is None and path.exists():
+        cached = hashlib.sha256(path.read_bytes()).hexdigest()
+    if cached == digest:
+        if hash_cache is not None:
+            hash_cache[path] = digest
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+    if hash_cache is not None:
+        hash_cache[path] = digest
+    return True
+
+
+class ThemeExporter:
+    """Рендер и запись темы сразу во все запрошенные форматы."""
+
+    def __init__(self, formats=None):
+        formats = list(formats) if formats else list(FORMATS)
+        unknown = [f for f in formats if f not in FORMATS]
+        if unknown:
+            raise ValueError(f"Неизвестные форматы: {', '.join(unknown)}")
+        self.formats = formats
+        # Хэши записанных файлов: повторная проверка без чтения с диска
+        self._hashes = {}
+
+    def render(self, theme, basename='theme'):
+        """Формат -> содержимое; значения темы вычисляются один раз."""
+        values = theme_values(theme, basename)
+        return {fmt: FORMATS[fmt][1].render(values) for fmt in self.formats}
+
+    def export(self, theme, directory, basename=None):
+        """Запись всех форматов; формат -> (путь, был ли файл записан)."""
+        theme = as_theme(theme)
+        basename = basename or kde_scheme_name(theme)
+        directory = Path(directory)
+
+        written = {}
+        for fmt, content in self.render(theme, basename).items():
+            path = directory / FORMATS[fmt][0].format(basename=basename)
+            written[fmt] = (path, write_if_changed(path, content, self._hashes))
+        return written
+
+
+def write_ndjson(items, stream):
+    """Потоковая запись результатов: одна строка JSON на элемент."""
+    count = 0
+    for item in items:
+        stream.write(json.dumps(item, ensure_ascii=False, default=json_default))
+        stream.write('\n')
+        stream.flush()
+        count += 1
+    return count
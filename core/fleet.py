@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Применение одной темы к профилям многих пользователей (режим fleet).
+
+Изображение анализируется один раз, затем тема применяется к каждому
+профилю в ограниченном пуле потоков. Адаптеры работают в режиме
+offline: в профиль пишутся только файлы (конфигурация, схемы, XML
+каналов, ключи dconf и скрипт автозапуска для того, что применяется
+в сеансе пользователя). Обои копируются в профиль, чтобы пользователь
+мог их прочитать.
+
+При запуске от root каждый профиль обрабатывается в отдельном
+процессе, который открывает обои и сразу переходит на uid/gid
+владельца профиля: все записи в профиль идут с его правами, поэтому
+символические ссылки в профиле не дают записать или сменить владельца
+файлов вне его, а менять владельца после записи не нужно.
+"""
+import hashlib
+import importlib
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+from adapters.registry import load_adapter_class
+from core.theme import as_theme
+from core.theme_manager import ThemeManager
+
+DEFAULT_WORKERS = 8
+
+# Каталог обоев внутри профиля
+WALLPAPER_DIR = Path('.local') / 'share' / 'backgrounds' / 'theme-installer'
+
+# Модули, которые адаптеры импортируют лениво: в процессе профиля они
+# загружаются до смены пользователя (каталог кода может быть ему недоступен)
+PRELOAD_MODULES = ('adapters.gsettings', 'core.exporter', 'core.gtk_theme')
+
+
+def _running_as_root():
+    return hasattr(os, 'geteuid') and os.geteuid() == 0
+
+
+def copy_wallpaper(wallpaper_path, home, source_file=None):
+    """Копия обоев в профиле (жесткая ссылка, если возможно).
+
+    source_file - уже открытый файл обоев (открывается до смены
+    пользователя, когда исходник ему недоступен). Имя копии содержит
+    хэш пути исходника: обои с одинаковым именем из разных каталогов
+    не заменяют друг друга.
+    """
+    source = Path(wallpaper_path)
+    prefix = hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:12]
+    target = Path(home) / WALLPAPER_DIR / f"{prefix}-{source.name}"
+    stat = os.fstat(source_file.fileno()) if source_file else source.stat()
+    if target.exists():
+        target_stat = target.stat()
+        if (stat.st_dev, stat.st_ino) == (target_stat.st_dev, target_stat.st_ino):
+            return target
+        if stat.st_size == target_stat.st_size and stat.st_mtime_ns == target_stat.st_mtime_ns:
+            return target
+        target.unlink()
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if source_file is None:
+        try:
+            os.link(source, target)
+            return target
+        except OSError:
+            shutil.copy2(source, target)
+            return target
+    with open(target, 'wb') as f:
+        shutil.copyfileobj(source_file, f)
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return target
+
+
+def drop_privileges(home):
+    """Переход процесса на пользователя и группы владельца профиля."""
+    import pwd
+
+    owner = os.stat(home)
+    uid, gid = owner.st_uid, owner.st_gid
+    try:
+        os.initgroups(pwd.getpwuid(uid).pw_name, gid)
+    except KeyError:
+        os.setgroups([])
+    os.setgid(gid)
+    os.setuid(uid)
+    os.environ['HOME'] = str(home)
+
+
+def apply_profile(home, platform, theme_data, wallpapers, history=None, source_files=None):
+    """Применение темы к одному профилю: {'home', 'success', 'duration_ms', 'error'}."""
+    start = time.perf_counter()
+    success, error = False, None
+    try:
+        files = source_files or [None] * len(wallpapers)
+        local = [str(copy_wallpaper(path, home, file)) for path, file in zip(wallpapers, files)]
+        manager = ThemeManager(platform, history=history, home=home)
+        try:
+            success = manager.apply_theme(theme_data, local if len(local) > 1 else (local or [None])[0])
+        finally:
+            manager.close()
+    except Exception as e:
+        error = str(e)
+    return {
+        'home': str(home),
+        'success': bool(success),
+        'duration_ms': (time.perf_counter() - start) * 1000,
+        'error': error,
+    }
+
+
+def _apply_as_owner(home, platform, theme_data, wallpapers):
+    """apply_profile в дочернем процессе root от имени владельца профиля."""
+    start = time.perf_counter()
+    try:
+        # Обои и модуль адаптера открываются до смены пользователя:
+        # кэш и каталоги root ему могут быть недоступны
+        files = [open(path, 'rb') for path in wallpapers]
+        load_adapter_class(platform)
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+        drop_privileges(home)
+    except Exception as e:
+        return {'home': str(home), 'success': False,
+                'duration_ms': (time.perf_counter() - start) * 1000, 'error': str(e)}
+    try:
+        return apply_profile(home, platform, theme_data, wallpapers, history=False,
+                             source_files=files)
+    finally:
+        for file in files:
+            file.close()
+
+
+def _apply_isolated(home, platform, theme_data, wallpapers, history):
+    """Профиль в отдельном процессе (процесс не переиспользуется после смены uid)."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        try:
+            report = executor.submit(_apply_as_owner, str(home), platform, theme_data,
+                                     wallpapers).result()
+        except Exception as e:
+            report = {'home': str(home), 'success': False, 'duration_ms': 0.0, 'error': str(e)}
+    if history:
+        history.record('apply', platform=platform, image_path=wallpapers[0] if wallpapers else None,
+                       mode=as_theme(theme_data).mode,
+                       params={'wallpapers': wallpapers, 'home': str(home)}, theme=theme_data,
+                       duration_ms=report['duration_ms'], success=report['success'],
+                       error=report['error'])
+    return report
+
+
+def apply_fleet(theme_data, wallpapers, homes, platform, workers=None, history=None,
+                prescale=False, screen_sizes=None):
+    """Применение темы ко всем профилям; результаты по мере готовности.
+
+    wallpapers - путь или список путей обоев (по одному на монитор);
+    с prescale обои один раз приводятся к разрешению мониторов и уже
+    готовые копии раскладываются по профилям.
+    """
+    homes = [Path(home) for home in homes]
+    if wallpapers is None:
+        wallpapers = []
+    elif isinstance(wallpapers, (str, os.PathLike)):
+        wallpapers = [wallpapers]
+    wallpapers = [str(path) for path in wallpapers]
+
+    if prescale and wallpapers:
+        from core.wallpaper import prescale_wallpapers
+        wallpapers = prescale_wallpapers(wallpapers, screen_sizes)
+
+    if _running_as_root():
+        if history is None:
+            from core.history import get_history
+            history = get_history()
+        task = _apply_isolated
+    else:
+        task = apply_profile
+
+    workers = max(1, min(workers or DEFAULT_WORKERS, len(homes) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(task, home, platform, theme_data, wallpapers, history)
+                   for home in homes]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Выбор и обработка кадров анимированных изображений (GIF, WebP).
+
+Кадры GIF и WebP собираются поверх предыдущих, поэтому декодирование
+последовательно: один поток проходит по кадрам, а копии выбранных
+кадров обрабатываются (преобразование, уменьшение, гистограмма) в пуле
+потоков. В полете держится не больше окна кадров, так что память не
+зависит от их числа.
+
+Выбор кадров:
+- 'even' - равномерно по длительности;
+- 'scene' - кадры с наибольшим изменением миниатюры относительно
+  предыдущего кадра (первый кадр берется всегда).
+"""
+import heapq
+import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+FRAME_SELECTIONS = ('even', 'scene')
+DEFAULT_FRAMES = 8
+# Миниатюра для оценки смены сцены
+SCENE_THUMBNAIL = (32, 32)
+
+
+def frame_count(image):
+    """Число кадров изображения (1 для статичных)."""
+    return getattr(image, 'n_frames', 1)
+
+
+def even_indices(total, count):
+    """count индексов кадров, равномерно покрывающих [0, total)."""
+    count = max(1, min(count, total))
+    return sorted(set(np.linspace(0, total - 1, count).round().astype(int).tolist()))
+
+
+def _thumbnail(frame):
+    return np.asarray(frame.convert('RGB').resize(SCENE_THUMBNAIL, Image.Resampling.BOX),
+                      dtype=np.int16)
+
+
+def _drain(pending, window):
+    """Дождаться старых задач, пока в полете больше window кадров."""
+    while len(pending) > window:
+        future = pending.popleft()
+        if not future.cancelled():
+            future.result()
+
+
+def process_frames(image, process, count=DEFAULT_FRAMES, selection='even',
+                   workers=None, window=None):
+    """Обработка выбранных кадров: [(индекс, process(кадр)), ...] по порядку.
+
+    process получает независимую копию кадра и выполняется в пуле
+    потоков; результаты должны быть небольшими (гистограммы).
+    """
+    if selection not in FRAME_SELECTIONS:
+        raise ValueError(f"Неизвестный выбор кадров: {selection}")
+
+    total = frame_count(image)
+    count = max(1, min(count, total))
+    workers = workers or min(count, os.cpu_count() or 1)
+    window = window or workers * 2
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        if selection == 'even':
+            selected = {}
+            for index in even_indices(total, count):
+                image.seek(index)
+                future = pool.submit(process, image.copy())
+                selected[index] = future
+                pending.append(future)
+                _drain(pending, window)
+        else:
+            # Куча лучших count кадров по изменению сцены; вытесненные
+            # кадры отменяются, если еще не обработаны
+            heap = []
+            previous = None
+            for index in range(total):
+                image.seek(index)
+                thumb = _thumbnail(image)
+                score = math.inf if previous is None else float(np.abs(thumb - previous).mean())
+                previous = thumb
+
+                if len(heap) >= count and score <= heap[0][0]:
+                    continue
+                future = pool.submit(process, image.copy())
+                if len(heap) < count:
+                    heapq.heappush(heap, (score, index, future))
+                else:
+                    heapq.heapreplace(heap, (score, index, future))[2].cancel()
+                pending.append(future)
+                _drain(pending, window)
+            selected = {index: future for _, index, future in heap}
+
+        return [(index, selected[index].result()) for index in sorted(selected)]
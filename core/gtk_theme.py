@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Генератор темы GTK3/GTK4.
+
+Тема состоит из двух файлов:
+- palette.css - только @define-color с цветами темы (несколько сотен
+  байт), рендерится скомпилированным шаблоном экспорта 'gtk';
+- gtk.css - статическая таблица стилей виджетов, которая импортирует
+  палитру и ссылается на цвета по именам. Она не зависит от темы и
+  записывается один раз.
+Смена темы переписывает только палитру. gtk-4.0 ссылается на файлы
+gtk-3.0 символическими ссылками; файлы с тем же содержимым не
+перезаписываются.
+"""
+import os
+from pathlib import Path
+
+from core.exporter import FORMATS, kde_scheme_name, theme_values, write_if_changed
+from core.theme import as_theme
+
+GTK_THEME_NAME = 'custom-gnome-theme'
+PALETTE_FILE = 'palette.css'
+STYLESHEET_FILE = 'gtk.css'
+
+# Палитра - шаблон формата экспорта 'gtk', скомпилированный при импорте
+PALETTE_TEMPLATE = FORMATS['gtk'][1]
+
+# Статическая таблица стилей: селекторы конкретных виджетов, без '*'.
+# Производные цвета (рамки, наведение) задаются выражениями GTK от палитры.
+STYLESHEET = f"""@import url("{PALETTE_FILE}");
+
+@define-color borders_color alpha(@window_fg_color, 0.15);
+@define-color hover_bg_color mix(@view_bg_color, @window_fg_color, 0.07);
+@define-color active_bg_color mix(@view_bg_color, @window_fg_color, 0.14);
+@define-color accent_hover_color shade(@accent_bg_color, 1.1);
+@define-color theme_bg_color @window_bg_color;
+@define-color theme_fg_color @window_fg_color;
+@define-color theme_base_color @view_bg_color;
+@define-color theme_text_color @view_fg_color;
+
+window, .background {{
+  background-color: @window_bg_color;
+  color: @window_fg_color;
+}}
+
+headerbar, .titlebar {{
+  background-color: @headerbar_bg_color;
+  color: @headerbar_fg_color;
+  border-bottom: 1px solid @borders_color;
+}}
+
+.view, textview text, treeview, iconview, list, listview, columnview {{
+  background-color: @view_bg_color;
+  color: @view_fg_color;
+}}
+
+button {{
+  background-color: @card_bg_color;
+  color: @card_fg_color;
+  border: 1px solid @borders_color;
+  border-radius: 6px;
+}}
+
+button:hover {{
+  background-color: @hover_bg_color;
+}}
+
+button:active, button:checked {{
+  background-color: @active_bg_color;
+}}
+
+button.suggested-action {{
+  background-color: @accent_bg_color;
+  color: @accent_fg_color;
+  border-color: @accent_bg_color;
+}}
+
+button.suggested-action:hover {{
+  background-color: @accent_hover_color;
+}}
+
+button.destructive-action {{
+  background-color: @destructive_color;
+  color: @accent_fg_color;
+  border-color: @destructive_color;
+}}
+
+entry, spinbutton {{
+  background-color: @view_bg_color;
+  color: @view_fg_color;
+  border: 1px solid @borders_color;
+  border-radius: 6px;
+}}
+
+entry:focus-within, spinbutton:focus-within {{
+  border-color: @accent_color;
+}}
+
+selection, row:selected, treeview:selected, iconview:selected, flowboxchild:selected {{
+  background-color: @theme_selected_bg_color;
+  color: @theme_selected_fg_color;
+}}
+
+popover > contents, popover.background, menu, .menu, .context-menu, tooltip {{
+  background-color: @popover_bg_color;
+  color: @popover_fg_color;
+}}
+
+.card, frame > border {{
+  background-color: @card_bg_color;
+  color: @card_fg_color;
+  border: 1px solid @borders_color;
+}}
+
+switch:checked, checkbutton check:checked, radiobutton radio:checked, check:checked, radio:checked {{
+  background-color: @accent_bg_color;
+  color: @accent_fg_color;
+}}
+
+progressbar progress, scale highlight, levelbar block.filled {{
+  background-color: @accent_bg_color;
+}}
+
+scrollbar slider {{
+  background-color: alpha(@window_fg_color, 0.3);
+}}
+
+link, link:link {{
+  color: @accent_color;
+}}
+
+.error {{ color: @error_color; }}
+.warning {{ color: @warning_color; }}
+.success {{ color: @success_color; }}
+"""
+
+INDEX_THEME = """[Desktop Entry]
+Type=X-GNOME-Metatheme
+Name={name}
+Encoding=UTF-8
+
+[X-GNOME-Metatheme]
+GtkTheme={name}
+"""
+
+
+def render_palette(theme):
+    """Файл палитры @define-color для темы."""
+    theme = as_theme(theme)
+    return PALETTE_TEMPLATE.render(theme_values(theme, kde_scheme_name(theme)))
+
+
+def _link(target, link):
+    """Относительная символическая ссылка link -> target; False, если уже есть."""
+    relative = os.path.relpath(target, link.parent)
+    if link.is_symlink() and os.readlink(link) == relative:
+        return False
+    link.parent.mkdir(parents=True, exist_ok=True)
+    temp_link = link.with_name(f".{link.name}.{os.getpid()}.tmp")
+    try:
+        temp_link.symlink_to(relative)
+    except OSError:
+        # Файловая система без символических ссылок - обычная копия
+        return write_if_changed(link, target.read_bytes())
+    # Замена прежнего файла (копии из старых версий) одной операцией
+    os.replace(temp_link, link)
+    return True
+
+
+def write_gtk_theme(theme, themes_dir, name=GTK_THEME_NAME):
+    """Запись темы GTK в themes_dir/name; путь -> был ли файл записан."""
+    theme_dir = Path(themes_dir) / name
+    gtk3_dir = theme_dir / 'gtk-3.0'
+    gtk4_dir = theme_dir / 'gtk-4.0'
+
+    written = {}
+    for path, content in (
+        (theme_dir / 'index.theme', INDEX_THEME.format(name=name)),
+        (gtk3_dir / STYLESHEET_FILE, STYLESHEET),
+        (gtk3_dir / PALETTE_FILE, render_palette(theme)),
+    ):
+        written[path] = write_if_changed(path, content)
+    for filename in (STYLESHEET_FILE, PALETTE_FILE):
+        written[gtk4_dir / filename] = _link(gtk3_dir / filename, gtk4_dir / filename)
+    return written
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+История анализов и применений тем в SQLite.
+
+Каждое событие - анализ изображения или применение темы - хранится с
+хэшем изображения, параметрами, темой, длительностью и результатом.
+База работает в режиме WAL: чтение не ждет записи. Запись идет в
+фоновом потоке пакетами по одной транзакции, поэтому record() только
+кладет событие в очередь и не задерживает применение темы; хэш
+изображения тоже считается в фоновом потоке.
+"""
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from core.theme import json_default
+
+# Событий в одной транзакции записи
+BATCH_SIZE = 256
+# Ожидание следующих событий перед записью пакета, с
+BATCH_DELAY = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    platform TEXT,
+    image_path TEXT,
+    image_hash TEXT,
+    mode TEXT,
+    params TEXT,
+    theme TEXT,
+    duration_ms REAL,
+    success INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS events_created ON events (kind, created_at DESC);
+CREATE INDEX IF NOT EXISTS events_image ON events (image_hash, created_at DESC);
+CREATE INDEX IF NOT EXISTS events_duration ON events (kind, duration_ms DESC);
+"""
+
+COLUMNS = ('kind', 'created_at', 'platform', 'image_path', 'image_hash', 'mode',
+           'params', 'theme', 'duration_ms', 'success', 'error')
+
+_STOP = object()
+
+
+def default_path():
+    return Path.home() / '.local' / 'share' / 'theme-installer' / 'history.sqlite3'
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def _image_hash(image_path):
+    from utils.hashing import file_hash
+
+    try:
+        return file_hash(image_path)
+    except OSError:
+        return None
+
+
+def _row(event):
+    event = dict(event)
+    if event.get('image_path') and not event.get('image_hash'):
+        event['image_hash'] = _image_hash(event['image_path'])
+    for key in ('params', 'theme'):
+        if event.get(key) is not None and not isinstance(event[key], str):
+            event[key] = json.dumps(event[key], ensure_ascii=False, default=json_default)
+    if event.get('success') is not None:
+        event['success'] = int(bool(event['success']))
+    return tuple(event.get(column) for column in COLUMNS)
+
+
+def _event(row):
+    event = dict(row)
+    for key in ('params', 'theme'):
+        if event.get(key):
+            event[key] = json.loads(event[key])
+    if event.get('success') is not None:
+        event['success'] = bool(event['success'])
+    return event
+
+
+class HistoryStore:
+    """Хранилище истории с фоновой пакетной записью."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else default_path()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _open(self):
+        """Подключение к базе; схема создается при первом подключении."""
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = _connect(self.path)
+        if not self._ready:
+            connection.executescript(SCHEMA)
+            self._ready = True
+        return connection
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name='history-writer',
+                                                daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _write_loop(self):
+        try:
+            connection = self._open()
+        except (OSError, sqlite3.Error) as e:
+            # История недоступна: события из очереди отбрасываются
+            print(f"История: база недоступна ({self.path}): {e}")
+            connection = None
+        placeholders = ', '.join('?' * len(COLUMNS))
+        sql = f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # Короткое ожидание: события одного применения попадут в одну транзакцию
+            deadline = time.monotonic() + BATCH_DELAY
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            events = [event for event in batch if event is not _STOP]
+            stop = len(events) != len(batch)
+            try:
+                if connection is not None and events:
+                    rows = [_row(event) for event in events]
+                    with connection:
+                        connection.executemany(sql, rows)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"История: ошибка записи {len(events)} событий: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if connection is not None:
+            connection.close()
+
+    def record(self, kind, **fields):
+        """Событие в очередь записи; возвращается сразу.
+
+        kind - 'analysis' или 'apply'; поля - столбцы таблицы events
+        (params и theme сериализуются в JSON).
+        """
+        self._start_writer()
+        self._queue.put({'kind': kind, 'created_at': time.time(), **fields})
+
+    def flush(self):
+        """Ожидание записи всех событий из очереди."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self):
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None and writer.is_alive():
+            self._queue.put(_STOP)
+            writer.join()
+
+    def _query(self, sql, args=()):
+        self.flush()
+        connection = self._open()
+        try:
+            return [_event(row) for row in connection.execute(sql, args)]
+        finally:
+            connection.close()
+
+    def last_themes(self, limit=10, platform=None, successful=False):
+        """Последние примененные темы (новые первыми).
+
+        successful - только успешные применения.
+        """
+        sql, args = "SELECT * FROM events WHERE kind = 'apply'", []
+        if platform:
+            sql += " AND platform = ?"
+            args.append(platform)
+        if successful:
+            sql += " AND success = 1"
+        return self._query(sql + " ORDER BY created_at DESC LIMIT ?", (*args, limit))
+
+    def themes_for_image(self, image, limit=50):
+        """События для изображения (путь к файлу или его хэш)."""
+        image_hash = image
+        if Path(image).exists():
+            image_hash = _image_hash(image)
+        return self._query("SELECT * FROM events WHERE image_hash = ? "
+                           "ORDER BY created_at DESC LIMIT ?", (image_hash, limit))
+
+    def slowest_applies(self, limit=10):
+        """Самые долгие применения тем."""
+        return self._query("SELECT * FROM events WHERE kind = 'apply' "
+                           "ORDER BY duration_ms DESC LIMIT ?", (limit,))
+
+
+_default_store = None
+
+
+def get_history():
+    """Общее хранилище истории процесса (создается при первом обращении)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = HistoryStore()
+    return _default_store
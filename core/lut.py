@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Таблицы преобразования цветов, общие для всех процессов.
+
+Линеаризация sRGB хранится таблицей на 256 значений, а RGB -> Lab и
+RGB -> OKLab - квантованными 3D-таблицами (по 6 бит на канал). 3D-
+таблицы один раз строятся и сохраняются в ~/.cache/theme-installer/lut,
+а затем открываются через np.load(mmap_mode='r'): процессы пакетного
+анализа делят одни и те же страницы в кэше ОС, не пересчитывая таблицы.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+from core.colorspace import rgb_to_lab, rgb_to_oklab, srgb_to_linear
+
+LUT_VERSION = 1
+LUT_BITS = 6
+LUT_LEVELS = 1 << LUT_BITS
+
+# Линейное значение канала для каждого 8-битного значения
+SRGB_LINEAR = srgb_to_linear(np.arange(256, dtype=np.uint8))
+# То же списком - для скалярных вычислений без накладных расходов NumPy
+SRGB_LINEAR_LIST = SRGB_LINEAR.tolist()
+
+LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722])
+
+_BUILDERS = {
+    'lab': rgb_to_lab,
+    'oklab': rgb_to_oklab,
+}
+_tables = {}
+
+
+def lut_dir():
+    """Директория кэша таблиц."""
+    return Path.home() / '.cache' / 'theme-installer' / 'lut'
+
+
+def luminance(rgb):
+    """Относительная яркость WCAG для uint8 RGB (..., 3) через таблицу."""
+    return SRGB_LINEAR[np.asarray(rgb, dtype=np.uint8)] @ LUMINANCE_WEIGHTS
+
+
+def luminance_scalar(rgb):
+    """Относительная яркость одного цвета (r, g, b) через таблицу."""
+    r, g, b = rgb
+    return (0.2126 * SRGB_LINEAR_LIST[r]
+            + 0.7152 * SRGB_LINEAR_LIST[g]
+            + 0.0722 * SRGB_LINEAR_LIST[b])
+
+
+def quantize_index(rgb):
+    """Индекс ячейки 3D-таблицы для uint8 RGB (..., 3)."""
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    q = (rgb * (LUT_LEVELS - 1) + 127) // 255
+    return (q[..., 0] * LUT_LEVELS + q[..., 1]) * LUT_LEVELS + q[..., 2]
+
+
+def _build_table(name):
+    levels = np.round(np.arange(LUT_LEVELS) * 255 / (LUT_LEVELS - 1)).astype(np.uint8)
+    grid = np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1)
+    return _BUILDERS[name](grid.reshape(-1, 3)).astype(np.float32)
+
+
+def load_table(name):
+    """3D-таблица (LEVELS**3, 3) float32, отображенная в память с диска."""
+    table = _tables.get(name)
+    if table is not None:
+        return table
+
+    if name not in _BUILDERS:
+        raise ValueError(f"Неизвестная таблица: {name}")
+
+    path = lut_dir() / f"{name}-{LUT_BITS}bit-v{LUT_VERSION}.npy"
+    try:
+        table = np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        table = _build_table(name)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Атомарная запись: параллельные процессы не видят полфайла
+            temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'wb') as f:
+                np.save(f, table)
+            os.replace(temp_path, path)
+            table = np.load(path, mmap_mode='r')
+        except OSError:
+            # Нет доступа к кэшу - работаем с таблицей в памяти
+            pass
+
+    _tables[name] = table
+    return table
+
+
+def lab(rgb):
+    """RGB (..., 3) uint8 -> CIELab через таблицу."""
+    return load_table('lab')[quantize_index(rgb)]
+
+
+def oklab(rgb):
+    """RGB (..., 3) uint8 -> OKLab через таблицу."""
+    return load_table('oklab')[quantize_index(rgb)]
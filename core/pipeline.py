@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Двухступенчатый конвейер пакетного анализа через разделяемую память.
+
+1. Пул потоков декодирует и уменьшает изображения (Pillow отпускает
+   GIL) и кладет готовые массивы в ячейки кольцевого буфера
+   multiprocessing.shared_memory.
+2. Пул процессов строит гистограмму, отбирает цвета и темы прямо по
+   представлениям этой памяти, без копирования и сериализации пикселей.
+
+Ячейка освобождается, когда процесс закончил с изображением; если
+свободных ячеек нет, декодирование ждет - память ограничена размером
+кольца. Массив, не помещающийся в ячейку (например, sampling='full'),
+передается процессу обычной сериализацией.
+"""
+import os
+import queue
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from core.batch import materialize
+from core.sampling import DECODE_OVERSAMPLING, DEFAULT_PIXEL_BUDGET
+
+# Размер ячейки для уменьшения до max_size px (по умолчанию 400): RGB и альфа-канал
+RESIZE_MAX_SIZE = 400
+# Ячейка для sampling='full' - крупнее изображения передаются сериализацией
+FULL_SLOT_BYTES = 16 * 1024 * 1024
+
+# Подключенные блоки разделяемой памяти в дочернем процессе
+_attached = {}
+
+
+def slot_bytes(options):
+    """Размер ячейки кольца под параметры анализатора."""
+    sampling = options.get('sampling')
+    if sampling is None:
+        max_size = options.get('max_size', RESIZE_MAX_SIZE)
+        return max_size * max_size * 4
+    if sampling == 'full':
+        return FULL_SLOT_BYTES
+    # Image.draft уменьшает JPEG в 2**k раз, поэтому площадь
+    # декодированного изображения меньше 4 x (бюджет x запас)
+    return options.get('pixel_budget', DEFAULT_PIXEL_BUDGET) * DECODE_OVERSAMPLING * 4 * 4
+
+
+class PixelRing:
+    """Кольцо ячеек одного блока разделяемой памяти."""
+
+    def __init__(self, slots, slot_size):
+        self.slot_size = slot_size
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_size)
+        self._free = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def acquire(self):
+        """Свободная ячейка; ждет, пока ее не освободит процесс."""
+        return self._free.get()
+
+    def release(self, slot):
+        self._free.put(slot)
+
+    def write(self, slot, arrays):
+        """Запись массивов подряд в ячейку; возвращает их (offset, shape)."""
+        layout = []
+        offset = slot * self.slot_size
+        for array in arrays:
+            view = np.ndarray(array.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset)
+            view[...] = array
+            layout.append((offset, array.shape))
+            offset += array.nbytes
+        return layout
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        # Трекер ресурсов общий с родителем, который и удаляет блок
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def analyze_shared(task):
+    """Анализ изображения из ячейки кольца в дочернем процессе."""
+    image_path, source, modes, schemes, options = task
+
+    from core.color_analyzer import ColorAnalyzer
+
+    analyzer = ColorAnalyzer(image_path, **options)
+    if source is None:
+        # Декодирование не удалось - analyze() вернет резервные темы
+        return materialize(analyzer.analyze(modes=modes, schemes=schemes))
+
+    if isinstance(source[0], str):
+        buffer = _attach(source[0]).buf
+        arrays = [np.ndarray(shape, dtype=np.uint8, buffer=buffer, offset=offset)
+                  for offset, shape in source[1]]
+    else:
+        arrays = list(source)
+    pixels, alpha = arrays[0], (arrays[1] if len(arrays) > 1 else None)
+
+    analyzer.use_pixels(pixels, alpha)
+    return materialize(analyzer.analyze(modes=modes, schemes=schemes))
+
+
+def iter_pipeline(images, modes=None, schemes=None, workers=None, decoders=None,
+                  slots=None, **analyzer_options):
+    """Результаты анализа по порядку изображений (см. core.batch.iter_batch)."""
+    from core.color_analyzer import ColorAnalyzer
+
+    paths = [str(Path(path)) for path in images]
+    workers = workers or min(len(paths), os.cpu_count() or 1) or 1
+    decoders = decoders or workers
+    slots = slots or workers * 2 + decoders
+    ring = PixelRing(slots, slot_bytes(analyzer_options))
+
+    def decode(image_path, executor):
+        """Декодирование в потоке и передача ячейки пулу процессов."""
+        analyzer = ColorAnalyzer(image_path, **analyzer_options)
+        try:
+            analyzer.load_image()
+        except Exception:
+            return executor.submit(analyze_shared, (image_path, None, modes, schemes,
+                                                    analyzer_options))
+        arrays = [np.asarray(analyzer.image)]
+        if analyzer.alpha is not None:
+            arrays.append(analyzer.alpha)
+
+        if sum(array.nbytes for array in arrays) > ring.slot_size:
+            source = tuple(arrays)
+            return executor.submit(analyze_shared, (image_path, source, modes, schemes,
+                                                    analyzer_options))
+
+        slot = ring.acquire()
+        try:
+            source = (ring.name, ring.write(slot, arrays))
+            future = executor.submit(analyze_shared, (image_path, source, modes, schemes,
+                                                      analyzer_options))
+        except BaseException:
+            ring.release(slot)
+            raise
+        future.add_done_callback(lambda _: ring.release(slot))
+        return future
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                ThreadPoolExecutor(max_workers=decoders) as decode_pool:
+            pending = deque()
+            for image_path in paths:
+                pending.append(decode_pool.submit(decode, image_path, executor))
+                if len(pending) >= slots:
+                    yield pending.popleft().result().result()
+            while pending:
+                yield pending.popleft().result().result()
+    finally:
+        ring.close()
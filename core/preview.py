@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+PNG-превью тем: листы образцов цветов.
+
+Лист состоит из миниатюры обоев, ролей темы, вариантов основного и
+вторичного цветов, акцентов и цветовых схем. Разметка листа - карта
+(H, W) номеров образцов - строится один раз для набора длин строк и
+кэшируется; сам лист собирается одной выборкой np.take из
+таблицы цветов темы, после чего кодируется в PNG один раз.
+"""
+import io
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from core.colorspace import unpack_array
+from core.exporter import ROLE_DEFAULTS, write_if_changed
+from core.theme import ROLES, as_theme, to_packed
+
+SHEET_WIDTH = 640
+THUMB_SIZE = (192, 108)
+ROW_HEIGHT = 28
+PADDING = 8
+GAP = 4
+# Быстрое сжатие: однотонные области хорошо сжимаются и так
+PNG_COMPRESS_LEVEL = 1
+
+
+@lru_cache(maxsize=64)
+def sheet_layout(counts, thumbnail=True):
+    """Карта образцов (H, W) int16 для строк с counts цветами.
+
+    Первые две строки - роли рядом с миниатюрой, остальные - во всю
+    ширину. Номер 0 - фон листа, образцы нумеруются с 1 по порядку.
+    """
+    thumb_w, thumb_h = THUMB_SIZE
+    height = 2 * PADDING + thumb_h + (len(counts) - 2) * (ROW_HEIGHT + GAP)
+    index = np.zeros((height, SHEET_WIDTH), dtype=np.int16)
+
+    left = PADDING + (thumb_w + GAP if thumbnail else 0)
+    role_h = (thumb_h - GAP) // 2
+    boxes = [(PADDING, left, role_h, SHEET_WIDTH - PADDING - left),
+             (PADDING + role_h + GAP, left, role_h, SHEET_WIDTH - PADDING - left)]
+    y = PADDING + thumb_h + GAP
+    for _ in counts[2:]:
+        boxes.append((y, PADDING, ROW_HEIGHT, SHEET_WIDTH - 2 * PADDING))
+        y += ROW_HEIGHT + GAP
+
+    slot = 1
+    for (top, x, box_h, box_w), count in zip(boxes, counts):
+        edges = np.linspace(x, x + box_w + GAP, count + 1).astype(int)
+        for i in range(count):
+            index[top:top + box_h, edges[i]:edges[i + 1] - GAP] = slot
+            slot += 1
+    index.flags.writeable = False
+    return index
+
+
+def wallpaper_thumbnail(source, size=THUMB_SIZE):
+    """Миниатюра обоев (h, w, 3) uint8 с обрезкой по пропорциям size.
+
+    source - путь к файлу, изображение PIL или массив (H, W, 3), например
+    уже уменьшенное изображение анализатора.
+    """
+    if isinstance(source, np.ndarray):
+        return _crop_thumbnail(Image.fromarray(source), size)
+    if isinstance(source, Image.Image):
+        return _crop_thumbnail(source.convert('RGB'), size)
+    with Image.open(source) as image:
+        # JPEG декодируется сразу в уменьшенном масштабе
+        image.draft('RGB', (size[0] * 2, size[1] * 2))
+        return _crop_thumbnail(image.convert('RGB'), size)
+
+
+def _crop_thumbnail(image, size):
+    scale = max(size[0] / image.width, size[1] / image.height)
+    resized = image.resize((max(size[0], round(image.width * scale)),
+                            max(size[1], round(image.height * scale))),
+                           Image.Resampling.BILINEAR)
+    left = (resized.width - size[0]) // 2
+    top = (resized.height - size[1]) // 2
+    return np.asarray(resized.crop((left, top, left + size[0], top + size[1])))
+
+
+def _theme_rows(theme, schemes):
+    roles = [theme.packed(role, ROLE_DEFAULTS[role]) for role in ROLES]
+    rows = [roles[:7], roles[7:],
+            list(theme.primary_variants.packed_values()),
+            list(theme.secondary_variants.packed_values()),
+            list(theme.accent_colors.packed_values())]
+    for colors in (schemes or {}).values():
+        rows.append([to_packed(color) for color in colors])
+    return [row for row in rows if row]
+
+
+def render_preview(theme_data, schemes=None, thumbnail=None):
+    """Лист образцов темы (H, W, 3) uint8.
+
+    schemes - словарь имя -> список цветов (как results['color_scheme']),
+    thumbnail - массив миниатюры обоев (см. wallpaper_thumbnail).
+    """
+    theme = as_theme(theme_data)
+    rows = _theme_rows(theme, schemes)
+    index = sheet_layout(tuple(len(row) for row in rows), thumbnail is not None)
+
+    packed = [theme.packed('background', ROLE_DEFAULTS['background'])]
+    for row in rows:
+        packed.extend(row)
+    # np.take по оси заметно быстрее обычной индексации массивом
+    sheet = np.take(unpack_array(packed), index, axis=0)
+
+    if thumbnail is not None:
+        thumb_h, thumb_w = thumbnail.shape[:2]
+        sheet[PADDING:PADDING + thumb_h, PADDING:PADDING + thumb_w] = thumbnail
+    return sheet
+
+
+def encode_png(sheet):
+    """PNG-байты листа."""
+    buffer = io.BytesIO()
+    Image.fromarray(sheet).save(buffer, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
+def save_previews(results, directory, basename=None, wallpaper=None, hash_cache=None):
+    """PNG-превью каждой темы результата анализа: {режим: (путь, записан)}.
+
+    wallpaper - источник миниатюры (см. wallpaper_thumbnail), по
+    умолчанию results['source_image']; False - без миниатюры. Миниатюра
+    строится один раз на все темы изображения.
+    """
+    directory = Path(directory)
+    source = results.get('source_image')
+    basename = basename or (Path(source).stem if source else 'theme')
+
+    if wallpaper is None:
+        wallpaper = source
+    thumbnail = None
+    if wallpaper is not None and wallpaper is not False:
+        try:
+            thumbnail = wallpaper_thumbnail(wallpaper)
+        except OSError:
+            thumbnail = None
+
+    written = {}
+    for mode, theme in results['themes'].items():
+        sheet = render_preview(theme, results.get('color_scheme'), thumbnail)
+        path = directory / f"{basename}-{mode}.png"
+        written[mode] = (path, write_if_changed(path, encode_png(sheet), hash_cache))
+    return written
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Ленивые результаты анализа.
+
+Темы и цветовые схемы вычисляются при первом обращении, поэтому
+запуск, применяющий одну тему, не строит остальные. Сериализация в
+JSON материализует все запрошенные значения.
+"""
+from collections.abc import Mapping
+
+
+class LazyMapping(Mapping):
+    """Словарь с фиксированными ключами и значениями, вычисляемыми по запросу."""
+
+    __slots__ = ('_keys', '_factory', '_cache')
+
+    def __init__(self, keys, factory):
+        self._keys = tuple(keys)
+        self._factory = factory
+        self._cache = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            if key not in self._keys:
+                raise
+        value = self._cache[key] = self._factory(key)
+        return value
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def is_computed(self, key):
+        """Было ли значение уже вычислено."""
+        return key in self._cache
+
+    def __repr__(self):
+        computed = ', '.join(k for k in self._keys if k in self._cache)
+        return f"LazyMapping(keys={self._keys!r}, computed=[{computed}])"
+
+    def to_json(self):
+        """Материализация всех значений."""
+        return {key: self[key] for key in self._keys}
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Веса пикселей для подсчета доминирующих цветов.
+
+Вес пикселя - произведение трех множителей:
+- смещение к центру кадра (сепарабельная гауссиана);
+- локальный контраст: модуль градиента яркости, усредненный окном, -
+  области с деталями весят больше ровного неба или стены;
+- альфа-канал: прозрачные пиксели не учитываются.
+
+Нижние уровни множителей не дают ровным краям кадра пропасть совсем.
+Все операции - сдвиги срезов и кумулятивные суммы NumPy; стоимость не
+зависит от размера окна усреднения.
+"""
+import math
+
+import numpy as np
+
+# Ширина гауссианы в долях полуразмера кадра
+CENTER_SIGMA = 0.6
+CENTER_FLOOR = 0.3
+EDGE_FLOOR = 0.2
+# Радиус окна усреднения градиента в долях большей стороны
+EDGE_WINDOW = 0.02
+# Предельный размер прореженного изображения для карты контраста
+EDGE_MAP_PIXELS = 65536
+# Перцентиль градиента, принимаемый за полный вес
+EDGE_PERCENTILE = 95
+
+_GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _gaussian(positions, size, sigma):
+    """Гауссиана по координатам, нормированным в [-1, 1]."""
+    t = positions * np.float32(2 / max(size - 1, 1)) - 1
+    return np.exp(-0.5 * (t / sigma) ** 2)
+
+
+def center_bias(ys, xs, height, width, sigma=CENTER_SIGMA, floor=CENTER_FLOOR):
+    """Смещение к центру для координат: 1 в центре, не ниже floor по краям."""
+    return floor + (1 - floor) * _gaussian(ys, height, sigma) * _gaussian(xs, width, sigma)
+
+
+def _box_blur_axis0(values, radius):
+    padded = np.pad(values, ((radius + 1, radius), (0, 0)), mode='edge')
+    padded[0] = 0
+    csum = np.cumsum(padded, axis=0, dtype=np.float64)
+    size = 2 * radius + 1
+    return ((csum[size:] - csum[:-size]) / size).astype(np.float32)
+
+
+def box_blur(values, radius):
+    """Скользящее среднее окном (2r+1) x (2r+1) через кумулятивные суммы."""
+    if radius < 1:
+        return values
+    return _box_blur_axis0(_box_blur_axis0(values, radius).T, radius).T
+
+
+def edge_map(rgb, window=EDGE_WINDOW, floor=EDGE_FLOOR):
+    """Карта (H, W) локального контраста для uint8 RGB (H, W, 3)."""
+    gray = rgb @ _GRAY_WEIGHTS
+
+    # Центральные разности по осям
+    magnitude = np.zeros_like(gray)
+    magnitude[:, 1:-1] = np.abs(gray[:, 2:] - gray[:, :-2])
+    magnitude[1:-1, :] += np.abs(gray[2:, :] - gray[:-2, :])
+
+    radius = int(max(gray.shape) * window)
+    local = box_blur(magnitude, radius)
+
+    peak = np.percentile(local, EDGE_PERCENTILE)
+    if peak <= 0:
+        return np.ones_like(local)
+    return floor + (1 - floor) * np.minimum(local / peak, 1.0)
+
+
+def pixel_weights(rgb, alpha=None, coords=None):
+    """Веса (N,) float32 для uint8 RGB (H, W, 3).
+
+    coords - координаты выборки (ys, xs); без них веса считаются для
+    всех пикселей в порядке reshape(-1). Карта контраста строится по
+    прореженному изображению не больше EDGE_MAP_PIXELS пикселей, так что
+    ее стоимость не растет с размером кадра.
+    """
+    height, width = rgb.shape[:2]
+    if coords is None:
+        ys, xs = np.arange(height)[:, None], np.arange(width)[None, :]
+    else:
+        ys, xs = coords
+
+    step = max(1, int(math.sqrt(height * width / EDGE_MAP_PIXELS)))
+    edges = edge_map(rgb[::step, ::step])
+    edge_h, edge_w = edges.shape
+
+    weights = center_bias(ys, xs, height, width)
+    weights = weights * edges[np.minimum(ys // step, edge_h - 1),
+                              np.minimum(xs // step, edge_w - 1)]
+    if alpha is not None:
+        weights *= alpha[ys, xs] * np.float32(1 / 255)
+    return weights.astype(np.float32, copy=False).reshape(-1)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Стратифицированная выборка пикселей с фиксированным бюджетом.
+
+Вместо ресемплинга всего изображения берется заданное число пикселей,
+равномерно покрывающих кадр: по сетке с джиттером ('grid') или по
+квазислучайной последовательности R2 с низким расхождением
+('blue_noise', приближение blue noise без дорогой генерации маски).
+Выборка детерминирована при фиксированном seed, а ее стоимость не
+зависит от размера изображения.
+"""
+import math
+
+import numpy as np
+
+SAMPLING_METHODS = ('grid', 'blue_noise')
+DEFAULT_PIXEL_BUDGET = 65536
+# Во сколько раз декодированное изображение должно превышать бюджет
+DECODE_OVERSAMPLING = 4
+
+# Обобщенное золотое сечение для двумерной последовательности R2
+_PLASTIC = 1.32471795724474602596
+_R2_ALPHA = np.array([1 / _PLASTIC, 1 / _PLASTIC ** 2])
+
+
+def draft_size(size, budget):
+    """Размер для Image.draft: дешевое декодирование JPEG в уменьшенном масштабе."""
+    width, height = size
+    scale = math.sqrt(width * height / (budget * DECODE_OVERSAMPLING))
+    if scale <= 1:
+        return None
+    return max(1, int(width / scale)), max(1, int(height / scale))
+
+
+def grid_coords(width, height, budget, rng):
+    """Сетка ячеек по пропорциям кадра, одна случайная точка в ячейке."""
+    cols = max(1, min(width, round(math.sqrt(budget * width / height))))
+    rows = max(1, min(height, budget // cols))
+
+    cell_x = (np.arange(cols)[None, :] + rng.random((rows, cols))) * (width / cols)
+    cell_y = (np.arange(rows)[:, None] + rng.random((rows, cols))) * (height / rows)
+    return cell_x.astype(np.int64).ravel(), cell_y.astype(np.int64).ravel()
+
+
+def blue_noise_coords(width, height, budget, rng):
+    """Квазислучайные точки R2 со случайным сдвигом."""
+    points = (rng.random(2) + np.arange(1, budget + 1)[:, None] * _R2_ALPHA) % 1.0
+    return (points[:, 0] * width).astype(np.int64), (points[:, 1] * height).astype(np.int64)
+
+
+def sample_coords(height, width, budget=DEFAULT_PIXEL_BUDGET, method='grid', seed=0):
+    """Координаты выборки (ys, xs) или None, если кадр укладывается в бюджет."""
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Неизвестный метод выборки: {method}")
+
+    if width * height <= budget:
+        return None
+
+    rng = np.random.default_rng(seed)
+    if method == 'grid':
+        xs, ys = grid_coords(width, height, budget, rng)
+    else:
+        xs, ys = blue_noise_coords(width, height, budget, rng)
+
+    np.minimum(xs, width - 1, out=xs)
+    np.minimum(ys, height - 1, out=ys)
+    return ys, xs
+
+
+def sample_pixels(pixels, budget=DEFAULT_PIXEL_BUDGET, method='grid', seed=0):
+    """Выборка из массива (H, W, C): возвращает (N, C), N <= budget."""
+    height, width = pixels.shape[:2]
+    coords = sample_coords(height, width, budget, method, seed)
+    if coords is None:
+        return pixels.reshape(-1, pixels.shape[-1])
+    return pixels[coords]
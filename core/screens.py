@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Анализ обоев нескольких мониторов как одной темы.
+
+Изображения декодируются и анализируются параллельно в пуле потоков
+(декодирование Pillow и операции NumPy отпускают GIL), поэтому общее
+время близко ко времени самого медленного изображения. Гистограммы
+нормируются и складываются с весами по площади экранов, а из
+объединенной гистограммы строится общая тема.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from core.color_analyzer import ColorAnalyzer
+
+
+def parse_screen_size(value):
+    """'2560x1440' -> (2560, 1440)."""
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise ValueError(f"Неверный размер экрана: {value} (ожидается ШИРИНАxВЫСОТА)")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Неверный размер экрана: {value}")
+    return width, height
+
+
+def screen_weights(count, sizes=None):
+    """Доли экранов по площади; без размеров - поровну."""
+    if not sizes:
+        return [1.0 / count] * count
+    if len(sizes) != count:
+        raise ValueError(f"Размеров экранов ({len(sizes)}) не столько же, сколько изображений ({count})")
+    areas = [width * height for width, height in sizes]
+    total = sum(areas)
+    return [area / total for area in areas]
+
+
+class ScreenAnalyzer(ColorAnalyzer):
+    """Анализатор набора обоев: по изображению на монитор.
+
+    Первое изображение считается основным (его имя и размер попадают
+    в результат как у ColorAnalyzer); остальные параметры передаются
+    анализаторам отдельных изображений.
+    """
+
+    def __init__(self, image_paths, screen_sizes=None, workers=None, **options):
+        image_paths = [str(path) for path in image_paths]
+        if not image_paths:
+            raise ValueError("Не указано ни одного изображения")
+        super().__init__(image_paths[0], **options)
+        self.image_paths = image_paths
+        self.weights = screen_weights(len(image_paths), screen_sizes)
+        self.workers = workers or min(len(image_paths), os.cpu_count() or 1)
+        self.analyzers = [ColorAnalyzer(path, **options) for path in image_paths]
+        self._histograms = {}
+
+    def load_image(self):
+        """Параллельная загрузка и подсчет гистограмм всех изображений.
+
+        Декодирование и гистограмма каждого изображения идут одной
+        задачей пула, без ожидания остальных изображений между ними.
+        """
+        self.screen_histograms()
+        primary = self.analyzers[0]
+        self.image, self.alpha = primary.image, primary.alpha
+        return True
+
+    def _map(self, func):
+        if self.workers <= 1 or len(self.analyzers) == 1:
+            return [func(analyzer) for analyzer in self.analyzers]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(func, self.analyzers))
+
+    def screen_histograms(self, color_tolerance=None):
+        """Гистограммы изображений, каждая нормирована к сумме 1."""
+        color_tolerance = color_tolerance or self.color_tolerance
+        histograms = self._histograms.get(color_tolerance)
+        if histograms is None:
+            histograms = []
+            for counts in self._map(lambda analyzer: analyzer.image_histogram(color_tolerance)):
+                total = counts.sum()
+                histograms.append(counts / total if total > 0 else counts)
+            self._histograms[color_tolerance] = histograms
+        return histograms
+
+    def image_histogram(self, color_tolerance=None):
+        """Объединенная гистограмма с весами по площади экранов."""
+        histograms = self.screen_histograms(color_tolerance)
+        return sum(weight * counts for weight, counts in zip(self.weights, histograms))
+
+    def extract_screen_colors(self, num_colors=8, color_tolerance=None, distance=None,
+                              min_distance=None):
+        """Палитры отдельных экранов: [{'image': путь, 'weight': доля, 'colors': [...]}]."""
+        color_tolerance = color_tolerance or self.color_tolerance
+        return [
+            {'image': path,
+             'weight': weight,
+             'colors': self._histogram_colors(counts, num_colors, color_tolerance,
+                                              distance, min_distance)}
+            for path, weight, counts in zip(self.image_paths, self.weights,
+                                            self.screen_histograms(color_tolerance))
+        ]
+
+    def is_animated(self):
+        return False
+
+    def analyze(self, modes=None, schemes=None):
+        """Общая тема для всех экранов; палитры экранов - в 'screens'."""
+        results = super().analyze(modes=modes, schemes=schemes)
+        if 'source_image' in results:
+            results['source_images'] = list(self.image_paths)
+            results['screens'] = self.extract_screen_colors(10)
+        return results
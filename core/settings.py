@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Настройки анализатора: пресеты, файл, переменные окружения, CLI.
+
+Значения собираются по слоям, каждый следующий переопределяет
+предыдущий: значения по умолчанию -> пресет -> файл настроек
+(~/.config/theme-installer/settings.json или THEME_INSTALLER_SETTINGS)
+-> переменные окружения THEME_INSTALLER_<ПАРАМЕТР> -> аргументы
+командной строки. Пресет можно
+выбрать в любом слое (ключ preset, THEME_INSTALLER_PRESET, --preset);
+действует выбор последнего слоя, а явные параметры любого слоя
+применяются поверх пресета.
+"""
+import json
+import os
+from pathlib import Path
+
+ENV_PREFIX = 'THEME_INSTALLER_'
+
+# Модуль нужен уже при разборе аргументов, поэтому не импортирует
+# анализатор и NumPy: значения совпадают с core.sampling и core.distance
+SAMPLING_CHOICES = ('resize', 'full', 'grid', 'blue_noise')
+DISTANCE_METRICS = ('rgb', 'oklab', 'ciede2000')
+RESAMPLE_FILTERS = ('nearest', 'box', 'bilinear', 'hamming', 'bicubic', 'lanczos')
+
+# Значения по умолчанию совпадают с пресетом balanced (прежнее поведение)
+DEFAULTS = {
+    # Выборка пикселей: resize - уменьшение до max_size фильтром resample
+    'sampling': 'resize',
+    'pixel_budget': 65536,
+    'max_size': 400,
+    'resample': 'lanczos',
+    # Квантователь: шаг ячейки гистограммы по каждому каналу
+    'color_tolerance': 32,
+    # Ячейки со средней яркостью вне (min, max) не учитываются
+    'min_brightness': 20,
+    'max_brightness': 240,
+    # Кандидаты с меньшей насыщенностью HSL считаются серыми
+    'min_saturation': 0.1,
+    # Кандидатов в палитру: num_colors * candidate_factor самых частых ячеек
+    'candidate_factor': 5,
+    # Метрика отбора различающихся цветов и ее порог (None - по метрике)
+    'distance': 'rgb',
+    'min_distance': None,
+}
+
+# Пресеты задают выборку, фильтр уменьшения, бюджет и квантователь вместе.
+# Замеры на tests/*.jpg: python -m benchmarks.presets
+PRESETS = {
+    'instant': {
+        'sampling': 'grid', 'pixel_budget': 4096,
+        'color_tolerance': 32, 'candidate_factor': 3, 'distance': 'rgb',
+    },
+    'balanced': {},
+    'quality': {
+        'sampling': 'resize', 'max_size': 800, 'resample': 'lanczos',
+        'color_tolerance': 16, 'candidate_factor': 8, 'distance': 'oklab',
+    },
+}
+DEFAULT_PRESET = 'balanced'
+
+_CHOICES = {
+    'sampling': SAMPLING_CHOICES,
+    'resample': RESAMPLE_FILTERS,
+    'distance': DISTANCE_METRICS,
+}
+# Тип параметров без значения по умолчанию
+_TYPES = {'min_distance': float}
+
+
+def default_settings_file():
+    return Path.home() / '.config' / 'theme-installer' / 'settings.json'
+
+
+def _convert(key, value):
+    """Проверка и приведение значения параметра к его типу."""
+    if key not in DEFAULTS:
+        raise ValueError(f"Неизвестный параметр анализатора: {key}")
+    if value is None:
+        return None
+    kind = _TYPES.get(key) or type(DEFAULTS[key])
+    try:
+        value = kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Неверное значение {key}: {value!r}")
+    if key in _CHOICES and value not in _CHOICES[key]:
+        raise ValueError(f"Неверное значение {key}: {value} (допустимо: {', '.join(_CHOICES[key])})")
+    if kind in (int, float) and value < 0:
+        raise ValueError(f"Неверное значение {key}: {value}")
+    return value
+
+
+def read_settings_file(path=None):
+    """Слой из JSON-файла; пустой, если файла нет."""
+    path = Path(path) if path else default_settings_file()
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Файл настроек должен содержать объект JSON: {path}")
+    return data
+
+
+def environment_settings(environ=None):
+    """Слой из переменных окружения THEME_INSTALLER_<ПАРАМЕТР>."""
+    environ = os.environ if environ is None else environ
+    layer = {}
+    for key in ('preset',) + tuple(DEFAULTS):
+        value = environ.get(ENV_PREFIX + key.upper())
+        if value not in (None, ''):
+            layer[key] = value
+    return layer
+
+
+def resolve_settings(*layers):
+    """Итоговые настройки из слоев по возрастанию приоритета.
+
+    Значения None в слоях не учитываются.
+    """
+    layers = [{key: value for key, value in layer.items() if value is not None}
+              for layer in layers if layer]
+    preset = DEFAULT_PRESET
+    for layer in layers:
+        preset = layer.get('preset', preset)
+    if preset not in PRESETS:
+        raise ValueError(f"Неизвестный пресет: {preset} (доступны: {', '.join(PRESETS)})")
+
+    settings = {**DEFAULTS, **PRESETS[preset]}
+    for layer in layers:
+        for key, value in layer.items():
+            if key != 'preset':
+                settings[key] = _convert(key, value)
+    if settings['min_brightness'] >= settings['max_brightness']:
+        raise ValueError("min_brightness должен быть меньше max_brightness")
+    if not 1 <= settings['color_tolerance'] <= 255:
+        raise ValueError(f"Неверное значение color_tolerance: {settings['color_tolerance']}")
+    settings['preset'] = preset
+    return settings
+
+
+def load_settings(cli=None, path=None, environ=None):
+    """Настройки: умолчания -> пресет -> файл -> окружение -> cli."""
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(ENV_PREFIX + 'SETTINGS')
+    return resolve_settings(read_settings_file(path), environment_settings(environ), cli)
+
+
+def analyzer_kwargs(settings):
+    """Параметры конструктора ColorAnalyzer из настроек."""
+    kwargs = {key: value for key, value in settings.items() if key in DEFAULTS}
+    kwargs['sampling'] = None if kwargs['sampling'] == 'resize' else kwargs['sampling']
+    return kwargs
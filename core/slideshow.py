@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Предрасчитанное расписание тем для слайд-шоу обоев.
+
+Все изображения ротации анализируются заранее, а в файл расписания
+записывается одна готовая к применению тема на изображение: тема не
+зависит от адаптера, ее применяет адаптер платформы планировщика.
+Планировщик на каждом тике только применяет следующую запись и не
+импортирует Pillow и NumPy.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from core.theme import Theme, json_default
+from utils.helpers import collect_images
+
+SCHEDULE_VERSION = 2
+
+
+def default_schedule_file():
+    """Путь к файлу расписания по умолчанию."""
+    return Path.home() / '.config' / 'theme-installer' / 'slideshow.json'
+
+
+def _analyze_entry(task):
+    """Анализ одного изображения в дочернем процессе."""
+    image_path, mode, options = task
+
+    # Импорт здесь: анализатор нужен только при построении расписания
+    from core.color_analyzer import ColorAnalyzer
+    from utils.helpers import resolve_theme_mode
+
+    results = ColorAnalyzer(image_path, **options).analyze()
+    theme_mode = resolve_theme_mode(results, mode)
+    theme_data = results['themes'][theme_mode]
+
+    return {
+        'image': str(image_path),
+        'mode': theme_mode,
+        'theme': theme_data,
+    }
+
+
+def build_schedule(directory, interval, mode='auto', workers=None, options=None):
+    """Параллельный анализ ротации и построение расписания.
+
+    options - параметры ColorAnalyzer (см. core.settings.analyzer_kwargs).
+    """
+    if interval <= 0:
+        raise ValueError("Интервал должен быть положительным")
+
+    images = collect_images(directory)
+    if not images:
+        raise ValueError(f"В директории нет изображений: {directory}")
+
+    tasks = [(path, mode, options or {}) for path in images]
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map сохраняет порядок изображений
+            entries = list(executor.map(_analyze_entry, tasks))
+    else:
+        entries = [_analyze_entry(task) for task in tasks]
+
+    return {
+        'version': SCHEDULE_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'source_dir': str(Path(directory).resolve()),
+        'interval': interval,
+        'entries': entries
+    }
+
+
+def save_schedule(schedule, filepath=None):
+    """Сохранение расписания; запись атомарная."""
+    filepath = Path(filepath) if filepath else default_schedule_file()
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_path = filepath.with_name(filepath.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(schedule, f, ensure_ascii=False, default=json_default)
+    os.replace(temp_path, filepath)
+
+    return filepath
+
+
+def load_schedule(filepath=None):
+    """Загрузка расписания."""
+    filepath = Path(filepath) if filepath else default_schedule_file()
+    with open(filepath, 'r', encoding='utf-8') as f:
+        schedule = json.load(f)
+
+    if schedule.get('version') != SCHEDULE_VERSION:
+        raise ValueError(f"Неподдерживаемая версия расписания: {schedule.get('version')}")
+
+    # Темы разбираются один раз при загрузке, а не на каждом тике
+    for entry in schedule['entries']:
+        entry['theme'] = Theme.from_json(entry['theme'])
+
+    return schedule
+
+
+class SlideshowScheduler:
+    """Применение записей расписания по таймеру."""
+
+    def __init__(self, schedule, platform, manager=None):
+        self.schedule = schedule
+        self.platform = platform
+        self.interval = schedule['interval']
+        self.entries = schedule['entries']
+        self._manager = manager
+
+    @property
+    def manager(self):
+        if self._manager is None:
+            from core.theme_manager import ThemeManager
+            self._manager = ThemeManager(self.platform)
+        return self._manager
+
+    def apply_entry(self, index):
+        """Применение записи без какого-либо анализа."""
+        entry = self.entries[index % len(self.entries)]
+        return self.manager.apply_theme(entry['theme'], entry['image'])
+
+    def run(self, start=0, ticks=None, sleep=time.sleep, clock=time.monotonic):
+        """Цикл слайд-шоу; ticks=None - бесконечно."""
+        index = start
+        next_tick = clock()
+        applied = 0
+
+        while ticks is None or applied < ticks:
+            self.apply_entry(index)
+            applied += 1
+            index = (index + 1) % len(self.entries)
+
+            # Дедлайны от монотонных часов, чтобы интервал не "уплывал"
+            next_tick += self.interval
+            delay = next_tick - clock()
+            if delay > 0 and (ticks is None or applied < ticks):
+                sleep(delay)
+
+        return applied
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Компактная модель темы.
+
+Цвета хранятся упакованными в uint32 (0xRRGGBB) в array('I'), а в hex
+форматируются только на границах вывода: JSON, файлы конфигураций,
+команды оболочки. Для совместимости Theme и Palette ведут себя как
+словари с hex-значениями, поэтому старый код, читающий
+theme_data['primary'], продолжает работать.
+"""
+from array import array
+from collections.abc import Mapping
+
+# Значение вне 24 бит: роль не задана
+UNSET = 0xFFFFFFFF
+
+ROLES = (
+    'primary', 'secondary', 'background', 'surface',
+    'error', 'warning', 'success', 'info',
+    'on_primary', 'on_secondary', 'on_background', 'on_surface', 'on_error'
+)
+_ROLE_INDEX = {role: i for i, role in enumerate(ROLES)}
+
+VARIATION_NAMES = (
+    'light', 'lighter', 'dark', 'darker', 'vibrant', 'muted', 'complementary'
+)
+
+
+def pack_rgb(rgb):
+    """(r, g, b) -> 0xRRGGBB."""
+    r, g, b = rgb
+    return (int(r) << 16) | (int(g) << 8) | int(b)
+
+
+def unpack_rgb(value):
+    """0xRRGGBB -> (r, g, b)."""
+    return (value >> 16) & 0xff, (value >> 8) & 0xff, value & 0xff
+
+
+def hex_to_packed(hex_color):
+    """'#rrggbb' -> 0xRRGGBB."""
+    return int(hex_color.lstrip('#')[:6], 16)
+
+
+def packed_to_hex(value):
+    """0xRRGGBB -> '#rrggbb'."""
+    return f'#{value:06x}'
+
+
+def scale_packed(value, factor):
+    """Умножение каналов на factor с ограничением 0-255."""
+    r = min(255, max(0, int(((value >> 16) & 0xff) * factor)))
+    g = min(255, max(0, int(((value >> 8) & 0xff) * factor)))
+    b = min(255, max(0, int((value & 0xff) * factor)))
+    return (r << 16) | (g << 8) | b
+
+
+def to_packed(color):
+    """Упакованное значение из hex-строки, кортежа или числа."""
+    if isinstance(color, int):
+        return color
+    if isinstance(color, str):
+        return hex_to_packed(color)
+    return pack_rgb(color)
+
+
+class Palette(Mapping):
+    """Набор цветов: именованный (варианты) или упорядоченный (акценты)."""
+
+    __slots__ = ('_names', '_values')
+
+    def __init__(self, values=(), names=None):
+        self._values = array('I', (to_packed(v) for v in values))
+        self._names = tuple(names) if names is not None else None
+        if self._names is not None and len(self._names) != len(self._values):
+            raise ValueError("Число имен не совпадает с числом цветов")
+
+    @property
+    def names(self):
+        return self._names
+
+    def _index(self, key):
+        if isinstance(key, int):
+            return key
+        if self._names is None:
+            raise KeyError(key)
+        try:
+            return self._names.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+
+    def packed(self, key, default=UNSET):
+        """Упакованный цвет по имени или индексу."""
+        try:
+            return self._values[self._index(key)]
+        except (KeyError, IndexError):
+            if default is UNSET:
+                raise
+            return default
+
+    def rgb(self, key):
+        return unpack_rgb(self.packed(key))
+
+    def packed_values(self):
+        return self._values
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [packed_to_hex(v) for v in self._values[key]]
+        try:
+            return packed_to_hex(self._values[self._index(key)])
+        except IndexError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        if self._names is not None:
+            return iter(self._names)
+        return (packed_to_hex(v) for v in self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        if self._names is not None:
+            return key in self._names
+        try:
+            return to_packed(key) in self._values
+        except (TypeError, ValueError):
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, Palette):
+            return self._names == other._names and self._values == other._values
+        return self.to_json() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Palette({self.to_json()!r})"
+
+    def __reduce__(self):
+        return self.__class__, (list(self._values), self._names)
+
+    def to_json(self):
+        """dict для именованной палитры, list для упорядоченной."""
+        hex_values = [packed_to_hex(v) for v in self._values]
+        if self._names is None:
+            return hex_values
+        return dict(zip(self._names, hex_values))
+
+    @classmethod
+    def from_json(cls, data):
+        if isinstance(data, Palette):
+            return data
+        if isinstance(data, Mapping):
+            return cls(data.values(), names=data.keys())
+        return cls(data)
+
+
+class Theme(Mapping):
+    """Тема: роли цветов в array('I') и общие палитры вариантов."""
+
+    __slots__ = ('name', 'mode', '_roles', 'primary_variants',
+                 'secondary_variants', 'accent_colors')
+
+    def __init__(self, name, mode, roles, primary_variants=None,
+                 secondary_variants=None, accent_colors=None):
+        self.name = name
+        self.mode = mode
+        self._roles = array('I', [UNSET]) * len(ROLES)
+        for role, color in roles.items():
+            self._roles[_ROLE_INDEX[role]] = to_packed(color)
+        # Палитры вариантов разделяются между темами разных режимов
+        self.primary_variants = primary_variants if primary_variants is not None else Palette(names=())
+        self.secondary_variants = secondary_variants if secondary_variants is not None else Palette(names=())
+        self.accent_colors = accent_colors if accent_colors is not None else Palette()
+
+    def packed(self, role, default=UNSET):
+        """Упакованный цвет роли; default - если роль не задана."""
+        value = self._roles[_ROLE_INDEX[role]]
+        if value == UNSET:
+            if default is UNSET:
+                raise KeyError(role)
+            return to_packed(default)
+        return value
+
+    def rgb(self, role, default=UNSET):
+        return unpack_rgb(self.packed(role, default))
+
+    def hex(self, role, default=UNSET):
+        return packed_to_hex(self.packed(role, default))
+
+    def with_roles(self, **roles):
+        """Копия темы с замененными ролями; палитры не копируются."""
+        theme = Theme(self.name, self.mode, {}, self.primary_variants,
+                      self.secondary_variants, self.accent_colors)
+        theme._roles = array('I', self._roles)
+        for role, color in roles.items():
+            theme._roles[_ROLE_INDEX[role]] = to_packed(color)
+        return theme
+
+    def _keys(self):
+        # Порядок ключей совпадает с прежними словарями тем
+        yield 'name'
+        yield 'mode'
+        for i, role in enumerate(ROLES):
+            if self._roles[i] != UNSET:
+                yield role
+            if role in ('primary', 'secondary'):
+                yield f'{role}_variants'
+            if role == 'secondary':
+                yield 'accent_colors'
+
+    def __getitem__(self, key):
+        if key == 'name':
+            return self.name
+        if key == 'mode':
+            return self.mode
+        if key in ('primary_variants', 'secondary_variants', 'accent_colors'):
+            return getattr(self, key)
+        index = _ROLE_INDEX.get(key)
+        if index is None or self._roles[index] == UNSET:
+            raise KeyError(key)
+        return packed_to_hex(self._roles[index])
+
+    def __iter__(self):
+        return self._keys()
+
+    def __len__(self):
+        return sum(1 for _ in self._keys())
+
+    def __eq__(self, other):
+        if isinstance(other, Theme):
+            return (self.name == other.name and self.mode == other.mode
+                    and self._roles == other._roles
+                    and self.primary_variants == other.primary_variants
+                    and self.secondary_variants == other.secondary_variants
+                    and self.accent_colors == other.accent_colors)
+        return self.to_json() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Theme({self.name!r}, mode={self.mode!r})"
+
+    def __reduce__(self):
+        roles = {role: self._roles[i] for i, role in enumerate(ROLES) if self._roles[i] != UNSET}
+        return self.__class__, (self.name, self.mode, roles, self.primary_variants,
+                                self.secondary_variants, self.accent_colors)
+
+    def to_json(self):
+        """Словарь с hex-строками в прежнем формате."""
+        data = {}
+        for key in self._keys():
+            value = self[key]
+            data[key] = value.to_json() if isinstance(value, Palette) else value
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        """Тема из словаря (JSON, старые конфигурации)."""
+        if isinstance(data, Theme):
+            return data
+        roles = {role: data[role] for role in ROLES if data.get(role)}
+        return cls(
+            data.get('name', 'Custom'),
+            data.get('mode', 'light'),
+            roles,
+            Palette.from_json(data.get('primary_variants', {})),
+            Palette.from_json(data.get('secondary_variants', {})),
+            Palette.from_json(data.get('accent_colors', []))
+        )
+
+
+def as_theme(theme_data):
+    """Приведение словаря или Theme к Theme."""
+    return Theme.from_json(theme_data)
+
+
+def json_default(obj):
+    """Хук default для json.dump: форматирование в hex на границе вывода.
+
+    Подходит для любых объектов с методом to_json (Theme, Palette,
+    ленивые результаты анализа).
+    """
+    to_json = getattr(obj, 'to_json', None)
+    if to_json is not None:
+        return to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -2,117 +2,98 @@
 """
 Менеджер тем для управления установкой на разные платформы.
 """
-import importlib
 import sys
-from pathlib import Path
+import time
 import os
+from pathlib import Path
 
 # Добавляем путь к текущей директории для импорта
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.logger import setup_logger
+from adapters.registry import adapter_index, load_adapter
+from utils.desktop import detect_platform
+from utils.logger import close_logger, setup_logger
 
 logger = setup_logger()
 
 
 class ThemeManager:
-    def __init__(self, platform=None):
-        """Инициализация менеджера тем."""
+    def __init__(self, platform=None, prescale=False, screen_sizes=None, history=None,
+                 home=None, offline=None):
+        """Инициализация менеджера тем.
+
+        prescale - передавать оболочке обои, заранее приведенные к
+        разрешению мониторов (см. core.wallpaper); screen_sizes - размеры
+        мониторов вместо определенных по /sys/class/drm; history -
+        хранилище истории (core.history), False - без записи истории;
+        home - домашняя директория профиля (лог пишется в ее
+        ~/.cache/theme-installer/logs); offline - только запись
+        файлов профиля (по умолчанию - если home задан).
+        """
+        self.home = home
+        self.logger = logger
+        if home is not None:
+            # Отдельный логгер профиля, без записи в лог текущего пользователя
+            self.logger = setup_logger(f"{logger.name}.{home}",
+                                       log_dir=Path(home) / '.cache' / 'theme-installer' / 'logs')
+            self.logger.propagate = False
         self.platform = platform or self.detect_platform()
+        self.offline = home is not None if offline is None else offline
+        self.prescale = prescale
+        self.screen_sizes = screen_sizes
+        if history is None:
+            from core.history import get_history
+            history = get_history()
+        self.history = history or None
         self.adapter = self._load_adapter()
-        logger.info(f"Инициализирован ThemeManager для платформы: {self.platform}")
+        self.logger.info(f"Инициализирован ThemeManager для платформы: {self.platform}")
     
     def detect_platform(self):
-        """Автоматическое определение платформы."""
-        import platform
-        
-        system = platform.system().lower()
-        
-        if system == "linux":
-            # Проверяем DE
-            de = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
-            if "gnome" in de:
-                return "gnome"
-            elif "kde" in de or "plasma" in de:
-                return "kde"
-            elif "xfce" in de:
-                return "xfce"
-            elif "mate" in de:
-                return "mate"
-            elif "cinnamon" in de:
-                return "cinnamon"
-            
-            # Дополнительные проверки
-            try:
-                # Проверяем через ps
-                import subprocess
-                ps_output = subprocess.check_output(["ps", "-e"], text=True, stderr=subprocess.DEVNULL)
-                if "gnome-shell" in ps_output:
-                    return "gnome"
-                elif "plasmashell" in ps_output or "kded" in ps_output:
-                    return "kde"
-            except:
-                pass
-            
-            return "linux"
-        
-        elif system == "windows":
-            return "windows"
-        elif system == "darwin":
-            return "macos"
-        elif "android" in platform.platform().lower():
-            return "android"
-        
-        return "unknown"
+        """Автоматическое определение платформы (см. utils.desktop)."""
+        return detect_platform()
     
     def _load_adapter(self):
-        """Динамическая загрузка адаптера для платформы."""
-        try:
-            module_name = f"adapters.{self.platform}_adapter"
-            logger.debug(f"Попытка загрузки модуля: {module_name}")
-            
-            # Пытаемся импортировать адаптер
-            try:
-                module = importlib.import_module(module_name)
-                adapter_class_name = f"{self.platform.capitalize()}Adapter"
-                
-                if hasattr(module, adapter_class_name):
-                    adapter_class = getattr(module, adapter_class_name)
-                    logger.info(f"Загружен адаптер: {adapter_class_name}")
-                    return adapter_class()
-                else:
-                    raise AttributeError(f"Класс {adapter_class_name} не найден в модуле")
-                    
-            except ImportError as e:
-                logger.warning(f"Адаптер для {self.platform} не найден: {e}")
-                # Возвращаем базовый адаптер
-                from adapters.base_adapter import BaseAdapter
-                return BaseAdapter()
-                
-        except Exception as e:
-            logger.error(f"Ошибка загрузки адаптера: {e}")
-            # Возвращаем заглушку
-            from adapters.base_adapter import BaseAdapter
-            return BaseAdapter()
+        """Загрузка адаптера платформы через реестр (импорт только его модуля)."""
+        spec = adapter_index().get(self.platform)
+        self.logger.debug(f"Загрузка адаптера {self.platform}: {spec}")
+        adapter = load_adapter(self.platform, home=self.home, offline=self.offline)
+        self.logger.info(f"Загружен адаптер: {type(adapter).__name__}")
+        return adapter
     
     def apply_theme(self, theme_data, wallpaper_path=None):
-        """Применение темы."""
+        """Применение темы.
+
+        wallpaper_path - путь к обоям или список путей по одному на
+        монитор.
+        """
+        start = time.perf_counter()
+        source_wallpaper = wallpaper_path
+        success, error = False, None
         try:
-            logger.info(f"Применение темы для {self.platform}")
+            self.logger.info(f"Применение темы для {self.platform}")
             
-            # Применение обоев
-            if wallpaper_path and hasattr(self.adapter, 'set_wallpaper'):
-                logger.info(f"Установка обоев: {wallpaper_path}")
-                self.adapter.set_wallpaper(wallpaper_path)
+            if self.prescale and wallpaper_path:
+                wallpaper_path = self._prescale(wallpaper_path)
             
-            # Применение цветовой схемы
-            logger.info("Применение цветовой схемы...")
-            success = self.adapter.apply_colors(theme_data)
+            # Обои и цвета - одной транзакцией настроек, если адаптер ее поддерживает
+            with self.adapter.transaction():
+                # Применение обоев
+                if isinstance(wallpaper_path, (list, tuple)):
+                    if len(wallpaper_path) > 1 and hasattr(self.adapter, 'set_wallpapers'):
+                        self.logger.info(f"Установка обоев мониторов: {', '.join(map(str, wallpaper_path))}")
+                        self.adapter.set_wallpapers([str(path) for path in wallpaper_path])
+                        wallpaper_path = None
+                    else:
+                        wallpaper_path = wallpaper_path[0] if wallpaper_path else None
+                if wallpaper_path and hasattr(self.adapter, 'set_wallpaper'):
+                    self.logger.info(f"Установка обоев: {wallpaper_path}")
+                    self.adapter.set_wallpaper(wallpaper_path)
+                
+                # Применение цветовой схемы
+                self.logger.info("Применение цветовой схемы...")
+                success = self.adapter.apply_colors(theme_data)
             
             if success:
-                # Сохранение темы
-                self._save_theme_config(theme_data)
-                
                 # Обновление системы
                 if hasattr(self.adapter, 'refresh'):
                     self.adapter.refresh()
@@ -120,41 +101,98 @@ class ThemeManager:
             return success
             
         except Exception as e:
-            logger.error(f"Ошибка применения темы: {e}")
+            error = str(e)
+            self.logger.error(f"Ошибка применения темы: {e}")
             import traceback
-            logger.error(traceback.format_exc())
+            self.logger.error(traceback.format_exc())
             return False
+        finally:
+            self._record_apply(theme_data, source_wallpaper, success, error,
+                               (time.perf_counter() - start) * 1000)
     
-    def _save_theme_config(self, theme_data):
-        """Сохранение конфигурации темы."""
-        try:
-            config_dir = Path.home() / '.config' / 'theme-installer'
-            config_dir.mkdir(parents=True, exist_ok=True)
-            
-            config_file = config_dir / f"theme_{self.platform}.json"
-            
-            import json
-            from datetime import datetime
-            
-            config = {
-                'platform': self.platform,
-                'applied_at': datetime.now().isoformat(),
-                'theme': theme_data
-            }
-            
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"Конфигурация сохранена: {config_file}")
-        except Exception as e:
-            logger.error(f"Ошибка сохранения конфигурации: {e}")
+    def apply_transition(self, theme_data, wallpaper_path=None, steps=None, duration=None,
+                         source=None):
+        """Применение темы с плавным переходом от текущей.
+
+        source - исходная тема (по умолчанию последняя успешно
+        примененная на этой платформе из истории). Промежуточные кадры
+        применяются adapter.apply_step, последний - полным apply_theme
+        с обоями. Адаптеры без промежуточных цветов (smooth_transitions)
+        применяют тему сразу.
+        Возвращает (успех, отчет о кадрах или None без перехода).
+        """
+        from core.transition import DEFAULT_DURATION, DEFAULT_STEPS, interpolate_themes, play_transition
+        
+        if not self.adapter.smooth_transitions:
+            self.logger.info("Переход пропущен: окружение не показывает промежуточные цвета")
+            return self.apply_theme(theme_data, wallpaper_path), None
+        if source is None and self.history is not None and not self.offline:
+            last = self.history.last_themes(1, platform=self.platform, successful=True)
+            source = last[0]['theme'] if last and last[0].get('theme') else None
+        if source is None or self.offline:
+            self.logger.info("Переход пропущен: нет исходной темы или профиль не активен")
+            return self.apply_theme(theme_data, wallpaper_path), None
+        
+        steps = steps or DEFAULT_STEPS
+        duration = DEFAULT_DURATION if duration is None else duration
+        frames = interpolate_themes(source, theme_data, steps)[:-1]
+        self.logger.info(f"Переход из {steps} шагов за {duration} с")
+        
+        def apply_frame(frame):
+            with self.adapter.transaction():
+                self.adapter.apply_step(frame)
+        
+        # Последний шаг - полное применение, на его долю - один интервал
+        report = play_transition(frames, apply_frame, duration * len(frames) / steps)
+        start = time.perf_counter()
+        success = self.apply_theme(theme_data, wallpaper_path)
+        report['final_ms'] = (time.perf_counter() - start) * 1000
+        self.logger.info(f"Переход: применено {report['applied']} из {report['steps']}, "
+                    f"отброшено {report['dropped']}, p95 {report['latency_ms']['p95']:.1f} мс")
+        return success, report
+    
+    def _prescale(self, wallpaper_path):
+        """Обои под разрешение мониторов из кэша (создаются при первом применении)."""
+        from core.wallpaper import prescale_wallpapers
+        
+        single = not isinstance(wallpaper_path, (list, tuple))
+        paths = prescale_wallpapers([wallpaper_path] if single else wallpaper_path,
+                                    self.screen_sizes)
+        self.logger.info(f"Обои под разрешение мониторов: {', '.join(paths)}")
+        return paths[0] if single else paths
+    
+    def _record_apply(self, theme_data, wallpaper_path, success, error, duration_ms):
+        """Запись применения в историю (в фоне, без ожидания записи)."""
+        if self.history is None:
+            return
+        from core.theme import as_theme
+        
+        wallpapers = wallpaper_path if isinstance(wallpaper_path, (list, tuple)) else [wallpaper_path]
+        wallpapers = [str(path) for path in wallpapers if path]
+        self.history.record(
+            'apply',
+            platform=self.platform,
+            image_path=wallpapers[0] if wallpapers else None,
+            mode=as_theme(theme_data).mode if theme_data else None,
+            params={'wallpapers': wallpapers, 'prescale': self.prescale,
+                    'home': str(self.home) if self.home else None},
+            theme=theme_data,
+            duration_ms=duration_ms,
+            success=success,
+            error=error,
+        )
+    
+    def close(self):
+        """Закрытие лога профиля (лог текущего пользователя не закрывается)."""
+        if self.logger is not logger:
+            close_logger(self.logger)
     
     def get_current_theme(self):
         """Получение текущей темы."""
         try:
             return self.adapter.get_current_theme()
         except Exception as e:
-            logger.error(f"Ошибка получения текущей темы: {e}")
+            self.logger.error(f"Ошибка получения текущей темы: {e}")
             return {}
     
     def list_themes(self):
@@ -162,7 +200,7 @@ class ThemeManager:
         try:
             return self.adapter.list_themes()
         except Exception as e:
-            logger.error(f"Ошибка получения списка тем: {e}")
+            self.logger.error(f"Ошибка получения списка тем: {e}")
             return []
     
     def restore_backup(self):
@@ -172,7 +210,7 @@ class ThemeManager:
                 return self.adapter.restore_backup()
             return False
         except Exception as e:
-            logger.error(f"Ошибка восстановления из резервной копии: {e}")
+            self.logger.error(f"Ошибка восстановления из резервной копии: {e}")
             return False
 
 
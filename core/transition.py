@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Плавный переход между темами.
+
+Промежуточные темы интерполируются в OKLab и вычисляются заранее
+одним векторным проходом: все роли обеих тем переводятся в OKLab
+массивом (R, 3), шаги - массивом (N, R, 3). Кадры применяются через
+очередь с ограничением частоты: если применение кадра занимает больше
+интервала, очередь хранит только самый новый кадр, а устаревшие
+отбрасываются. Итог - задержки применения кадров и число отброшенных.
+"""
+import threading
+import time
+
+import numpy as np
+
+from core.colorspace import oklab_to_rgb, pack_array, rgb_to_oklab, unpack_array
+from core.exporter import ROLE_DEFAULTS
+from core.theme import ROLES, Theme, as_theme
+
+DEFAULT_STEPS = 12
+DEFAULT_DURATION = 1.5
+
+
+def interpolate_themes(source, target, steps=DEFAULT_STEPS):
+    """Темы шагов 1..steps перехода source -> target (последняя - target).
+
+    Роли без значения берутся из ROLE_DEFAULTS; режим (светлый/темный)
+    переключается на середине перехода.
+    """
+    source, target = as_theme(source), as_theme(target)
+    steps = max(1, int(steps))
+    packed = np.array([[theme.packed(role, ROLE_DEFAULTS[role]) for role in ROLES]
+                       for theme in (source, target)], dtype=np.uint32)
+    start, end = rgb_to_oklab(unpack_array(packed) / 255.0)
+
+    # (N, 1, 1) * (R, 3) -> (N, R, 3): все шаги за один проход
+    t = np.arange(1, steps + 1, dtype=np.float64) / steps
+    lab = start + t[:, None, None] * (end - start)
+    rgb = np.rint(np.clip(oklab_to_rgb(lab), 0.0, 1.0) * 255).astype(np.uint8)
+    frames = pack_array(rgb).tolist()
+    frames[-1] = packed[1].tolist()
+
+    return [
+        Theme(target.name, source.mode if fraction < 0.5 else target.mode,
+              dict(zip(ROLES, roles)), target.primary_variants,
+              target.secondary_variants, target.accent_colors)
+        for fraction, roles in zip(t.tolist(), frames)
+    ]
+
+
+class FrameQueue:
+    """Очередь кадров из одного места с ограничением частоты.
+
+    submit() заменяет еще не примененный кадр новым (старый считается
+    отброшенным); фоновый поток применяет не чаще раза в min_interval
+    секунд и всегда берет самый новый кадр.
+    """
+
+    def __init__(self, apply, min_interval=0.0, clock=time.monotonic):
+        self.apply = apply
+        self.min_interval = min_interval
+        self.clock = clock
+        self.latencies = []
+        self.errors = []
+        self.dropped = 0
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='theme-transition', daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        with self._condition:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = frame
+            self._condition.notify()
+
+    def close(self):
+        """Ожидание применения последнего кадра и остановка потока."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        last_apply = None
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                if last_apply is not None:
+                    # Ограничение частоты: за время ожидания кадр может смениться
+                    delay = last_apply + self.min_interval - self.clock()
+                    while delay > 0:
+                        self._condition.wait(delay)
+                        delay = last_apply + self.min_interval - self.clock()
+                frame, self._pending = self._pending, None
+
+            last_apply = self.clock()
+            try:
+                self.apply(frame)
+            except Exception as e:
+                self.errors.append(str(e))
+            self.latencies.append((self.clock() - last_apply) * 1000)
+
+
+def play_transition(frames, apply, duration=DEFAULT_DURATION, sleep=time.sleep,
+                    clock=time.monotonic):
+    """Применение кадров равномерно за duration секунд.
+
+    Возвращает отчет: число кадров, примененных и отброшенных,
+    задержки применения (мс) и фактическую длительность.
+    """
+    interval = duration / len(frames) if frames else 0.0
+    queue = FrameQueue(apply, interval, clock)
+    start = clock()
+    for i, frame in enumerate(frames):
+        # Дедлайны от начала перехода: медленные кадры не сдвигают остальные
+        delay = start + i * interval - clock()
+        if delay > 0:
+            sleep(delay)
+        queue.submit(frame)
+    queue.close()
+    return transition_report(len(frames), queue.latencies, queue.dropped, queue.errors,
+                             (clock() - start) * 1000)
+
+
+def transition_report(steps, latencies, dropped, errors=(), duration_ms=0.0):
+    """Сводка перехода с перцентилями задержки применения кадра."""
+    values = np.array(latencies, dtype=np.float64)
+    percentile = (lambda q: float(np.percentile(values, q))) if len(values) else (lambda q: 0.0)
+    return {
+        'steps': steps,
+        'applied': len(latencies),
+        'dropped': dropped,
+        'errors': list(errors),
+        'latency_ms': {
+            'p50': percentile(50),
+            'p95': percentile(95),
+            'max': float(values.max()) if len(values) else 0.0,
+        },
+        'duration_ms': duration_ms,
+    }
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Пакетная генерация вариаций и цветовых схем.
+
+Вариации и схемы строятся сразу для всех цветов массивом (N, 3):
+одно преобразование RGB -> HSL, масштабирование S и L таблицей
+коэффициентов и одно обратное преобразование.
+"""
+import numpy as np
+
+from core.colorspace import hsl_to_rgb, rgb_to_hsl, to_uint8
+
+# Коэффициент и границы (min, max) насыщенности и светлоты
+# для каждой вариации в порядке core.theme.VARIATION_NAMES
+_INF = np.inf
+_S_FACTOR = np.array([0.4, 0.3, 1.2, 1.4, 1.3, 0.6, 1.0])
+_S_MIN = np.array([0.1, 0.05, -_INF, -_INF, -_INF, -_INF, -_INF])
+_S_MAX = np.array([_INF, _INF, 1.0, 1.0, 1.0, _INF, _INF])
+_L_FACTOR = np.array([1.4, 1.6, 0.4, 0.2, 1.1, 0.9, 1.0])
+_L_MIN = np.array([-_INF, -_INF, 0.1, 0.05, -_INF, -_INF, -_INF])
+_L_MAX = np.array([0.95, 0.98, _INF, _INF, 0.8, _INF, _INF])
+_H_SHIFT = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.5])
+
+# Сдвиги тона для схем; первым цветом complementary и triadic
+# идет исходный цвет без пересчета
+ANALOGOUS_STEP = 0.1  # 36 градусов
+SCHEME_SHIFTS = {
+    'complementary': (0.5,),
+    'triadic': (1 / 3, 2 / 3),
+}
+
+
+def variation_table(rgb):
+    """Вариации для всех цветов: (N, 3) uint8 -> (N, 7, 3) uint8."""
+    hsl = rgb_to_hsl(np.asarray(rgb, dtype=np.uint8).reshape(-1, 3))
+    h, s, l = hsl[:, 0:1], hsl[:, 1:2], hsl[:, 2:3]
+
+    new_h = (h + _H_SHIFT) % 1.0
+    new_s = np.minimum(np.maximum(s * _S_FACTOR, _S_MIN), _S_MAX)
+    new_l = np.minimum(np.maximum(l * _L_FACTOR, _L_MIN), _L_MAX)
+
+    return to_uint8(hsl_to_rgb(np.stack([new_h, new_s, new_l], axis=-1)))
+
+
+def hue_rotations(rgb, shifts):
+    """Поворот тона на каждый сдвиг: (N, 3) uint8 -> (N, len(shifts), 3) uint8."""
+    hsl = rgb_to_hsl(np.asarray(rgb, dtype=np.uint8).reshape(-1, 3))
+    rotated = np.repeat(hsl[:, None, :], len(shifts), axis=1)
+    rotated[..., 0] = (hsl[:, 0:1] + np.asarray(shifts, dtype=np.float64)) % 1.0
+    return to_uint8(hsl_to_rgb(rotated))
+
+
+def analogous_shifts(num_colors=5):
+    """Сдвиги тона аналоговой схемы: i * 0.1 для i от -n//2 до n//2."""
+    offsets = np.arange(-(num_colors // 2), num_colors // 2 + 1)
+    return offsets * ANALOGOUS_STEP
+
+
+def scheme_table(rgb, num_analogous=5):
+    """Все схемы для всех цветов: имя -> (N, K, 3) uint8.
+
+    В complementary и triadic первый цвет - исходный.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8).reshape(-1, 3)
+    analogous = analogous_shifts(num_analogous)
+    shifts = np.concatenate([analogous, *SCHEME_SHIFTS.values()])
+
+    # Один проход HSL для всех сдвигов всех схем
+    rotated = hue_rotations(rgb, shifts)
+
+    table = {'analogous': rotated[:, :len(analogous)]}
+    start = len(analogous)
+    for name, scheme_shifts in SCHEME_SHIFTS.items():
+        end = start + len(scheme_shifts)
+        table[name] = np.concatenate([rgb[:, None, :], rotated[:, start:end]], axis=1)
+        start = end
+    return table
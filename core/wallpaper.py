@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Кэш обоев, заранее обрезанных и уменьшенных под разрешение мониторов.
+
+Оболочка рабочего стола декодирует и масштабирует обои при каждом входе
+и каждой смене; для изображений 8K/16K это заметные память и время.
+Здесь обои один раз приводятся к размеру монитора (обрезка по центру
+под пропорции экрана и уменьшение) и сохраняются в JPEG в
+~/.cache/theme-installer/wallpapers под ключом из хэша исходного файла
+и размера экрана. Повторное применение тех же обоев находит готовый
+файл без декодирования.
+"""
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from utils.hashing import file_hash
+
+DRM_DIR = Path('/sys/class/drm')
+# JPEG быстро декодируется оболочками; качество выше - без видимых артефактов
+JPEG_QUALITY = 92
+
+
+def cache_dir():
+    return Path.home() / '.cache' / 'theme-installer' / 'wallpapers'
+
+
+def monitor_sizes(drm_dir=DRM_DIR):
+    """Размеры подключенных мониторов [(w, h)] по /sys/class/drm.
+
+    Берется предпочтительный (первый) режим каждого подключенного
+    разъема; пустой список, если DRM недоступен.
+    """
+    sizes = []
+    try:
+        connectors = sorted(drm_dir.glob('card*-*'))
+    except OSError:
+        return sizes
+    for connector in connectors:
+        try:
+            if (connector / 'status').read_text().strip() != 'connected':
+                continue
+            modes = (connector / 'modes').read_text().split()
+        except OSError:
+            continue
+        if modes:
+            width, _, height = modes[0].partition('x')
+            try:
+                # Режим может иметь суффикс, например 1920x1080i
+                sizes.append((int(width), int(height.rstrip('ip'))))
+            except ValueError:
+                continue
+    return sizes
+
+
+def _covers(size, target):
+    return size[0] >= target[0] and size[1] >= target[1]
+
+
+def fit_to_screen(image, size):
+    """Обрезка по центру под пропорции size и уменьшение до size."""
+    width, height = size
+    scale = max(width / image.width, height / image.height)
+    crop_w, crop_h = round(width / scale), round(height / scale)
+    left = (image.width - crop_w) // 2
+    top = (image.height - crop_h) // 2
+    box = (left, top, left + crop_w, top + crop_h)
+    # reducing_gap: грубое уменьшение в целое число раз, затем LANCZOS
+    return image.resize(size, Image.Resampling.LANCZOS, box=box, reducing_gap=3.0)
+
+
+def prescaled_wallpaper(wallpaper_path, size, directory=None):
+    """Путь к обоям, приведенным к размеру size; создаются при первом вызове.
+
+    Если исходник меньше экрана, возвращается сам исходный путь.
+    """
+    directory = Path(directory) if directory else cache_dir()
+    width, height = size
+    path = directory / f"{file_hash(wallpaper_path)[:24]}-{width}x{height}.jpg"
+    if path.exists():
+        return path
+
+    with Image.open(wallpaper_path) as source:
+        if not _covers(source.size, size):
+            return Path(wallpaper_path)
+        # JPEG декодируется сразу в уменьшенном масштабе, не меньше экрана
+        source.draft('RGB', size)
+        image = source.convert('RGB')
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fit_to_screen(image, size).save(temp_path, format='JPEG', quality=JPEG_QUALITY)
+    os.replace(temp_path, path)
+    return path
+
+
+def prescale_wallpapers(wallpaper_paths, sizes=None):
+    """Обои под мониторы: изображение i - под экран i.
+
+    Одно изображение на все экраны приводится к самому большому экрану.
+    sizes - размеры экранов (по умолчанию monitor_sizes()); без них
+    пути возвращаются как есть.
+    """
+    paths = [str(path) for path in wallpaper_paths]
+    sizes = list(sizes) if sizes else monitor_sizes()
+    if not sizes:
+        return paths
+    if len(paths) == 1:
+        sizes = [max(sizes, key=lambda size: size[0] * size[1])]
+
+    result = []
+    for i, path in enumerate(paths):
+        size = sizes[min(i, len(sizes) - 1)]
+        try:
+            result.append(str(prescaled_wallpaper(path, size)))
+        except OSError as e:
+            print(f"Не удалось подготовить обои {path}: {e}")
+            result.append(path)
+    return result
@@ -5,50 +5,154 @@
 import argparse
 import sys
 import os
-import platform
+import time
 
 # Добавляем текущую директорию в путь поиска модулей
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from core.color_analyzer import ColorAnalyzer
+    # Анализатор (Pillow, NumPy) импортируется только при анализе
     from core.theme_manager import ThemeManager
-    from utils.helpers import print_results, display_color_palette
+    from adapters import adapter_index, available_platforms
+    from utils.desktop import detect_platform
+    from utils.helpers import print_results, display_color_palette, resolve_theme_mode
+    from core.settings import (
+        DISTANCE_METRICS, PRESETS, RESAMPLE_FILTERS, SAMPLING_CHOICES, analyzer_kwargs, load_settings
+    )
 except ImportError as e:
     print(f"Ошибка импорта: {e}")
     print("Убедитесь, что все файлы в правильных директориях:")
-    print("  core/color_analyzer.py")
     print("  core/theme_manager.py")
     print("  utils/helpers.py")
     sys.exit(1)
 
 
-def detect_platform():
-    """Автоматическое определение платформы."""
-    system = platform.system().lower()
-
-    if system == "windows":
-        return "windows"
-    elif system == "darwin":
-        return "macos"
-    elif system == "linux":
-        # Проверяем DE для Linux
-        de = os.environ.get("XDG_CURRENT_DESKTOP", "").lower()
-        if "gnome" in de:
-            return "gnome"
-        elif "kde" in de:
-            return "kde"
-        elif "xfce" in de:
-            return "xfce"
-        elif "mate" in de:
-            return "mate"
-        elif "cinnamon" in de:
-            return "cinnamon"
-        return "linux"
-    elif "android" in platform.platform().lower():
-        return "android"
-
-    return "unknown"
+def export_theme(exporter, theme_data, export_dir, basename=None):
+    """Экспорт темы во все запрошенные форматы с выводом итога."""
+    for fmt, (path, written) in exporter.export(theme_data, export_dir, basename).items():
+        status = "записан" if written else "без изменений"
+        print(f"  {fmt:<11} {path} ({status})", file=sys.stderr)
+
+
+def show_history(limit):
+    """Последние и самые долгие применения тем из истории."""
+    from datetime import datetime
+    from core.history import get_history
+
+    history = get_history()
+    for title, events in (("Последние применения:", history.last_themes(limit)),
+                          ("Самые долгие применения:", history.slowest_applies(limit))):
+        print(title)
+        if not events:
+            print("  нет записей")
+        for event in events:
+            created = datetime.fromtimestamp(event['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+            status = "ok" if event['success'] else "ошибка"
+            print(f"  {created}  {event['platform'] or '-':<9} {event['mode'] or '-':<6} "
+                  f"{event['duration_ms']:>8.1f} ms  {status:<6} {event['image_path'] or ''}")
+        print()
+
+
+def print_transition_report(report):
+    """Итог плавного перехода: кадры и задержки их применения."""
+    latency = report['latency_ms']
+    print(f"Переход: кадров {report['steps']}, применено {report['applied']}, "
+          f"отброшено {report['dropped']} за {report['duration_ms']:.0f} мс")
+    print(f"Задержка кадра: p50 {latency['p50']:.1f} мс, p95 {latency['p95']:.1f} мс, "
+          f"max {latency['max']:.1f} мс; итоговое применение {report['final_ms']:.1f} мс")
+    for error in report['errors'][:3]:
+        print(f"Ошибка кадра: {error}")
+
+
+def run_fleet(args, results, platform_name, wallpapers):
+    """Применение темы к профилям --fleet с итогом по каждому профилю."""
+    from core.fleet import apply_fleet
+
+    theme_mode = resolve_theme_mode(results, args.mode)
+    if theme_mode not in results['themes']:
+        print(f"Режим {theme_mode} не входит в --themes")
+        return
+    screen_sizes = None
+    if args.screen_sizes:
+        from core.screens import parse_screen_size
+        screen_sizes = [parse_screen_size(size) for size in args.screen_sizes]
+
+    print(f"\nПрименение темы ({theme_mode}) для {platform_name} к {len(args.fleet)} профилям...")
+    start = time.perf_counter()
+    reports = []
+    for report in apply_fleet(results['themes'][theme_mode], wallpapers, args.fleet, platform_name,
+                              workers=args.fleet_workers, prescale=args.prescale,
+                              screen_sizes=screen_sizes):
+        reports.append(report)
+
+    print(f"\n{'профиль':<40} {'статус':<8} {'время, мс':>10}")
+    for report in sorted(reports, key=lambda report: report['home']):
+        status = "ok" if report['success'] else "ошибка"
+        print(f"{report['home']:<40} {status:<8} {report['duration_ms']:>10.1f}"
+              + (f"  {report['error']}" if report['error'] else ""))
+    failed = sum(not report['success'] for report in reports)
+    print(f"\nГотово: {len(reports) - failed} из {len(reports)} профилей "
+          f"за {(time.perf_counter() - start):.2f} с")
+
+
+def run_batch(args):
+    """Пакетный анализ директории с потоковым выводом NDJSON."""
+    from core.batch import iter_batch
+    from core.exporter import ThemeExporter, default_export_dir, write_ndjson
+    from utils.helpers import collect_images
+
+    images = collect_images(args.batch)
+    exporter = ThemeExporter(args.export) if args.export else None
+    export_dir = args.export_dir or default_export_dir()
+
+    if args.preview_dir:
+        from core.preview import save_previews
+
+    def results():
+        batch = iter_batch(images, modes=args.themes, schemes=args.schemes,
+                           workers=args.workers, **analyzer_options(args))
+        for image, result in zip(images, batch):
+            if exporter:
+                theme_mode = resolve_theme_mode(result, args.mode)
+                if theme_mode in result['themes']:
+                    export_theme(exporter, result['themes'][theme_mode], export_dir, image.stem)
+            if args.preview_dir:
+                save_previews(result, args.preview_dir, image.stem, wallpaper=image)
+            yield result
+
+    # Результаты пишутся по одному и не накапливаются в памяти
+    if args.output and args.output != '-':
+        with open(args.output, 'w', encoding='utf-8') as f:
+            count = write_ndjson(results(), f)
+        print(f"Результаты ({count}) сохранены в: {args.output}", file=sys.stderr)
+    else:
+        write_ndjson(results(), sys.stdout)
+
+
+def analyzer_options(args):
+    """Параметры ColorAnalyzer: настройки (core.settings) и аргументы командной строки."""
+    settings = load_settings({
+        'preset': args.preset,
+        'sampling': args.sampling,
+        'pixel_budget': args.pixel_budget,
+        'max_size': args.max_size,
+        'resample': args.resample,
+        'color_tolerance': args.color_tolerance,
+        'min_brightness': args.min_brightness,
+        'max_brightness': args.max_brightness,
+        'min_saturation': args.min_saturation,
+        'candidate_factor': args.candidates,
+        'distance': args.distance,
+        'min_distance': args.min_distance,
+    }, path=args.settings)
+    return {
+        **analyzer_kwargs(settings),
+        'min_contrast': args.min_contrast or None,
+        'weighting': not args.no_weighting,
+        'frames': args.frames,
+        'frame_selection': args.frame_selection,
+        'per_frame': args.frame_palettes,
+    }
 
 
 def main():
@@ -64,7 +168,7 @@ def main():
 
     parser.add_argument(
         '--platform',
-        choices=['auto', 'gnome', 'kde', 'android', 'windows', 'macos', 'xfce', 'mate', 'cinnamon'],
+        choices=['auto'] + available_platforms(),
         default='auto',
         help='Целевая платформа'
     )
@@ -76,23 +180,265 @@ def main():
         help='Режим темы'
     )
 
+    parser.add_argument(
+        '--themes',
+        nargs='+',
+        choices=['light', 'dark', 'mixed'],
+        help='Строить только указанные режимы тем (по умолчанию все)'
+    )
+
+    parser.add_argument(
+        '--schemes',
+        nargs='*',
+        choices=['analogous', 'complementary', 'triadic'],
+        help='Строить только указанные цветовые схемы; без значений - ни одной'
+    )
+
+    parser.add_argument(
+        '--min-contrast',
+        type=float,
+        default=4.5,
+        help='Минимальный контраст WCAG для цветов текста (0 - без коррекции)'
+    )
+
+    parser.add_argument(
+        '--preset',
+        choices=list(PRESETS),
+        help='Пресет анализатора: скорость/качество (по умолчанию balanced); '
+             'параметры ниже переопределяют его'
+    )
+
+    parser.add_argument(
+        '--settings',
+        metavar='FILE',
+        help='Файл настроек анализатора (JSON, по умолчанию '
+             '~/.config/theme-installer/settings.json); '
+             'переменные THEME_INSTALLER_<ПАРАМЕТР> переопределяют его'
+    )
+
+    parser.add_argument(
+        '--distance',
+        choices=DISTANCE_METRICS,
+        help='Метрика отбора различающихся цветов (по умолчанию rgb)'
+    )
+
+    parser.add_argument(
+        '--min-distance',
+        type=float,
+        help='Порог метрики для различающихся цветов (rgb 70, oklab 0.08, ciede2000 10)'
+    )
+
+    parser.add_argument(
+        '--sampling',
+        choices=SAMPLING_CHOICES,
+        help='Выборка пикселей: уменьшение до --max-size px, все пиксели или бюджет (grid, blue_noise)'
+    )
+
+    parser.add_argument(
+        '--pixel-budget',
+        type=int,
+        help='Число пикселей для выборки grid/blue_noise (по умолчанию 65536)'
+    )
+
+    parser.add_argument(
+        '--max-size',
+        type=int,
+        help='Наибольшая сторона изображения при выборке resize (по умолчанию 400)'
+    )
+
+    parser.add_argument(
+        '--resample',
+        choices=RESAMPLE_FILTERS,
+        help='Фильтр уменьшения при выборке resize (по умолчанию lanczos)'
+    )
+
+    parser.add_argument(
+        '--color-tolerance',
+        type=int,
+        help='Шаг квантования цветов гистограммы (по умолчанию 32)'
+    )
+
+    parser.add_argument(
+        '--min-brightness',
+        type=int,
+        help='Цвета со средней яркостью не выше порога не учитываются (по умолчанию 20)'
+    )
+
+    parser.add_argument(
+        '--max-brightness',
+        type=int,
+        help='Цвета со средней яркостью не ниже порога не учитываются (по умолчанию 240)'
+    )
+
+    parser.add_argument(
+        '--min-saturation',
+        type=float,
+        help='Цвета с меньшей насыщенностью считаются серыми (по умолчанию 0.1)'
+    )
+
+    parser.add_argument(
+        '--candidates',
+        type=int,
+        help='Кандидатов в палитру на один цвет (по умолчанию 5)'
+    )
+
+    parser.add_argument(
+        '--no-weighting',
+        action='store_true',
+        help='Считать все пиксели поровну (без весов центра кадра и контраста)'
+    )
+
+    parser.add_argument(
+        '--frames',
+        type=int,
+        help='Число кадров анимации (GIF/WebP) для анализа; по умолчанию только первый'
+    )
+
+    parser.add_argument(
+        '--frame-selection',
+        choices=['even', 'scene'],
+        default='even',
+        help='Выбор кадров: равномерно или по смене сцены'
+    )
+
+    parser.add_argument(
+        '--frame-palettes',
+        action='store_true',
+        help='Добавить в результат палитры отдельных кадров'
+    )
+
     parser.add_argument(
         '--apply',
         action='store_true',
         help='Применить тему после анализа'
     )
 
+    parser.add_argument(
+        '--transition',
+        type=int,
+        nargs='?',
+        const=12,
+        metavar='STEPS',
+        help='Плавный переход от текущей темы (интерполяция в OKLab, по умолчанию 12 шагов)'
+    )
+
+    parser.add_argument(
+        '--transition-duration',
+        type=float,
+        default=1.5,
+        metavar='SECONDS',
+        help='Длительность перехода в секундах (по умолчанию 1.5)'
+    )
+
     parser.add_argument(
         '--analyze-only',
         action='store_true',
         help='Только анализ без применения'
     )
 
+    parser.add_argument(
+        '--preview-dir',
+        help='Сохранить PNG-превью каждой темы в директорию'
+    )
+
+    parser.add_argument(
+        '--screens',
+        nargs='+',
+        metavar='IMAGE',
+        help='Обои остальных мониторов: общая тема по всем изображениям'
+    )
+
+    parser.add_argument(
+        '--screen-sizes',
+        nargs='+',
+        metavar='WxH',
+        help='Размеры мониторов для весов при объединении (по порядку изображений)'
+    )
+
+    parser.add_argument(
+        '--prescale',
+        action='store_true',
+        help='Передавать оболочке обои, обрезанные и уменьшенные под разрешение мониторов '
+             '(кэш в ~/.cache/theme-installer/wallpapers; размеры - из --screen-sizes '
+             'или /sys/class/drm)'
+    )
+
+    parser.add_argument(
+        '--fleet',
+        nargs='+',
+        metavar='HOME',
+        help='Применить тему к профилям пользователей (домашние директории): '
+             'только запись файлов профиля, настройки сеанса - при следующем входе'
+    )
+
+    parser.add_argument(
+        '--fleet-workers',
+        type=int,
+        help='Число профилей, обрабатываемых одновременно (по умолчанию 8)'
+    )
+
     parser.add_argument(
         '--output',
         help='Сохранить палитру в файл (JSON)'
     )
 
+    parser.add_argument(
+        '--schedule',
+        metavar='DIR',
+        help='Предрасчитать расписание тем для ротации обоев из директории'
+    )
+
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=600,
+        help='Интервал смены обоев в секундах (по умолчанию 600)'
+    )
+
+    parser.add_argument(
+        '--schedule-file',
+        help='Файл расписания (по умолчанию ~/.config/theme-installer/slideshow.json)'
+    )
+
+    parser.add_argument(
+        '--run-schedule',
+        action='store_true',
+        help='Запустить слайд-шоу по готовому расписанию'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Число процессов для анализа (потоков для --screens)'
+    )
+
+    parser.add_argument(
+        '--batch',
+        metavar='DIR',
+        help='Пакетный анализ директории; результаты - NDJSON в --output или stdout'
+    )
+
+    parser.add_argument(
+        '--export',
+        nargs='+',
+        choices=['css', 'gtk', 'xresources', 'kitty', 'alacritty', 'foot', 'kde'],
+        help='Экспортировать тему в указанные форматы'
+    )
+
+    parser.add_argument(
+        '--export-dir',
+        help='Директория экспорта (по умолчанию ~/.local/share/theme-installer/exports)'
+    )
+
+    parser.add_argument(
+        '--history',
+        type=int,
+        nargs='?',
+        const=10,
+        metavar='N',
+        help='Показать N последних применений тем и самые долгие применения (по умолчанию 10)'
+    )
+
     parser.add_argument(
         '--list-platforms',
         action='store_true',
@@ -108,11 +454,38 @@ def main():
 
     args = parser.parse_args()
 
+    if args.history is not None:
+        show_history(args.history)
+        return
+
     if args.list_platforms:
         print("Доступные платформы:")
-        platforms = ['gnome', 'kde', 'windows', 'android', 'macos', 'xfce', 'mate', 'cinnamon']
-        for p in platforms:
-            print(f"  • {p}")
+        for name, spec in sorted(adapter_index().items()):
+            source = '' if spec['source'] == 'builtin' else f" ({spec['source']})"
+            print(f"  • {name}{source}")
+        return
+
+    if args.schedule:
+        from core.slideshow import build_schedule, save_schedule
+
+        print(f"Анализ ротации: {args.schedule}")
+        try:
+            schedule = build_schedule(
+                args.schedule, args.interval,
+                mode=args.mode, workers=args.workers, options=analyzer_options(args)
+            )
+        except (OSError, ValueError) as e:
+            print(f"Ошибка: {e}")
+            return
+        path = save_schedule(schedule, args.schedule_file)
+        print(f"Расписание из {len(schedule['entries'])} тем сохранено в: {path}")
+        return
+
+    if args.batch:
+        try:
+            run_batch(args)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка: {e}")
         return
 
     # Определение платформы
@@ -126,21 +499,64 @@ def main():
     else:
         platform_name = args.platform
 
+    if args.run_schedule:
+        from core.slideshow import SlideshowScheduler, load_schedule
+
+        try:
+            scheduler = SlideshowScheduler(load_schedule(args.schedule_file), platform_name)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка: {e}")
+            return
+        print(f"Слайд-шоу: {len(scheduler.entries)} тем, интервал {scheduler.interval} с")
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            print("\nСлайд-шоу остановлено")
+        return
+
     if not args.image:
         print("Укажите путь к изображению")
         parser.print_help()
         return
 
-    # Проверка существования файла
-    if not os.path.exists(args.image):
-        print(f"Файл не найден: {args.image}")
-        return
+    # Проверка существования файлов
+    images = [args.image] + (args.screens or [])
+    for image in images:
+        if not os.path.exists(image):
+            print(f"Файл не найден: {image}")
+            return
 
     try:
+        options = analyzer_options(args)
         # Анализ изображения
-        print(f"Анализ изображения: {args.image}")
-        analyzer = ColorAnalyzer(args.image)
-        results = analyzer.analyze()
+        if args.screens:
+            from core.screens import ScreenAnalyzer, parse_screen_size
+
+            print(f"Анализ изображений мониторов: {', '.join(images)}")
+            sizes = [parse_screen_size(size) for size in args.screen_sizes or []]
+            analyzer = ScreenAnalyzer(images, screen_sizes=sizes, workers=args.workers,
+                                      **options)
+        else:
+            from core.color_analyzer import ColorAnalyzer
+
+            print(f"Анализ изображения: {args.image}")
+            analyzer = ColorAnalyzer(args.image, **options)
+        start = time.perf_counter()
+        results = analyzer.analyze(modes=args.themes, schemes=args.schemes)
+        # В истории - только тема выбранного режима: остальные не строятся
+        theme_mode = resolve_theme_mode(results, args.mode)
+
+        from core.history import get_history
+        get_history().record(
+            'analysis',
+            image_path=args.image,
+            mode=theme_mode,
+            params={**options, 'themes': args.themes, 'schemes': args.schemes,
+                    'screens': images[1:]},
+            theme=results['themes'].get(theme_mode),
+            duration_ms=(time.perf_counter() - start) * 1000,
+            success=True,
+        )
 
         # Вывод результатов
         print_results(results)
@@ -148,36 +564,60 @@ def main():
         # Сохранение в файл
         if args.output:
             import json
+            from core.theme import json_default
             with open(args.output, 'w') as f:
-                json.dump(results, f, indent=2)
+                json.dump(results, f, indent=2, default=json_default)
             print(f"\nПалитра сохранена в: {args.output}")
 
+        if args.export:
+            from core.exporter import ThemeExporter, default_export_dir
+
+            print(f"\nЭкспорт темы ({theme_mode}):")
+            export_theme(ThemeExporter(args.export), results['themes'][theme_mode],
+                         args.export_dir or default_export_dir())
+
+        if args.preview_dir:
+            from core.preview import save_previews
+
+            for mode, (path, written) in save_previews(results, args.preview_dir,
+                                                       wallpaper=analyzer.image).items():
+                status = "записано" if written else "без изменений"
+                print(f"Превью {mode}: {path} ({status})")
+
         if args.analyze_only:
             return
-            # Применение темы
+
+        if args.fleet:
+            run_fleet(args, results, platform_name, images if args.screens else args.image)
+            return
+
+        # Применение темы
         if args.apply:
             print(f"\nПрименение темы для {platform_name}...")
             # Создаем менеджер тем с платформой
-            manager = ThemeManager(platform_name)
-
-            # Определение режима темы
-            # В функции main(), после анализа изображения:
-            if args.mode == 'auto':
-                # Автоопределение на основе яркости основного цвета
-                import colorsys
-                primary_rgb = analyzer.hex_to_rgb(results['themes']['light']['primary'])
-                r, g, b = [x/255 for x in primary_rgb]
-                h, l, s = colorsys.rgb_to_hls(r, g, b)
-                # Если яркость меньше 50% - выбираем тёмную тему
-                theme_mode = 'dark' if l < 0.5 else 'light'
-            else:
-                theme_mode = args.mode
+            screen_sizes = None
+            if args.screen_sizes:
+                from core.screens import parse_screen_size
+                screen_sizes = [parse_screen_size(size) for size in args.screen_sizes]
+            manager = ThemeManager(platform_name, prescale=args.prescale, screen_sizes=screen_sizes)
+
+
+            if theme_mode not in results['themes']:
+                print(f"Режим {theme_mode} не входит в --themes")
+                return
 
             print(f"Режим темы: {theme_mode}")
             theme_data = results['themes'][theme_mode]
 
             # Применение
-            success = manager.apply_theme(theme_data, args.image)
+            if args.transition:
+                success, report = manager.apply_transition(
+                    theme_data, images if args.screens else args.image, steps=args.transition,
+                    duration=args.transition_duration)
+                if report:
+                    print_transition_report(report)
+            else:
+                success = manager.apply_theme(theme_data, images if args.screens else args.image)
 
             if success:
                 print(f"Тема успешно применена!")
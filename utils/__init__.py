@@ -5,24 +5,35 @@
 
 from .helpers import (
     print_color_block,
+    collect_images,
+    resolve_theme_mode,
     display_color_palette,
+    format_color_palette,
     print_results,
+    format_results,
+    write_lines,
     save_palette,
     load_palette,
     check_dependencies,
     create_project_structure
 )
 
-from .logger import setup_logger, get_log_file
+from .logger import setup_logger, close_logger, get_log_file
 
 __all__ = [
     'print_color_block',
+    'collect_images',
+    'resolve_theme_mode',
     'display_color_palette',
+    'format_color_palette',
     'print_results',
+    'format_results',
+    'write_lines',
     'save_palette',
     'load_palette',
     'check_dependencies',
     'create_project_structure',
     'setup_logger',
+    'close_logger',
     'get_log_file'
 ]
\ No newline at end of file
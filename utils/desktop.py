@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Определение платформы и окружения рабочего стола без запуска процессов.
+
+Окружение определяется по XDG_CURRENT_DESKTOP / DESKTOP_SESSION, а
+если их нет - по именам процессов в /proc/*/comm (просмотр
+прекращается на первом найденном процессе оболочки). Версия Plasma
+берется из KDE_SESSION_VERSION или из метаданных оболочки Plasma на
+диске. Результаты кэшируются на время работы процесса.
+"""
+import json
+import os
+import platform as _platform
+import re
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+# Подстроки XDG_CURRENT_DESKTOP / DESKTOP_SESSION и платформы по порядку проверки
+DESKTOP_NAMES = (
+    ('gnome', 'gnome'),
+    ('kde', 'kde'),
+    ('plasma', 'kde'),
+    ('xfce', 'xfce'),
+    ('mate', 'mate'),
+    ('cinnamon', 'cinnamon'),
+)
+
+# Процессы оболочек рабочего стола (содержимое /proc/PID/comm, не длиннее 15 символов)
+SHELL_PROCESSES = {
+    'gnome-shell': 'gnome',
+    'plasmashell': 'kde',
+    'kded5': 'kde',
+    'kded6': 'kde',
+    'kwin_x11': 'kde',
+    'kwin_wayland': 'kde',
+    'xfce4-session': 'xfce',
+    'xfwm4': 'xfce',
+    'mate-session': 'mate',
+    'marco': 'mate',
+    'cinnamon': 'cinnamon',
+    'cinnamon-sessio': 'cinnamon',
+}
+
+# Метаданные оболочки Plasma: metadata.json в Plasma 6, metadata.desktop в Plasma 5
+PLASMA_METADATA = (
+    '/usr/share/plasma/shells/org.kde.plasma.desktop/metadata.json',
+    '/usr/share/plasma/shells/org.kde.plasma.desktop/metadata.desktop',
+)
+
+
+def desktop_from_environment(environ=None):
+    """Платформа по переменным окружения сессии или None."""
+    environ = os.environ if environ is None else environ
+    for variable in ('XDG_CURRENT_DESKTOP', 'DESKTOP_SESSION'):
+        value = environ.get(variable, '').lower()
+        if not value:
+            continue
+        for name, platform_name in DESKTOP_NAMES:
+            if name in value:
+                return platform_name
+    return None
+
+
+def iter_process_names(proc='/proc'):
+    """Имена процессов (comm) по /proc без запуска ps."""
+    try:
+        entries = os.scandir(proc)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(os.path.join(entry.path, 'comm'), encoding='utf-8', errors='replace') as f:
+                    yield f.read().strip()
+            except OSError:
+                # Процесс успел завершиться
+                continue
+
+
+def desktop_from_processes(proc='/proc'):
+    """Платформа по первому найденному процессу оболочки или None."""
+    for comm in iter_process_names(proc):
+        platform_name = SHELL_PROCESSES.get(comm)
+        if platform_name:
+            return platform_name
+    return None
+
+
+def process_running(name, proc='/proc'):
+    """Запущен ли процесс с именем name (первые 15 символов, как в comm)."""
+    return any(comm == name[:15] for comm in iter_process_names(proc))
+
+
+@lru_cache(maxsize=None)
+def detect_platform():
+    """Платформа: gnome, kde, xfce, mate, cinnamon, linux, windows, macos, android или unknown."""
+    system = _platform.system().lower()
+
+    if system == 'android' or 'ANDROID_ROOT' in os.environ:
+        return 'android'
+    if system == 'linux':
+        return desktop_from_environment() or desktop_from_processes() or 'linux'
+    if system == 'windows':
+        return 'windows'
+    if system == 'darwin':
+        return 'macos'
+    return 'unknown'
+
+
+def _metadata_version(path):
+    text = Path(path).read_text(encoding='utf-8', errors='replace')
+    if path.endswith('.json'):
+        data = json.loads(text)
+        return data.get('KPlugin', {}).get('Version') or data.get('Version')
+    match = re.search(r'^X-KDE-PluginInfo-Version\s*=\s*(\S+)', text, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+@lru_cache(maxsize=None)
+def plasma_version():
+    """Основная версия Plasma ('5', '6') или 'unknown'."""
+    version = os.environ.get('KDE_SESSION_VERSION', '').strip()
+    if version.isdigit():
+        return version
+
+    for path in PLASMA_METADATA:
+        try:
+            version = _metadata_version(path)
+        except (OSError, ValueError):
+            continue
+        if version:
+            return version.split('.')[0]
+
+    # Без метаданных - по установленным утилитам
+    if find_command('kwriteconfig6'):
+        return '6'
+    if find_command('kwriteconfig5'):
+        return '5'
+    return 'unknown'
+
+
+@lru_cache(maxsize=256)
+def _find_command(command, path):
+    return shutil.which(command, path=path)
+
+
+def find_command(command):
+    """Полный путь к команде в PATH или None (без запуска which)."""
+    return _find_command(command, os.environ.get('PATH', os.defpath))
+
+
+def clear_cache():
+    """Сброс кэша определения (например, после смены сессии)."""
+    detect_platform.cache_clear()
+    plasma_version.cache_clear()
+    _find_command.cache_clear()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Хэши файлов с запоминанием по пути, размеру и mtime.
+
+Индекс {путь: [размер, mtime, хэш]} хранится в
+~/.cache/theme-installer/hashes.json и читается один раз за процесс,
+поэтому повторный запрос хэша того же файла не читает его содержимое.
+Измененный файл заменяет свою запись; индекс ограничен MAX_ENTRIES
+последними файлами.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+HASH_CHUNK = 1 << 20
+MAX_ENTRIES = 1024
+
+# Блокировка защищает только индекс: хэширование идет без нее
+_lock = threading.Lock()
+_index = {}
+_index_file = None
+
+
+def index_path():
+    return Path.home() / '.cache' / 'theme-installer' / 'hashes.json'
+
+
+def _load_index():
+    """Индекс в памяти; читается при первом обращении (и при смене HOME)."""
+    global _index, _index_file
+    target = index_path()
+    if _index_file != target:
+        try:
+            with open(target, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        # Записи прежнего формата и поврежденные записи отбрасываются
+        _index = {key: entry for key, entry in data.items()
+                  if isinstance(entry, list) and len(entry) == 3} if isinstance(data, dict) else {}
+        _index_file = target
+    return _index
+
+
+def _save_index(index):
+    target = index_path()
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(temp_path, target)
+    except OSError:
+        pass
+
+
+def file_hash(path):
+    """SHA-256 содержимого файла (hex)."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    key, stamp = str(path), [stat.st_size, stat.st_mtime_ns]
+
+    with _lock:
+        entry = _load_index().get(key)
+    if entry and entry[:2] == stamp:
+        return entry[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _lock:
+        index = _load_index()
+        # Запись переносится в конец: вытесняются давно не хэшированные файлы
+        index.pop(key, None)
+        index[key] = [*stamp, value]
+        while len(index) > MAX_ENTRIES:
+            del index[next(iter(index))]
+        _save_index(index)
+    return value
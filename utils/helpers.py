@@ -2,76 +2,147 @@
 """
 Вспомогательные функции.
 """
+import colorsys
 import json
+import sys
 from pathlib import Path
 
+from core.theme import as_theme, json_default, to_packed, unpack_rgb
 
-def print_color_block(color_hex, width=8):
-    """Печать цветного блока в терминале."""
-    hex_value = color_hex.lstrip('#')
-    r = int(hex_value[0:2], 16)
-    g = int(hex_value[2:4], 16)
-    b = int(hex_value[4:6], 16)
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff'}
+
+
+def print_color_block(color, width=8):
+    """Печать цветного блока в терминале (hex или упакованный цвет)."""
+    r, g, b = unpack_rgb(to_packed(color))
     return f"\033[48;2;{r};{g};{b}m{' ' * width}\033[0m"
 
 
-def display_color_palette(theme_data):
-    """Отображение цветовой палитры."""
-    print("\n┌────────────────────────────────────────┐")
-    print("│         Цветовая палитра темы         │")
-    print("├────────────────────────────────────────┤")
+def collect_images(directory):
+    """Список изображений директории в стабильном порядке."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        raise NotADirectoryError(f"Директория не найдена: {directory}")
+
+    return sorted(
+        path.resolve() for path in directory.iterdir()
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def resolve_theme_mode(results, mode='auto'):
+    """Выбор режима темы; в режиме auto - по яркости основного цвета."""
+    if mode != 'auto':
+        return mode
+
+    # Основной цвет одинаков во всех режимах: берем его из пары,
+    # чтобы не строить тему ради одного цвета
+    if 'primary_pair' in results:
+        primary_rgb = unpack_rgb(to_packed(results['primary_pair'][0]))
+    else:
+        primary_rgb = as_theme(results['themes']['light']).rgb('primary')
+    r, g, b = [x / 255 for x in primary_rgb]
+    h, l, s = colorsys.rgb_to_hls(r, g, b)
+    # Если яркость меньше 50% - выбираем тёмную тему
+    return 'dark' if l < 0.5 else 'light'
+
+
+def write_lines(lines, stream=None):
+    """Вывод строк одной записью в поток (по умолчанию stdout)."""
+    stream = stream or sys.stdout
+    stream.write('\n'.join(lines) + '\n')
+    stream.flush()
+
+
+def format_color_palette(theme_data):
+    """Строки таблицы цветовой палитры темы."""
+    lines = [
+        "\n┌────────────────────────────────────────┐",
+        "│         Цветовая палитра темы         │",
+        "├────────────────────────────────────────┤",
+    ]
 
+    theme = as_theme(theme_data)
     colors_to_display = [
-        ("Основной", theme_data['primary']),
-        ("Вторичный", theme_data['secondary']),
-        ("Фон", theme_data['background']),
-        ("Поверхность", theme_data['surface']),
+        ("Основной", theme.packed('primary')),
+        ("Вторичный", theme.packed('secondary')),
+        ("Фон", theme.packed('background')),
+        ("Поверхность", theme.packed('surface')),
     ]
 
     # Добавляем акцентные цвета
-    for i, accent in enumerate(theme_data.get('accent_colors', [])[:3], 1):
+    for i, accent in enumerate(theme.accent_colors.packed_values()[:3], 1):
         colors_to_display.append((f"Акцент {i}", accent))
 
     for name, color in colors_to_display:
         block = print_color_block(color, 6)
-        print(f"│ {block} {name:<12} {color:10} │")
+        lines.append(f"│ {block} {name:<12} #{color:06x}   │")
 
-    print("└────────────────────────────────────────┘")
+    lines.append("└────────────────────────────────────────┘")
+    return lines
 
 
-def print_results(results):
-    """Вывод результатов анализа."""
-    print("РЕЗУЛЬТАТЫ АНАЛИЗА ИЗОБРАЖЕНИЯ".center(60))
+def display_color_palette(theme_data):
+    """Отображение цветовой палитры."""
+    write_lines(format_color_palette(theme_data))
+
 
-    print(f"\nИзображение: {results.get('source_image', 'N/A')}")
-    print(f"Размер: {results.get('image_size', (0, 0))}")
+def _swatches(colors, width=3):
+    return ''.join(print_color_block(color, width) for color in colors)
+
+
+def format_results(results):
+    """Строки отчета о результатах анализа."""
+    lines = [
+        "РЕЗУЛЬТАТЫ АНАЛИЗА ИЗОБРАЖЕНИЯ".center(60),
+        f"\nИзображение: {results.get('source_image', 'N/A')}",
+        f"Размер: {results.get('image_size', (0, 0))}",
+        "\nДоминирующие цвета:",
+    ]
 
-    print("\nДоминирующие цвета:")
     colors = results.get('dominant_colors', [])
     for i, color in enumerate(colors[:8], 1):
         block = print_color_block(color, 6)
-        print(f"  {i:2}. {block} {color}")
+        lines.append(f"  {i:2}. {block} {color}")
 
     primary, secondary = results.get('primary_pair', ('#000000', '#000000'))
-    print(f"\nОсновная пара:")
-    print(f"    Основной:   {print_color_block(primary, 4)} {primary}")
-    print(f"    Вторичный:  {print_color_block(secondary, 4)} {secondary}")
+    lines += [
+        "\nОсновная пара:",
+        f"    Основной:   {print_color_block(primary, 4)} {primary}",
+        f"    Вторичный:  {print_color_block(secondary, 4)} {secondary}",
+    ]
+
+    screens = results.get('screens')
+    if screens:
+        lines.append("\nПалитры мониторов:")
+        for i, screen in enumerate(screens, 1):
+            lines.append(f"  {i:2}. {screen['weight']:4.0%} {_swatches(screen['colors'][:8])}"
+                         f" {Path(screen['image']).name}")
 
-    print("\nЦветовые схемы:")
+    frame_palettes = results.get('frame_palettes')
+    if frame_palettes:
+        lines.append("\nПалитры кадров:")
+        for frame in frame_palettes:
+            lines.append(f"  {frame['frame']:5}: {_swatches(frame['colors'][:8])}")
+
+    lines.append("\nЦветовые схемы:")
     schemes = results.get('color_scheme', {})
     for scheme_name, scheme_colors in schemes.items():
-        print(f"  {scheme_name.capitalize():12}: ", end="")
-        for color in scheme_colors[:4]:
-            print(print_color_block(color, 3), end="")
-        print()
+        lines.append(f"  {scheme_name.capitalize():12}: {_swatches(scheme_colors[:4])}")
+
+    lines.append("\n" + "=" * 60)
+    return lines
+
 
-    print("\n" + "=" * 60)
+def print_results(results):
+    """Вывод результатов анализа."""
+    write_lines(format_results(results))
 
 
 def save_palette(palette, filepath):
     """Сохранение палитры в файл."""
     with open(filepath, 'w') as f:
-        json.dump(palette, f, indent=2, ensure_ascii=False)
+        json.dump(palette, f, indent=2, ensure_ascii=False, default=json_default)
     print(f"✓ Палитра сохранена: {filepath}")
 
 
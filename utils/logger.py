@@ -8,10 +8,21 @@ from pathlib import Path
 from datetime import datetime
 
 
-def setup_logger(name='ThemeInstaller', log_level=logging.INFO):
-    """Настройка логгера."""
+def default_log_dir():
+    return Path.home() / '.cache' / 'theme-installer' / 'logs'
+
+
+def setup_logger(name='ThemeInstaller', log_level=logging.INFO, log_dir=None):
+    """Настройка логгера (log_dir - директория логов вместо ~/.cache/...).
+
+    Повторный вызов с тем же именем возвращает уже настроенный логгер.
+    """
+    logger = logging.getLogger(name)
+    if logger.handlers:
+        return logger
+
     # Создаем директорию для логов
-    log_dir = Path.home() / '.cache' / 'theme-installer' / 'logs'
+    log_dir = Path(log_dir) if log_dir else default_log_dir()
     log_dir.mkdir(parents=True, exist_ok=True)
 
     # Имя файла лога с датой
@@ -24,7 +35,6 @@ def setup_logger(name='ThemeInstaller', log_level=logging.INFO):
     )
 
     # Логгер
-    logger = logging.getLogger(name)
     logger.setLevel(log_level)
 
     # Обработчик для файла
@@ -40,7 +50,14 @@ def setup_logger(name='ThemeInstaller', log_level=logging.INFO):
     return logger
 
 
-def get_log_file():
+def close_logger(logger):
+    """Закрытие и удаление обработчиков логгера."""
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def get_log_file(log_dir=None):
     """Получение пути к текущему файлу лога."""
-    log_dir = Path.home() / '.cache' / 'theme-installer' / 'logs'
+    log_dir = Path(log_dir) if log_dir else default_log_dir()
     return log_dir / f"theme_installer_{datetime.now():%Y%m%d}.log"
\ No newline at end of file